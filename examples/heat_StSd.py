@@ -257,6 +257,10 @@ solverset = {"STEPSET": {'type': 'table',  # mode, freq, time ...
                         'step': 1},
              'SYMM':True,
             #  'MP':True,
+            #  'MATRIXFREE':True,  # SteadyStateLinearIterative only, True or 'recompute'
+            #  'BACKEND':'auto',  # element kernels: 'auto' (autotuned), 'cython', 'numba' or 'numpy'
+            #  'PRECOND':'jacobi',  # SteadyStateLinearIterative PCG: 'none', 'jacobi', 'blockjacobi', 'ssor', 'ic', 'ilu' or 'amg'
+            #  'TOL':1e-10,  # SteadyStateLinearIterative relative residual
             }
 solverdata = fea.Solve(solverset)
 
@@ -62,6 +62,7 @@ modeldata = {
         'TYPE': 'structplane',
         'SHAPE': 'quad4',
         'INTGAUSS': 4,
+        # 'INTEGRATION': 'full',  # 'reduced' (one-point, hourglass control) or 'bbar', quad4/hexa8
     },
 
     "MATERIAL": {
@@ -204,6 +204,8 @@ solverset = {"STEPSET": {'type': 'mode',  # mode, freq, time ...
                         'step': 1},
              'SYMM':True,
             #  'MP':True,
+            #  'MASS':'lumped',  # consistent, lumped (HRZ), lumped_rowsum
+            #  'MEMORY':256,  # memory budget [MB] of the chunked assembly
             }
 solverdata = fea.Solve(solverset)
 
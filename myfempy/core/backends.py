@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import logging
+from importlib import import_module
+from time import perf_counter
+
+from numpy import allclose
+
+# kernel backends, in order of preference while the autotuner has no timing
+BACKENDS = ("cython", "numba", "numpy")
+# backends that thread over the elements without the GIL
+THREADED = ("cython", "numba")
+# elements of the current mesh timed by the autotuner
+AUTOTUNE_SAMPLE = 1024
+# elements of the warm up run (numba compile, first touch)
+AUTOTUNE_WARMUP = 8
+# relative tolerance of the warm up results against the reference backend
+AUTOTUNE_RTOL = 1e-8
+
+_kernels = dict()
+_tuned = dict()
+_shapetasks = dict()
+
+
+def setKernel(name, backend, kernel):
+    """
+    setKernel register the kernel of a backend
+
+    Arguments:
+        name -- kernel name, e.g. "stiffness"
+        backend -- one of BACKENDS
+        kernel -- callable, None if the backend is not available (not built/installed)
+    """
+    if backend not in BACKENDS:
+        raise ValueError("backend %s not in %s" % (backend, BACKENDS))
+    if kernel is not None:
+        _kernels.setdefault(name, dict())[backend] = kernel
+
+
+def getKernels(name, backend="auto"):
+    """
+    getKernels available kernels of a name
+
+    Arguments:
+        backend -- "auto" for all backends, else one of BACKENDS
+
+    Returns:
+        dict {backend: kernel} in the order of BACKENDS
+    """
+    kernels = _kernels.get(name, dict())
+    if backend in (None, "auto"):
+        return {bk: kernels[bk] for bk in BACKENDS if bk in kernels}
+    if backend not in BACKENDS:
+        raise ValueError("backend %s not in %s" % (backend, BACKENDS + ("auto",)))
+    return {bk: kernels[bk] for bk in (backend,) if bk in kernels}
+
+
+def getKernel(name, key, run, backend="auto"):
+    """
+    getKernel fastest kernel of a name on the current workload
+
+    At the first use of a key every available kernel is run once on a few
+    elements (warm up, numba compile) and timed on a sample of the mesh,
+    the winner is cached per key. A kernel that returns None does not
+    support the workload and is left out, as a kernel whose warm up result
+    differs from the reference backend (the last one, numpy). A forced
+    backend that is not available (not built/installed) or does not
+    support the workload logs a warning, the caller falls back to the
+    element routines.
+
+    Arguments:
+        name -- kernel name, e.g. "stiffness"
+        key -- workload key, e.g. (element id, shape key, intgauss)
+        run -- run(kernel, nelem) runs the kernel on the first nelem elements
+        backend -- "auto" (or None) to autotune, else one of BACKENDS
+
+    Returns:
+        (backend, kernel), (None, None) if no kernel supports the workload
+    """
+    backend = backend or "auto"
+    tuned_key = (name, backend, key)
+    if tuned_key in _tuned:
+        return _tuned[tuned_key]
+    supported = []
+    results = []
+    for bk, kernel in getKernels(name, backend).items():
+        result = run(kernel, AUTOTUNE_WARMUP)
+        if result is not None:
+            supported.append((bk, kernel))
+            results.append(result)
+    if len(supported) > 1:
+        # the last backend (numpy) is the reference, a kernel that disagrees is left out
+        reference = results[-1]
+        atol = AUTOTUNE_RTOL * abs(reference).max()
+        same = [allclose(result, reference, rtol=AUTOTUNE_RTOL, atol=atol) for result in results]
+        for (bk, __), ok in zip(supported, same):
+            if not ok:
+                logging.warning(
+                    "BACKEND %s %s %s DIFFERS FROM %s -- LEFT OUT"
+                    % (bk.upper(), name.upper(), key, supported[-1][0].upper())
+                )
+        supported = [item for item, ok in zip(supported, same) if ok]
+    best = (None, None)
+    best_time = None
+    for bk, kernel in supported:
+        if len(supported) == 1:
+            best = (bk, kernel)
+            break
+        start = perf_counter()
+        run(kernel, AUTOTUNE_SAMPLE)
+        time = perf_counter() - start
+        if best_time is None or time < best_time:
+            best, best_time = (bk, kernel), time
+    if best[0] is None and backend != "auto":
+        if backend not in _kernels.get(name, dict()):
+            logging.warning("BACKEND %s NOT AVAILABLE -- NO %s KERNEL" % (backend.upper(), name.upper()))
+        else:
+            logging.warning("BACKEND %s DOES NOT SUPPORT %s %s" % (backend.upper(), name.upper(), key))
+    _tuned[tuned_key] = best
+    return best
+
+
+def getAutotune():
+    """
+    getAutotune backend picked for each workload so far
+
+    The workload is the string name/backend/key, e.g.
+    "stiffness/auto/22/quad4/2/full/None", so the dict serializes to json.
+
+    Returns:
+        dict {"name/backend/key": backend}, backend None if no kernel supports the workload
+    """
+    return {
+        "/".join(str(part) for part in (name, backend) + tuple(key)): best[0]
+        for (name, backend, key), best in _tuned.items()
+    }
+
+
+def clearAutotune():
+    """clearAutotune drop the cached winners, the next use benchmarks again"""
+    _tuned.clear()
+
+
+def getShapeTasks(key):
+    """
+    getShapeTasks routines of a shape (ShapeFunctions, Jacobian, NodeList, ...)
+
+    Arguments:
+        key -- shape key, e.g. "quad4"
+
+    Returns:
+        the compiled <key>_tasks module, or the pure NumPy shape tasks if it was not built
+    """
+    if key not in _shapetasks:
+        try:
+            _shapetasks[key] = import_module("myfempy.core.shapes.%s_tasks" % key)
+        except ImportError:
+            from myfempy.core.shapes.shapetasks_numpy import ShapeTasksNumPy
+
+            _shapetasks[key] = ShapeTasksNumPy(key)
+    return _shapetasks[key]
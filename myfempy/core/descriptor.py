@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+from collections.abc import Mapping
+from functools import wraps
+from types import MappingProxyType
+
+
+def _freeze(value):
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _thaw(value):
+    if isinstance(value, Mapping):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
+
+
+class Descriptor(Mapping):
+    """
+    Descriptor Class <ClassOrder>
+
+    Read-only set of an element or shape. The keys of the set are read as
+    in a dict (set["dofs"]["d"]), nested dicts are mapping proxies and
+    lists are tuples. The subclasses add precomputed fields as slots.
+    """
+
+    __slots__ = ("_data",)
+
+    def __init__(self, data):
+        object.__setattr__(self, "_data", _freeze(data))
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("%s is read-only" % type(self).__name__)
+
+    def __delattr__(self, name):
+        raise AttributeError("%s is read-only" % type(self).__name__)
+
+    def __reduce__(self):
+        return (type(self), (_thaw(self._data),))
+
+    def __repr__(self):
+        return "%s(%r)" % (type(self).__name__, _thaw(self._data))
+
+
+def setDescriptor(descriptor):
+    """
+    setDescriptor memoize a getElementSet/getShapeSet routine as a descriptor
+
+    The set is built once, at the first call, and the same read-only
+    descriptor is returned afterwards.
+
+    Arguments:
+        descriptor -- Descriptor subclass, e.g. ElementSet
+
+    Returns:
+        decorator of the set routine
+    """
+
+    def decorator(getSet):
+        cache = []
+
+        @wraps(getSet)
+        def getSetCached():
+            if not cache:
+                cache.append(descriptor(getSet()))
+            return cache[0]
+
+        return getSetCached
+
+    return decorator
@@ -1,5 +1,26 @@
 from abc import ABC, abstractmethod
 
+from myfempy.core.descriptor import Descriptor
+
+
+class ElementSet(Descriptor):
+    """
+    Element Set Class <ClassOrder>
+
+    Read-only getElementSet of an element, built once. Besides the dict
+    keys, the fields key, id, nodedof (len of dofs["d"]) and ntensor
+    (len of tensor) are precomputed.
+    """
+
+    __slots__ = ("key", "id", "nodedof", "ntensor")
+
+    def __init__(self, data):
+        super().__init__(data)
+        object.__setattr__(self, "key", self["key"])
+        object.__setattr__(self, "id", self["id"])
+        object.__setattr__(self, "nodedof", len(self["dofs"]["d"]))
+        object.__setattr__(self, "ntensor", len(self["tensor"]))
+
 
 class Element(ABC):
     """Element API Class <ClassService>"""
@@ -47,3 +68,7 @@ class Element(ABC):
     @abstractmethod
     def getElementVolume():
         pass
+
+    @abstractmethod
+    def getElementVolumeBatch():
+        pass
@@ -1,21 +1,26 @@
 from __future__ import annotations
 
-from numpy import (abs, array, array2string, concatenate, dot, float64, in1d,
-                   int32, ix_, sqrt, unique, where, zeros)
+from numpy import (abs, array, array2string, asarray, concatenate, dot,
+                   float64, in1d, int32, ix_, matmul, newaxis, sqrt,
+                   unique, where, zeros)
 
-from myfempy.core.utilities import (gauss_points, get_elemen_from_nodelist,
+from myfempy.core.utilities import (getGaussQuadrature,
+                                    get_elemen_from_nodelist,
                                     get_nodes_from_list)
 
 INT32 = int32
 FLT64 = float64
 
-from myfempy.core.elements.element import Element
-from myfempy.core.utilities import gauss_points
+from myfempy.core.descriptor import setDescriptor
+from myfempy.core.elements.element import Element, ElementSet
+from myfempy.core.material.material import getElasticTensorStack
+from myfempy.core.shapes.referenceelement import getReferenceElement
 
 
 class HeatPlane(Element):
     """Plane Heat Element Class <ConcreteClassService>"""
 
+    @setDescriptor(ElementSet)
     def getElementSet():
         elemset = {
             "def": "2D-space 1-node_dofs",
@@ -36,26 +41,48 @@ class HeatPlane(Element):
 
     # @profile
     def getStifLinearMat(Model, inci, coord, tabmat, tabgeo, intgauss, element_number):
-        elem_set = HeatPlane.getElementSet()
-        nodedof = len(elem_set["dofs"]["d"])
-        shape_set = Model.shape.getShapeSet()
-        nodecon = len(shape_set["nodes"])
-        type_shape = shape_set["key"]
-        edof = nodecon * nodedof
         nodelist = Model.shape.getNodeList(inci, element_number)
         elementcoord = Model.shape.getNodeCoord(coord, nodelist)
         C = Model.material.getElasticTensor(tabmat, inci, element_number)
         t = tabgeo[int(inci[element_number, 3] - 1)]["THICKN"]
-        pt, wt = gauss_points(type_shape, intgauss)
-        K_elem_mat = zeros((edof, edof), dtype=FLT64)
-        for ip in range(intgauss):
-            for jp in range(intgauss):
-                detJ = Model.shape.getdetJacobi(array([pt[ip], pt[jp]]), elementcoord)
-                diffN = Model.shape.getDiffShapeFuntion(array([pt[ip], pt[jp]]), nodedof)
-                invJ = Model.shape.getinvJacobi(array([pt[ip], pt[jp]]), elementcoord, nodedof)
-                B = HeatPlane.getB(diffN, invJ)
-                BCB = B.transpose().dot(C).dot(B)
-                K_elem_mat += BCB * t * abs(detJ) * wt[ip] * wt[jp]
+        # linear triangle: constant B, the one-point rule is exact
+        ref = getReferenceElement(Model.shape, 1)
+        if not ref.constant:
+            ref = getReferenceElement(Model.shape, intgauss)
+        weight = ref.weight
+        # temperature gradient B = dN/dx
+        detJ, __, B = Model.shape.getJacobianBatch(asarray(elementcoord)[newaxis], ref.intgauss)
+        BCB = matmul(B[0].transpose(0, 2, 1), matmul(C, B[0]))
+        K_elem_mat = (BCB * (t * abs(detJ[0]) * weight)[:, newaxis, newaxis]).sum(axis=0)
+        return K_elem_mat
+
+    def getStifLinearMatBatch(Model, inci, coord, tabmat, tabgeo, intgauss):
+        """
+        getStifLinearMatBatch all element conductivity matrix in one pass
+
+        Linear triangles (constant gradient) take the closed form K = B^T C B t A.
+
+        Returns:
+            conductivity matrix stack (nelem, nodecon, nodecon)
+        """
+        shape_set = Model.shape.getShapeSet()
+        nodecon = shape_set.nodecon
+        nelem = inci.shape[0]
+        nodelist = inci[:, 4 : 4 + nodecon] - 1
+        elementcoord = coord[nodelist][:, :, 1:3]
+        C = getElasticTensorStack(Model.material, tabmat)[inci[:, 2] - 1]
+        t = tabgeo["THICKN"][inci[:, 3] - 1]
+        # linear triangle: constant B, the one-point rule is exact
+        ref = getReferenceElement(Model.shape, 1)
+        if not ref.constant:
+            ref = getReferenceElement(Model.shape, intgauss)
+        weight = ref.weight
+        # temperature gradient B = dN/dx
+        detJ, __, B = Model.shape.getJacobianBatch(elementcoord, ref.intgauss)
+        K_elem_mat = zeros((nelem, nodecon, nodecon), dtype=FLT64)
+        for pp in range(weight.shape[0]):
+            BCB = matmul(B[:, pp].transpose(0, 2, 1), matmul(C, B[:, pp]))
+            K_elem_mat += BCB * (t * abs(detJ[:, pp]) * weight[pp])[:, newaxis, newaxis]
         return K_elem_mat
 
     # def getMassConsistentMat(
@@ -82,9 +109,9 @@ class HeatPlane(Element):
 
     def getUpdateMatrix(Model, matrix, addval):
         elem_set = Model.element.getElementSet()
-        nodedof = len(elem_set["dofs"]["d"])
+        nodedof = elem_set.nodedof
         shape_set = Model.shape.getShapeSet()
-        nodecon = len(shape_set["nodes"])
+        nodecon = shape_set.nodecon
         type_shape = shape_set["key"]
         edof = nodecon * nodedof
 
@@ -103,18 +130,17 @@ class HeatPlane(Element):
                 pass
             else:
                 idx_conec = array2string(nodes_conec)
-                get_side = Model.shape.getSideAxis(nodes_conec[1:-1])
-                pt, wt = gauss_points(type_shape, Model.intgauss)
+                get_side = Model.shape.getSideAxis(idx_conec[1:-1])
+                pt, wt = getGaussQuadrature(type_shape, Model.intgauss, 1)
                 loc = Model.shape.getLocKey(nodelist, nodedof)
                 h = addval[0, 2]
                 Kh = zeros((edof, edof))
-                for ip in range(2):
-                    for jp in range(2):
-                        points = Model.shape.getIsoParaSide(get_side, pt[ip])
-                        N = Model.shape.getShapeFunctions(array(points), nodedof)
-                        J = Model.shape.getJacobian(array(points), elementcoord)
-                        detJ_e = Model.shape.getEdgeLength(J, get_side)
-                        Kh += dot(N.transpose(), N) * h * t * abs(detJ_e) * wt[ip] * wt[jp]
+                for gp in range(wt.shape[0]):
+                    points = Model.shape.getIsoParaSide(get_side, pt[gp, 0])
+                    N = Model.shape.getShapeFunctions(array(points), nodedof)
+                    J = Model.shape.getJacobian(array(points), elementcoord)
+                    detJ_e = Model.shape.getEdgeLength(J, get_side)
+                    Kh += dot(N.transpose(), N) * h * t * abs(detJ_e) * wt[gp]
 
                 matrix[ix_(loc, loc)] += Kh
         return matrix
@@ -132,17 +158,22 @@ class HeatPlane(Element):
 
     def getElementVolume(Model, inci, coord, tabgeo, element_number):
         t = tabgeo[int(inci[element_number, 3] - 1)]["THICKN"]
-        shape_set = Model.shape.getShapeSet()
-        type_shape = shape_set["key"]
         nodelist = Model.shape.getNodeList(inci, element_number)
         elementcoord = Model.shape.getNodeCoord(coord, nodelist)
-        pt, wt = gauss_points(type_shape, 1)
+        ref = getReferenceElement(Model.shape, 1)
         detJ = 0.0
-        for ip in range(1):
-            for jp in range(1):
-                detJ += (
-                    abs(Model.shape.getdetJacobi(array([pt[ip], pt[jp]]), elementcoord))
-                    * wt[ip]
-                    * wt[jp]
-                )
+        for pp in range(ref.npoint):
+            detJ += abs(Model.shape.getdetJacobi(ref.getPoint(pp), elementcoord)) * ref.weight[pp]
         return detJ * t
+
+    def getElementVolumeBatch(Model, inci, coord, tabgeo):
+        """
+        getElementVolumeBatch volume (area * thickness) of all elements in one pass
+
+        Returns:
+            array (nelem,)
+        """
+        nodecon = Model.shape.getShapeSet().nodecon
+        elementcoord = coord[inci[:, 4 : 4 + nodecon] - 1][:, :, 1:3]
+        t = tabgeo["THICKN"][inci[:, 3] - 1]
+        return getReferenceElement(Model.shape, 1).getVolumeBatch(elementcoord) * t
@@ -1,19 +1,30 @@
 from __future__ import annotations
 
-from numpy import (abs, array, concatenate, dot, eye, float64, int32, ix_,
-                   sqrt, transpose, zeros)
+from numpy import (array, ascontiguousarray, dot, float64, int32, ix_, matmul,
+                   newaxis, ones, sqrt, zeros)
+from numpy.linalg import inv
+from numpy.polynomial.polynomial import polyder, polyint, polymul, polyval
 
 INT32 = int32
 FLT64 = float64
 
-from myfempy.core.elements.element import Element
-from myfempy.core.utilities import (gauss_points, get3D_LocalVector,
-                                    getRotational_Matrix)
+from myfempy.core.descriptor import setDescriptor
+from myfempy.core.elements.element import Element, ElementSet
+from myfempy.core.material.material import getElasticTensorStack
+from myfempy.core.utilities import (getRotational_Matrix,
+                                    getRotational_MatrixBatch)
+
+# position of the nodes on the member axis, node k of line3 at the middle
+FRAME_NODES = {
+    "line2": (0.0, 1.0),
+    "line3": (0.0, 1.0, 0.5),
+}
 
 
 class StructuralBeam(Element):
     """Beam Structural Element Class <ConcreteClassService>"""
 
+    @setDescriptor(ElementSet)
     def getElementSet():
         elemset = {
             "def": "1D-space 6-node_dofs",
@@ -59,77 +70,146 @@ class StructuralBeam(Element):
 
     # @profile
     def getStifLinearMat(Model, inci, coord, tabmat, tabgeo, intgauss, element_number):
-        elem_set = StructuralBeam.getElementSet()
-        nodedof = len(elem_set["dofs"]["d"])
+        return StructuralBeam.getStifLinearMatBatch(
+            Model, inci[element_number : element_number + 1], coord, tabmat, tabgeo, intgauss
+        )[0]
+
+    def getStifLinearMatBatch(Model, inci, coord, tabmat, tabgeo, intgauss):
+        """
+        getStifLinearMatBatch all member stiffness matrix in one pass
+
+        Closed form Euler-Bernoulli frame (axial, torsion and bending in the
+        local xy and xz planes), rotated to the global axes.
+
+        Returns:
+            stiffness matrix stack (nelem, edof, edof)
+        """
+        return StructuralBeam.__getMatBatch(
+            Model, inci, coord, tabmat, tabgeo, False
+        )[0]
+
+    def getStifMassLinearMatBatch(Model, inci, coord, tabmat, tabgeo, intgauss):
+        """
+        getStifMassLinearMatBatch all member stiffness and consistent mass matrix in one pass
+
+        The local axes and rotation matrices are shared by K and M.
+
+        Returns:
+            (stiffness, mass) matrix stacks (nelem, edof, edof)
+        """
+        return StructuralBeam.__getMatBatch(
+            Model, inci, coord, tabmat, tabgeo, True
+        )
+
+    def __getMatBatch(Model, inci, coord, tabmat, tabgeo, mass):
         shape_set = Model.shape.getShapeSet()
-        nodecon = len(shape_set["nodes"])
         type_shape = shape_set["key"]
-        edof = nodecon * nodedof
-        nodelist = Model.shape.getNodeList(inci, element_number)
-        elementcoord = Model.shape.getNodeCoord(coord, nodelist)
-        if type_shape == "line3":
-            elementcoord_local = get3D_LocalVector(elementcoord, 3)
-        else:
-            elementcoord_local = get3D_LocalVector(array(elementcoord), 2)
+        nodecon = shape_set.nodecon
+        table = _getFrameTable(type_shape)
+        elementcoord = coord[inci[:, 4 : 4 + nodecon] - 1][:, :, 1:4]
+        lamb = getRotational_MatrixBatch(elementcoord)
+        L = sqrt(((elementcoord[:, 1, :] - elementcoord[:, 0, :]) ** 2).sum(axis=1))
+        D = getElasticTensorStack(Model.material, tabmat)[inci[:, 2] - 1]
+        geo = tabgeo[inci[:, 3] - 1]
+        # rotations of the unit member matrices scale with L (slope dofs)
+        T = ones((inci.shape[0], table["axial"].shape[0]), dtype=FLT64)
+        T[:, table["rotation"]] = L[:, newaxis]
+        TT = T[:, :, newaxis] * T[:, newaxis, :]
+        EA = D[:, 0, 0] * geo["AREACS"] / L
+        EIz = D[:, 1, 1] * geo["INERZZ"] / L**3
+        EIy = D[:, 2, 2] * geo["INERYY"] / L**3
+        GJ = D[:, 3, 3] * geo["INERXX"] / L
+        K_elem_mat = (
+            EA[:, newaxis, newaxis] * table["axial"]
+            + EIz[:, newaxis, newaxis] * table["bendingxy"]
+            + EIy[:, newaxis, newaxis] * table["bendingxz"]
+            + GJ[:, newaxis, newaxis] * table["torsion"]
+        )
+        K_elem_mat *= TT
+        K_elem_mat = StructuralBeam.__getGlobalBatch(K_elem_mat, lamb)
+        M_elem_mat = None
+        if mass:
+            rho = tabmat["RHO"][inci[:, 2] - 1]
+            M_elem_mat = (
+                (rho * geo["AREACS"] * L)[:, newaxis, newaxis] * table["masstranslation"]
+                + (rho * geo["INERXX"] * L)[:, newaxis, newaxis] * table["masstorsion"]
+            )
+            M_elem_mat *= TT
+            M_elem_mat = StructuralBeam.__getGlobalBatch(M_elem_mat, lamb)
+        return K_elem_mat, M_elem_mat
 
-        D = Model.material.getElasticTensor(tabmat, inci, element_number)
-        AREA = tabgeo[int(inci[element_number, 3] - 1)]["AREACS"]
-        IZZ = tabgeo[int(inci[element_number, 3] - 1)]["INERZZ"]
-        IYY = tabgeo[int(inci[element_number, 3] - 1)]["INERYY"]
-        IXX = tabgeo[int(inci[element_number, 3] - 1)]["INERXX"]
-        C = array([[AREA, IZZ, IYY, IXX]]) * eye(4) * D
-        pt, wt = gauss_points(type_shape, intgauss)
-        K_elem_mat = zeros((edof, edof), dtype=FLT64)
-        for ip in range(intgauss):
-            detJ = Model.shape.getdetJacobi(array([pt[ip]]), elementcoord_local)
-            diffN = Model.shape.getDiffDiffShapeFuntion(array([pt[ip]]), nodedof)
-            invJ = Model.shape.getinvJacobi(array([pt[ip]]), elementcoord, nodedof)
-            B = StructuralBeam.getB(diffN, invJ)
-            BCB = B.transpose().dot(C).dot(B)
-            K_elem_mat += BCB * abs(detJ) * wt[ip]
-        if type_shape == "line3":
-            R = getRotational_Matrix(elementcoord, 6)
-        else:  # line2
-            R = getRotational_Matrix(elementcoord, 4)
-        K_elem_mat = dot(dot(transpose(R), K_elem_mat), R)
-        return K_elem_mat
+    def __getGlobalBatch(A, lamb):
+        # R^T A R, R = block_diag(lamb, ...) applied on the (nblock, 3) blocks of A
+        nelem, edof = A.shape[0], A.shape[1]
+        nblock = edof // 3
+        A = A.reshape(nelem, nblock, 3, nblock, 3)
+        A = matmul(A, lamb[:, newaxis, newaxis])
+        A = matmul(A.transpose(0, 3, 4, 1, 2), lamb[:, newaxis, newaxis])
+        return ascontiguousarray(A.transpose(0, 3, 4, 1, 2)).reshape(nelem, edof, edof)
 
     def getMassConsistentMat(
         Model, inci, coord, tabmat, tabgeo, intgauss, element_number
     ):
+        return StructuralBeam.getStifMassLinearMatBatch(
+            Model, inci[element_number : element_number + 1], coord, tabmat, tabgeo, intgauss
+        )[1][0]
+
+    def getMassLumpedMat(
+        Model, inci, coord, tabmat, tabgeo, intgauss, element_number, type_lumped="hrz"
+    ):
+        """
+        getMassLumpedMat element lumped mass
+
+        Translations get the nodal share of rho*A*L and torsion of rho*Ixx*L.
+        Bending rotations get the HRZ inertia of the Euler-Bernoulli beam
+        (m*L^2/78 per node on line2), zero for "rowsum".
+
+        Arguments:
+            type_lumped -- "hrz" or "rowsum"
+
+        Returns:
+            diagonal mass vector (edof,)
+        """
         elem_set = StructuralBeam.getElementSet()
-        nodedof = len(elem_set["dofs"]["d"])
+        nodedof = elem_set.nodedof
         shape_set = Model.shape.getShapeSet()
-        nodecon = len(shape_set["nodes"])
+        nodecon = shape_set.nodecon
         type_shape = shape_set["key"]
-        edof = nodecon * nodedof
         nodelist = Model.shape.getNodeList(inci, element_number)
-        elementcoord = Model.shape.getNodeCoord(coord, nodelist)
+        elementcoord = array(Model.shape.getNodeCoord(coord, nodelist))
+        rho = tabmat[int(inci[element_number, 2]) - 1]["RHO"]
+        AREA = tabgeo[int(inci[element_number, 3] - 1)]["AREACS"]
+        IXX = tabgeo[int(inci[element_number, 3] - 1)]["INERXX"]
+        L = sqrt(
+            (elementcoord[3, 0] - elementcoord[0, 0]) ** 2
+            + (elementcoord[4, 0] - elementcoord[1, 0]) ** 2
+            + (elementcoord[5, 0] - elementcoord[2, 0]) ** 2
+        )
         if type_shape == "line3":
-            elementcoord_local = get3D_LocalVector(elementcoord, 3)
+            # node k at the middle, HRZ of the quadratic bar
+            weight = array([1.0 / 6.0, 1.0 / 6.0, 2.0 / 3.0])
+            Lb = 0.5 * L
         else:
-            elementcoord_local = get3D_LocalVector(elementcoord, 2)
-        rho = tabmat[int(inci[element_number, 2]) - 1][
-            "RHO"
-        ]  # tabmat[int(inci[element_number, 2]) - 1, 6]  # material density
-        AREA = tabgeo[int(inci[element_number, 3] - 1)][
-            "AREACS"
-        ]  # tabgeo[int(inci[element_number, 3] - 1), 4]
-        IXX = tabgeo[int(inci[element_number, 3] - 1)]["INERXX"]
-        R = array([[rho * AREA, rho * AREA, rho * AREA, rho * IXX]]) * eye(4)
-        pt, wt = gauss_points(type_shape, intgauss)
-        M_elem_mat = zeros((edof, edof), dtype=FLT64)
-        for ip in range(intgauss):
-            detJ = Model.shape.getdetJacobi(array([pt[ip]]), elementcoord_local)
-            N = Model.shape.getShapeFunctions(array([pt[ip]]), nodedof)
-            NRN = N.transpose().dot(R).dot(N)
-            M_elem_mat += NRN * abs(detJ) * wt[ip]
-        return M_elem_mat
+            weight = array([0.5, 0.5])
+            Lb = L
+        m = rho * AREA * L
+        if type_lumped == "rowsum":
+            Jb = 0.0
+        else:
+            Jb = m * Lb**2 / 39.0
+        # local rotational inertia [torsion, bending, bending] to the global axes
+        lamb = getRotational_Matrix(elementcoord, 1)
+        J = dot(lamb.transpose() ** 2, array([rho * IXX * L, Jb, Jb]))
+        M_elem_vec = zeros((nodecon * nodedof), dtype=FLT64)
+        for node in range(nodecon):
+            M_elem_vec[nodedof * node : nodedof * node + 3] = weight[node] * m
+            M_elem_vec[nodedof * node + 3 : nodedof * node + 6] = weight[node] * J
+        return M_elem_vec
 
     def getUpdateMatrix(Model, matrix, addval):
         elem_set = Model.element.getElementSet()
         shape_set = Model.shape.getShapeSet()
-        dofe = len(shape_set["nodes"]) * len(elem_set["dofs"]["d"])
+        dofe = shape_set.nodecon * elem_set.nodedof
         for ii in range(len(addval)):
 
             A_add = addval[ii, 2] * array([[1, -1], [-1, 1]])
@@ -141,7 +221,11 @@ class StructuralBeam(Element):
                 ]
             )
 
-            matrix[ix_(loc, loc)] += A_add
+            if matrix.ndim == 1:
+                # lumped (diagonal) mass vector
+                matrix[loc] += A_add.diagonal()
+            else:
+                matrix[ix_(loc, loc)] += A_add
         return matrix
 
     def getElementDeformation(U, modelinfo):
@@ -159,3 +243,67 @@ class StructuralBeam(Element):
 
     def getElementVolume(Model, inci, coord, tabgeo, element_number):
         return 0.0
+
+    def getElementVolumeBatch(Model, inci, coord, tabgeo):
+        return zeros(inci.shape[0], dtype=FLT64)
+
+
+_frame = dict()
+
+
+def _getFrameTable(type_shape):
+    """
+    _getFrameTable unit member (L = 1) matrices of the Euler-Bernoulli frame
+
+    Lagrange interpolation of the axial and torsion dofs, Hermite of the
+    bending (deflection and slope at each node), integrated exactly.
+
+    Returns:
+        dict of read-only arrays (edof, edof), "rotation" the slope dofs
+    """
+    table = _frame.get(type_shape)
+    if table is not None:
+        return table
+    nodes = FRAME_NODES[type_shape]
+    nnode = len(nodes)
+    edof = 6 * nnode
+    # lagrange basis, coefficients by column
+    lagrange = inv(array([[xi**kk for kk in range(nnode)] for xi in nodes], dtype=FLT64))
+    # hermite basis [v_0, s_0, v_1, s_1, ...]
+    V = zeros((2 * nnode, 2 * nnode), dtype=FLT64)
+    for aa, xi in enumerate(nodes):
+        for kk in range(2 * nnode):
+            V[2 * aa, kk] = xi**kk
+            V[2 * aa + 1, kk] = kk * xi ** (kk - 1) if kk > 0 else 0.0
+    hermite = inv(V)
+
+    def integral(basis, der):
+        nbasis = basis.shape[1]
+        A = zeros((nbasis, nbasis), dtype=FLT64)
+        for ii in range(nbasis):
+            for jj in range(nbasis):
+                pq = polymul(polyder(basis[:, ii], der), polyder(basis[:, jj], der))
+                A[ii, jj] = polyval(1.0, polyint(pq))
+        return A
+
+    table = {key: zeros((edof, edof), dtype=FLT64) for key in (
+        "axial", "torsion", "bendingxy", "bendingxz", "masstranslation", "masstorsion"
+    )}
+    bar = (integral(lagrange, 1), integral(lagrange, 0))
+    bending = (integral(hermite, 2), integral(hermite, 0))
+    for aa in range(nnode):
+        for bb in range(nnode):
+            table["axial"][6 * aa, 6 * bb] = bar[0][aa, bb]
+            table["torsion"][6 * aa + 3, 6 * bb + 3] = bar[0][aa, bb]
+            table["masstranslation"][6 * aa, 6 * bb] = bar[1][aa, bb]
+            table["masstorsion"][6 * aa + 3, 6 * bb + 3] = bar[1][aa, bb]
+    # bending xy: uy and rz, bending xz: uz and ry (slope dofs)
+    for key, dofs in (("bendingxy", (1, 5)), ("bendingxz", (2, 4))):
+        index = array([6 * aa + dd for aa in range(nnode) for dd in dofs])
+        table[key][ix_(index, index)] = bending[0]
+        table["masstranslation"][ix_(index, index)] += bending[1]
+    table["rotation"] = array([6 * aa + dd for aa in range(nnode) for dd in (4, 5)], dtype=INT32)
+    for value in table.values():
+        value.setflags(write=False)
+    _frame[type_shape] = table
+    return table
@@ -3,18 +3,24 @@ from __future__ import annotations
 from os import environ
 environ["OMP_NUM_THREADS"] = "1"
 
-from numpy import (abs, array, concatenate, dot, matmul, float64, int32, ix_, sqrt,
-                   zeros)
+from numpy import (abs, array, asarray, concatenate, dot, matmul,
+                   float64, int32, ix_, newaxis, sqrt, zeros)
 
 INT32 = int32
 FLT64 = float64
 
-from myfempy.core.elements.element import Element
-from myfempy.core.utilities import gauss_points
+from myfempy.core.descriptor import setDescriptor
+from myfempy.core.elements.element import Element, ElementSet
+from myfempy.core.material.material import getElasticTensorStack
+from myfempy.core.shapes.referenceelement import getReferenceElement
+from myfempy.core.utilities import (HOURGLASS_BASE, getLumpedMass,
+                                    getStifReducedBatch,
+                                    getStifSelectiveBatch)
 
 class StructuralPlane(Element):
     """Plane Structural Element Class <ConcreteClassService>"""
 
+    @setDescriptor(ElementSet)
     def getElementSet():
         elemset = {
             "def": "2D-space 2-node_dofs",
@@ -44,37 +50,133 @@ class StructuralPlane(Element):
 
     # @profile
     def getStifLinearMat(Model, inci, coord, tabmat, tabgeo, intgauss, element_number):
-        elem_set = StructuralPlane.getElementSet()
-        nodedof = len(elem_set["dofs"]["d"])
-        shape_set = Model.shape.getShapeSet()
-        nodecon = len(shape_set["nodes"])
-        type_shape = shape_set["key"]
-        edof = nodecon * nodedof
+        if getattr(Model, "integration", "full") != "full":
+            return StructuralPlane.getStifLinearMatBatch(
+                Model, inci[element_number : element_number + 1], coord, tabmat, tabgeo, intgauss
+            )[0]
         nodelist = Model.shape.getNodeList(inci, element_number)
         elementcoord = Model.shape.getNodeCoord(coord, nodelist)
         C = Model.material.getElasticTensor(tabmat, inci, element_number)
         t = tabgeo[int(inci[element_number, 3] - 1)]["THICKN"]
-        pt, wt = gauss_points(type_shape, intgauss)
-        K_elem_mat = zeros((edof, edof), dtype=FLT64)
-        for ip in range(intgauss):
-            for jp in range(intgauss):
-                detJ = Model.shape.getdetJacobi(array([pt[ip], pt[jp]]), elementcoord)
-                diffN = Model.shape.getDiffShapeFuntion(array([pt[ip], pt[jp]]), nodedof)
-                invJ = Model.shape.getinvJacobi(array([pt[ip], pt[jp]]), elementcoord, nodedof)
-                B = StructuralPlane.getB(diffN, invJ)
-                BCB = B.transpose().dot(C).dot(B)
-                K_elem_mat += BCB * t * abs(detJ) * wt[ip] * wt[jp]
+        # constant strain triangle: constant B, the one-point rule is exact
+        ref = getReferenceElement(Model.shape, 1)
+        if not ref.constant:
+            ref = getReferenceElement(Model.shape, intgauss)
+        weight = ref.weight
+        detJ, __, diffNx = Model.shape.getJacobianBatch(asarray(elementcoord)[newaxis], ref.intgauss)
+        B = StructuralPlane.getBBatch(diffNx[0])
+        BCB = matmul(B.transpose(0, 2, 1), matmul(C, B))
+        K_elem_mat = (BCB * (t * abs(detJ[0]) * weight)[:, newaxis, newaxis]).sum(axis=0)
         return K_elem_mat
 
+    def getBBatch(dNdx):
+        B = zeros((dNdx.shape[0], 3, 2 * dNdx.shape[2]), dtype=FLT64)
+        B[:, 0, 0::2] = dNdx[:, 0, :]
+        B[:, 1, 1::2] = dNdx[:, 1, :]
+        B[:, 2, 0::2] = dNdx[:, 1, :]
+        B[:, 2, 1::2] = dNdx[:, 0, :]
+        return B
+
+    # @profile
+    def getStifLinearMatBatch(Model, inci, coord, tabmat, tabgeo, intgauss):
+        """
+        getStifLinearMatBatch all element stiffness matrix in one pass
+
+        Returns:
+            stiffness matrix stack (nelem, edof, edof), None if the shape is not supported
+        """
+        matrix = StructuralPlane.__getMatBatch(
+            Model, inci, coord, tabmat, tabgeo, intgauss, False
+        )
+        if matrix is None:
+            return None
+        return matrix[0]
+
+    def getStifMassLinearMatBatch(Model, inci, coord, tabmat, tabgeo, intgauss):
+        """
+        getStifMassLinearMatBatch all element stiffness and consistent mass matrix in one pass
+
+        The jacobian and detJ at each integration point are shared by K and M.
+
+        Returns:
+            (stiffness, mass) matrix stacks (nelem, edof, edof), None if the shape is not supported
+        """
+        return StructuralPlane.__getMatBatch(
+            Model, inci, coord, tabmat, tabgeo, intgauss, True
+        )
+
+    def __getMatBatch(Model, inci, coord, tabmat, tabgeo, intgauss, mass):
+        shape_set = Model.shape.getShapeSet()
+        if getReferenceElement(Model.shape, 1).ndim != 2:
+            return None
+        elem_set = StructuralPlane.getElementSet()
+        nodedof = elem_set.nodedof
+        nodecon = shape_set.nodecon
+        edof = nodecon * nodedof
+        nelem = inci.shape[0]
+        nodelist = inci[:, 4 : 4 + nodecon] - 1
+        elementcoord = coord[nodelist][:, :, 1:3]
+        C = getElasticTensorStack(Model.material, tabmat)[inci[:, 2] - 1]
+        t = tabgeo["THICKN"][inci[:, 3] - 1]
+        if mass:
+            R = tabmat["RHO"][inci[:, 2] - 1]
+        if getReferenceElement(Model.shape, 1).constant:
+            # constant strain triangle: B and the area from the node coord, K = B^T C B t A
+            detJ, __, diffNx = Model.shape.getJacobianBatch(elementcoord, 1)
+            B = StructuralPlane.getBBatch(diffNx[:, 0])
+            volume = t * abs(detJ[:, 0]) * getReferenceElement(Model.shape, 1).weight[0]
+            K_elem_mat = matmul(B.transpose(0, 2, 1), matmul(C, B)) * volume[:, newaxis, newaxis]
+            M_elem_mat = None
+            if mass:
+                ref = getReferenceElement(Model.shape, intgauss)
+                N = ref.getShapeFunctions(nodedof)
+                NN = (matmul(N.transpose(0, 2, 1), N) * ref.weight[:, newaxis, newaxis]).sum(axis=0)
+                M_elem_mat = NN[newaxis, :, :] * (R * volume)[:, newaxis, newaxis]
+            return K_elem_mat, M_elem_mat
+        integration = getattr(Model, "integration", "full")
+        if integration == "reduced" and shape_set["key"] in HOURGLASS_BASE:
+            # one-point rule at the element centre, hourglass control
+            ref = getReferenceElement(Model.shape, 1)
+            detJ, __, diffNx = Model.shape.getJacobianBatch(elementcoord, 1)
+            volume = t * abs(detJ[:, 0]) * ref.weight[0]
+            K_elem_mat = getStifReducedBatch(
+                StructuralPlane.getBBatch, shape_set["key"], C, elementcoord, diffNx[:, 0], volume
+            )
+            if not mass:
+                return K_elem_mat, None
+        else:
+            K_elem_mat = None
+        ref = getReferenceElement(Model.shape, intgauss)
+        detJ, __, diffNx = Model.shape.getJacobianBatch(elementcoord, intgauss)
+        if integration == "bbar":
+            # selective reduced: mean dilatation in the element
+            K_elem_mat = getStifSelectiveBatch(
+                StructuralPlane.getBBatch, C, diffNx, t[:, newaxis] * abs(detJ) * ref.weight
+            )
+        full = K_elem_mat is None
+        if full:
+            K_elem_mat = zeros((nelem, edof, edof), dtype=FLT64)
+        if mass:
+            M_elem_mat = zeros((nelem, edof, edof), dtype=FLT64)
+            N = ref.getShapeFunctions(nodedof)
+        else:
+            M_elem_mat = None
+        for pp in range(ref.npoint):
+            scale = t * abs(detJ[:, pp]) * ref.weight[pp]
+            if full:
+                B = StructuralPlane.getBBatch(diffNx[:, pp])
+                BCB = matmul(B.transpose(0, 2, 1), matmul(C, B))
+                K_elem_mat += BCB * scale[:, newaxis, newaxis]
+            if mass:
+                NN = N[pp].transpose().dot(N[pp])
+                M_elem_mat += NN[newaxis, :, :] * (R * scale)[:, newaxis, newaxis]
+        return K_elem_mat, M_elem_mat
+
     def getMassConsistentMat(
         Model, inci, coord, tabmat, tabgeo, intgauss, element_number
     ):
         elem_set = StructuralPlane.getElementSet()
-        nodedof = len(elem_set["dofs"]["d"])
-        shape_set = Model.shape.getShapeSet()
-        nodecon = len(shape_set["nodes"])
-        type_shape = shape_set["key"]
-        edof = nodecon * nodedof
+        nodedof = elem_set.nodedof
         nodelist = Model.shape.getNodeList(inci, element_number)
         elementcoord = Model.shape.getNodeCoord(coord, nodelist)
         R = tabmat[int(inci[element_number, 2]) - 1][
@@ -83,20 +185,36 @@ class StructuralPlane(Element):
         t = tabgeo[int(inci[element_number, 3] - 1)][
             "THICKN"
         ]  # tabgeo[int(inci[element_number, 3] - 1), 4]
-        pt, wt = gauss_points(type_shape, intgauss)
-        M_elem_mat = zeros((edof, edof), dtype=FLT64)
-        for ip in range(intgauss):
-            for jp in range(intgauss):
-                detJ = Model.shape.getdetJacobi(array([pt[ip], pt[jp]]), elementcoord)
-                N = Model.shape.getShapeFunctions(array([pt[ip], pt[jp]]), nodedof)
-                NRN = N.transpose().dot(R).dot(N)
-                M_elem_mat += NRN * t * abs(detJ) * wt[ip] * wt[jp]
+        ref = getReferenceElement(Model.shape, intgauss)
+        N = ref.getShapeFunctions(nodedof)
+        detJ, __, __ = Model.shape.getJacobianBatch(asarray(elementcoord)[newaxis], intgauss)
+        NRN = matmul(N.transpose(0, 2, 1), N) * R
+        M_elem_mat = (NRN * (t * abs(detJ[0]) * ref.weight)[:, newaxis, newaxis]).sum(axis=0)
         return M_elem_mat
 
+    def getMassLumpedMat(
+        Model, inci, coord, tabmat, tabgeo, intgauss, element_number, type_lumped="hrz"
+    ):
+        """
+        getMassLumpedMat element lumped mass
+
+        Arguments:
+            type_lumped -- "hrz" or "rowsum"
+
+        Returns:
+            diagonal mass vector (edof,)
+        """
+        elem_set = StructuralPlane.getElementSet()
+        nodedof = elem_set.nodedof
+        M_elem_mat = StructuralPlane.getMassConsistentMat(
+            Model, inci, coord, tabmat, tabgeo, intgauss, element_number
+        )
+        return getLumpedMass(M_elem_mat, nodedof, type_lumped)
+
     def getUpdateMatrix(Model, matrix, addval):
         elem_set = Model.element.getElementSet()
         shape_set = Model.shape.getShapeSet()
-        dofe = len(shape_set["nodes"]) * len(elem_set["dofs"]["d"])
+        dofe = shape_set.nodecon * elem_set.nodedof
         for ii in range(len(addval)):
 
             A_add = addval[ii, 2] * array([[1.0, -1.0],
@@ -109,7 +227,11 @@ class StructuralPlane(Element):
                 ]
             )
 
-            matrix[ix_(loc, loc)] += A_add
+            if matrix.ndim == 1:
+                # lumped (diagonal) mass vector
+                matrix[loc] += A_add.diagonal()
+            else:
+                matrix[ix_(loc, loc)] += A_add
         return matrix
 
     def getElementDeformation(U, modelinfo):
@@ -126,17 +248,22 @@ class StructuralPlane(Element):
 
     def getElementVolume(Model, inci, coord, tabgeo, element_number):
         t = tabgeo[int(inci[element_number, 3] - 1)]["THICKN"]
-        shape_set = Model.shape.getShapeSet()
-        type_shape = shape_set["key"]
         nodelist = Model.shape.getNodeList(inci, element_number)
         elementcoord = Model.shape.getNodeCoord(coord, nodelist)
-        pt, wt = gauss_points(type_shape, 1)
+        ref = getReferenceElement(Model.shape, 1)
         detJ = 0.0
-        for ip in range(1):
-            for jp in range(1):
-                detJ += (
-                    abs(Model.shape.getdetJacobi(array([pt[ip], pt[jp]]), elementcoord))
-                    * wt[ip]
-                    * wt[jp]
-                )
+        for pp in range(ref.npoint):
+            detJ += abs(Model.shape.getdetJacobi(ref.getPoint(pp), elementcoord)) * ref.weight[pp]
         return detJ * t
+
+    def getElementVolumeBatch(Model, inci, coord, tabgeo):
+        """
+        getElementVolumeBatch volume (area * thickness) of all elements in one pass
+
+        Returns:
+            array (nelem,)
+        """
+        nodecon = Model.shape.getShapeSet().nodecon
+        elementcoord = coord[inci[:, 4 : 4 + nodecon] - 1][:, :, 1:3]
+        t = tabgeo["THICKN"][inci[:, 3] - 1]
+        return getReferenceElement(Model.shape, 1).getVolumeBatch(elementcoord) * t
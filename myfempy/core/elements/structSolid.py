@@ -4,18 +4,24 @@ from os import environ
 
 environ["OMP_NUM_THREADS"] = "1"
 
-from numpy import (abs, array, concatenate, dot, float64, int32, ix_, sqrt,
-                   zeros)
+from numpy import (abs, array, asarray, concatenate, dot, float64, int32, ix_,
+                   matmul, newaxis, sqrt, zeros)
 
 INT32 = int32
 FLT64 = float64
 
-from myfempy.core.elements.element import Element
-from myfempy.core.utilities import gauss_points
+from myfempy.core.descriptor import setDescriptor
+from myfempy.core.elements.element import Element, ElementSet
+from myfempy.core.material.material import getElasticTensorStack
+from myfempy.core.shapes.referenceelement import getReferenceElement
+from myfempy.core.utilities import (HOURGLASS_BASE, getLumpedMass,
+                                    getStifReducedBatch,
+                                    getStifSelectiveBatch)
 
 class StructuralSolid(Element):
     """Solid Structural Element Class <ConcreteClassService>"""
 
+    @setDescriptor(ElementSet)
     def getElementSet():
         elemset = {
             "def": "3D-space 3-node_dofs",
@@ -56,51 +62,165 @@ class StructuralSolid(Element):
 
     # @profile
     def getStifLinearMat(Model, inci, coord, tabmat, tabgeo, intgauss, element_number):
-        elem_set = StructuralSolid.getElementSet()
-        nodedof = len(elem_set["dofs"]["d"])
-        shape_set = Model.shape.getShapeSet()
-        nodecon = len(shape_set["nodes"])
-        type_shape = shape_set["key"]
-        edof = nodecon * nodedof
+        if getattr(Model, "integration", "full") != "full":
+            return StructuralSolid.getStifLinearMatBatch(
+                Model, inci[element_number : element_number + 1], coord, tabmat, tabgeo, intgauss
+            )[0]
         nodelist = Model.shape.getNodeList(inci, element_number)
         elementcoord = Model.shape.getNodeCoord(coord, nodelist)
         C = Model.material.getElasticTensor(tabmat, inci, element_number)
-        pt, wt = gauss_points(type_shape, intgauss)
-        K_elem_mat = zeros((edof, edof), dtype=FLT64)
-        for ip in range(intgauss):
-            for jp in range(intgauss):
-                for kp in range(intgauss):
-                    detJ = Model.shape.getdetJacobi(array([pt[ip], pt[jp], pt[kp]]), elementcoord)
-                    diffN = Model.shape.getDiffShapeFuntion(array([pt[ip], pt[jp], pt[kp]]), nodedof)
-                    invJ = Model.shape.getinvJacobi(array([pt[ip], pt[jp], pt[kp]]), elementcoord, nodedof)
-                    B = StructuralSolid.getB(diffN, invJ)
-                    BCB = B.transpose().dot(C).dot(B)
-                    K_elem_mat += BCB * abs(detJ) * wt[ip] * wt[jp] * wt[kp]
+        # constant strain tetrahedron: constant B, the one-point rule is exact
+        ref = getReferenceElement(Model.shape, 1)
+        if not ref.constant:
+            ref = getReferenceElement(Model.shape, intgauss)
+        weight = ref.weight
+        detJ, __, diffNx = Model.shape.getJacobianBatch(asarray(elementcoord)[newaxis], ref.intgauss)
+        B = StructuralSolid.getBBatch(diffNx[0])
+        BCB = matmul(B.transpose(0, 2, 1), matmul(C, B))
+        K_elem_mat = (BCB * (abs(detJ[0]) * weight)[:, newaxis, newaxis]).sum(axis=0)
         return K_elem_mat
 
+    def getBBatch(dNdx):
+        B = zeros((dNdx.shape[0], 6, 3 * dNdx.shape[2]), dtype=FLT64)
+        B[:, 0, 0::3] = dNdx[:, 0, :]
+        B[:, 1, 1::3] = dNdx[:, 1, :]
+        B[:, 2, 2::3] = dNdx[:, 2, :]
+        B[:, 3, 0::3] = dNdx[:, 1, :]
+        B[:, 3, 1::3] = dNdx[:, 0, :]
+        B[:, 4, 1::3] = dNdx[:, 2, :]
+        B[:, 4, 2::3] = dNdx[:, 1, :]
+        B[:, 5, 0::3] = dNdx[:, 2, :]
+        B[:, 5, 2::3] = dNdx[:, 0, :]
+        return B
+
+    # @profile
+    def getStifLinearMatBatch(Model, inci, coord, tabmat, tabgeo, intgauss):
+        """
+        getStifLinearMatBatch all element stiffness matrix in one pass
+
+        Returns:
+            stiffness matrix stack (nelem, edof, edof), None if the shape is not supported
+        """
+        matrix = StructuralSolid.__getMatBatch(
+            Model, inci, coord, tabmat, tabgeo, intgauss, False
+        )
+        if matrix is None:
+            return None
+        return matrix[0]
+
+    def getStifMassLinearMatBatch(Model, inci, coord, tabmat, tabgeo, intgauss):
+        """
+        getStifMassLinearMatBatch all element stiffness and consistent mass matrix in one pass
+
+        The jacobian and detJ at each integration point are shared by K and M.
+
+        Returns:
+            (stiffness, mass) matrix stacks (nelem, edof, edof), None if the shape is not supported
+        """
+        return StructuralSolid.__getMatBatch(
+            Model, inci, coord, tabmat, tabgeo, intgauss, True
+        )
+
+    def __getMatBatch(Model, inci, coord, tabmat, tabgeo, intgauss, mass):
+        shape_set = Model.shape.getShapeSet()
+        if getReferenceElement(Model.shape, 1).ndim != 3:
+            return None
+        elem_set = StructuralSolid.getElementSet()
+        nodedof = elem_set.nodedof
+        nodecon = shape_set.nodecon
+        edof = nodecon * nodedof
+        nelem = inci.shape[0]
+        nodelist = inci[:, 4 : 4 + nodecon] - 1
+        elementcoord = coord[nodelist][:, :, 1:4]
+        C = getElasticTensorStack(Model.material, tabmat)[inci[:, 2] - 1]
+        if mass:
+            R = tabmat["RHO"][inci[:, 2] - 1]
+        if getReferenceElement(Model.shape, 1).constant:
+            # constant strain tetrahedron: B and the volume from the node coord, K = B^T C B V
+            detJ, __, diffNx = Model.shape.getJacobianBatch(elementcoord, 1)
+            B = StructuralSolid.getBBatch(diffNx[:, 0])
+            volume = abs(detJ[:, 0]) * getReferenceElement(Model.shape, 1).weight[0]
+            K_elem_mat = matmul(B.transpose(0, 2, 1), matmul(C, B)) * volume[:, newaxis, newaxis]
+            M_elem_mat = None
+            if mass:
+                ref = getReferenceElement(Model.shape, intgauss)
+                N = ref.getShapeFunctions(nodedof)
+                NN = (matmul(N.transpose(0, 2, 1), N) * ref.weight[:, newaxis, newaxis]).sum(axis=0)
+                M_elem_mat = NN[newaxis, :, :] * (R * volume)[:, newaxis, newaxis]
+            return K_elem_mat, M_elem_mat
+        integration = getattr(Model, "integration", "full")
+        if integration == "reduced" and shape_set["key"] in HOURGLASS_BASE:
+            # one-point rule at the element centre, hourglass control
+            ref = getReferenceElement(Model.shape, 1)
+            detJ, __, diffNx = Model.shape.getJacobianBatch(elementcoord, 1)
+            volume = abs(detJ[:, 0]) * ref.weight[0]
+            K_elem_mat = getStifReducedBatch(
+                StructuralSolid.getBBatch, shape_set["key"], C, elementcoord, diffNx[:, 0], volume
+            )
+            if not mass:
+                return K_elem_mat, None
+        else:
+            K_elem_mat = None
+        ref = getReferenceElement(Model.shape, intgauss)
+        detJ, __, diffNx = Model.shape.getJacobianBatch(elementcoord, intgauss)
+        if integration == "bbar":
+            # selective reduced: mean dilatation in the element
+            K_elem_mat = getStifSelectiveBatch(
+                StructuralSolid.getBBatch, C, diffNx, abs(detJ) * ref.weight
+            )
+        full = K_elem_mat is None
+        if full:
+            K_elem_mat = zeros((nelem, edof, edof), dtype=FLT64)
+        if mass:
+            M_elem_mat = zeros((nelem, edof, edof), dtype=FLT64)
+            N = ref.getShapeFunctions(nodedof)
+        else:
+            M_elem_mat = None
+        for pp in range(ref.npoint):
+            scale = abs(detJ[:, pp]) * ref.weight[pp]
+            if full:
+                B = StructuralSolid.getBBatch(diffNx[:, pp])
+                BCB = matmul(B.transpose(0, 2, 1), matmul(C, B))
+                K_elem_mat += BCB * scale[:, newaxis, newaxis]
+            if mass:
+                NN = N[pp].transpose().dot(N[pp])
+                M_elem_mat += NN[newaxis, :, :] * (R * scale)[:, newaxis, newaxis]
+        return K_elem_mat, M_elem_mat
+
     def getMassConsistentMat(
         Model, inci, coord, tabmat, tabgeo, intgauss, element_number
     ):
         elem_set = StructuralSolid.getElementSet()
-        nodedof = len(elem_set["dofs"]["d"])
-        shape_set = Model.shape.getShapeSet()
-        nodecon = len(shape_set["nodes"])
-        type_shape = shape_set["key"]
-        edof = nodecon * nodedof
+        nodedof = elem_set.nodedof
         nodelist = Model.shape.getNodeList(inci, element_number)
         elementcoord = Model.shape.getNodeCoord(coord, nodelist)
         R = tabmat[int(inci[element_number, 2]) - 1]["RHO"]
-        pt, wt = gauss_points(type_shape, intgauss)
-        M_elem_mat = zeros((edof, edof), dtype=FLT64)
-        for ip in range(intgauss):
-            for jp in range(intgauss):
-                for kp in range(intgauss):
-                    detJ = Model.shape.getdetJacobi(array([pt[ip], pt[jp], pt[kp]]), elementcoord)
-                    N = Model.shape.getShapeFunctions(array([pt[ip], pt[jp], pt[kp]]), nodedof)
-                    NRN = N.transpose().dot(R).dot(N)
-                    M_elem_mat += NRN * abs(detJ) * wt[ip] * wt[jp] * wt[kp]
+        ref = getReferenceElement(Model.shape, intgauss)
+        N = ref.getShapeFunctions(nodedof)
+        detJ, __, __ = Model.shape.getJacobianBatch(asarray(elementcoord)[newaxis], intgauss)
+        NRN = matmul(N.transpose(0, 2, 1), N) * R
+        M_elem_mat = (NRN * (abs(detJ[0]) * ref.weight)[:, newaxis, newaxis]).sum(axis=0)
         return M_elem_mat
 
+    def getMassLumpedMat(
+        Model, inci, coord, tabmat, tabgeo, intgauss, element_number, type_lumped="hrz"
+    ):
+        """
+        getMassLumpedMat element lumped mass
+
+        Arguments:
+            type_lumped -- "hrz" or "rowsum"
+
+        Returns:
+            diagonal mass vector (edof,)
+        """
+        elem_set = StructuralSolid.getElementSet()
+        nodedof = elem_set.nodedof
+        M_elem_mat = StructuralSolid.getMassConsistentMat(
+            Model, inci, coord, tabmat, tabgeo, intgauss, element_number
+        )
+        return getLumpedMass(M_elem_mat, nodedof, type_lumped)
+
     # def getUpdateMatrix(Model, matrix, addval):
     #     elem_set = Model.element.getElementSet()
     #     shape_set = Model.shape.getShapeSet()
@@ -130,23 +250,21 @@ class StructuralSolid(Element):
         return "DISPLACEMENT"
 
     def getElementVolume(Model, inci, coord, tabgeo, element_number):
-        shape_set = Model.shape.getShapeSet()
-        type_shape = shape_set["key"]
         nodelist = Model.shape.getNodeList(inci, element_number)
         elementcoord = Model.shape.getNodeCoord(coord, nodelist)
-        pt, wt = gauss_points(type_shape, 1)
+        ref = getReferenceElement(Model.shape, 1)
         Vol = 0.0
-        for ip in range(1):
-            for jp in range(1):
-                for kp in range(1):
-                    Vol += (
-                        abs(
-                            Model.shape.getdetJacobi(
-                                array([pt[ip], pt[jp], pt[kp]]), elementcoord
-                            )
-                        )
-                        * wt[ip]
-                        * wt[jp]
-                        * wt[kp]
-                    )
-        return Vol
\ No newline at end of file
+        for pp in range(ref.npoint):
+            Vol += abs(Model.shape.getdetJacobi(ref.getPoint(pp), elementcoord)) * ref.weight[pp]
+        return Vol
+
+    def getElementVolumeBatch(Model, inci, coord, tabgeo):
+        """
+        getElementVolumeBatch volume of all elements in one pass
+
+        Returns:
+            array (nelem,)
+        """
+        nodecon = Model.shape.getShapeSet().nodecon
+        elementcoord = coord[inci[:, 4 : 4 + nodecon] - 1][:, :, 1:4]
+        return getReferenceElement(Model.shape, 1).getVolumeBatch(elementcoord)
@@ -4,6 +4,7 @@ INT32 = np.uint32
 FLT64 = np.float64
 
 from myfempy.core.material.material import Material
+from myfempy.core.shapes.referenceelement import getReferenceElement
 
 
 class HeatPlane(Material):
@@ -17,16 +18,27 @@ class HeatPlane(Material):
         return matset
 
     def getElasticTensor(tabmat, inci, element_number, Model=None):
-        Kxx = tabmat[int(inci[element_number, 2]) - 1]["KXX"]
-        Kyy = tabmat[int(inci[element_number, 2]) - 1]["KYY"]
-        D = np.zeros((2, 2), dtype=FLT64)
-        D[0, 0] = Kxx
-        D[1, 1] = Kyy
+        mat = int(inci[element_number, 2])
+        return HeatPlane.getElasticTensorStack(tabmat[mat - 1 : mat])[0]
+
+    def getElasticTensorStack(tabmat, Model=None):
+        """
+        getElasticTensorStack conductivity tensor of all materials of the table
+
+        Arguments:
+            tabmat -- material table, structured array (nmat,)
+
+        Returns:
+            array (nmat, 2, 2), index by inci[:, 2] - 1
+        """
+        D = np.zeros((len(tabmat), 2, 2), dtype=FLT64)
+        D[:, 0, 0] = tabmat["KXX"]
+        D[:, 1, 1] = tabmat["KYY"]
         return D
 
     def getElementGradTemp(Model, U, ptg, element_number):
         elem_set = Model.element.getElementSet()
-        nodedof = len(elem_set["dofs"]["d"])
+        nodedof = elem_set.nodedof
 
         nodelist = Model.shape.getNodeList(Model.inci, element_number)
 
@@ -34,13 +46,16 @@ class HeatPlane(Material):
 
         elementcoord = Model.shape.getNodeCoord(Model.coord, nodelist)
         
-        diffN = Model.shape.getDiffShapeFuntion(np.array([ptg, ptg]), nodedof)
+        # ptg: center of the one point rule, tables of the cached reference element
+        ref = getReferenceElement(Model.shape, 1)
+
+        diffN = ref.getDiffShapeFuntion(nodedof)[0]
         
-        invJ = Model.shape.getinvJacobi(np.array([ptg, ptg]), elementcoord, nodedof)
+        invJ = Model.shape.getinvJacobi(ref.getPoint(0), elementcoord, nodedof)
         
         B = Model.element.getB(diffN, invJ)
 
-        N = Model.shape.getShapeFunctions(np.array([ptg, ptg]), nodedof)
+        N = ref.getShapeFunctions(nodedof)[0]
 
         epsilon = np.dot(B, U[loc])  # B @ (U[loc])
 
@@ -62,7 +77,7 @@ class HeatPlane(Material):
 
     def getElementHeatFlux(Model, epsilon, element_number):
 
-        C = Model.material.getElasticTensor(Model.tabmat, Model.inci,  element_number)
+        C = Model.tabtensor[int(Model.inci[element_number, 2]) - 1]
 
         sigma = -1 * np.dot(C, epsilon)
 
@@ -1,5 +1,10 @@
 from abc import ABC, abstractmethod
 
+from numpy import arange, array, float64, int32, zeros
+
+INT32 = int32
+FLT64 = float64
+
 
 class Material(ABC):
     """Material API Class <ClassService>"""
@@ -14,3 +19,33 @@ class Material(ABC):
     @abstractmethod
     def getElasticTensor():
         pass
+
+    @abstractmethod
+    def getElasticTensorStack():
+        pass
+
+
+def getElasticTensorStack(material, tabmat):
+    """
+    getElasticTensorStack tensor of all materials of the table, of any material class
+
+    A material class without getElasticTensorStack (e.g. a usermaterial
+    with only getElasticTensor) gets its tensors stacked material by material.
+
+    Arguments:
+        material -- Material class
+        tabmat -- material table, structured array (nmat,)
+
+    Returns:
+        array (nmat, ntens, ntens), index by inci[:, 2] - 1
+    """
+    stack = getattr(material, "getElasticTensorStack", Material.getElasticTensorStack)
+    if stack is not Material.getElasticTensorStack:
+        return stack(tabmat)
+    nmat = len(tabmat)
+    # one element per material: [id, type, mat, geo]
+    inci = zeros((nmat, 4), dtype=INT32)
+    inci[:, 0] = arange(1, nmat + 1)
+    inci[:, 2] = arange(1, nmat + 1)
+    inci[:, 3] = 1
+    return array([material.getElasticTensor(tabmat, inci, mm) for mm in range(nmat)], dtype=FLT64)
@@ -4,6 +4,7 @@ INT32 = np.uint32
 FLT64 = np.float64
 
 from myfempy.core.material.material import Material
+from myfempy.core.shapes.referenceelement import getReferenceElement
 
 
 class SolidElastic(Material):
@@ -17,30 +18,42 @@ class SolidElastic(Material):
         return matset
 
     def getElasticTensor(tabmat, inci, element_number, Model=None):
+        mat = int(inci[element_number, 2])
+        return SolidElastic.getElasticTensorStack(tabmat[mat - 1 : mat])[0]
+
+    def getElasticTensorStack(tabmat, Model=None):
+        """
+        getElasticTensorStack elasticity tensor of all materials of the table
+
+        Arguments:
+            tabmat -- material table, structured array (nmat,)
+
+        Returns:
+            array (nmat, 6, 6), index by inci[:, 2] - 1
+        """
         # material elasticity
-        E = tabmat[int(inci[element_number, 2]) - 1]["EXX"]
+        E = tabmat["EXX"]
         # material poisson ratio
-        v = tabmat[int(inci[element_number, 2]) - 1][ "VXY"] 
-        
-        D = np.zeros((6, 6))
+        v = tabmat["VXY"]
+        D = np.zeros((len(tabmat), 6, 6), dtype=FLT64)
         fac = 1.0 / (2.0 * v * v + v - 1.0)
-        D[0, 0] = fac * E * (v - 1.0)
-        D[0, 1] = -1.0 * fac * E * v
-        D[0, 2] = D[0, 1]
-        D[1, 0] = D[0, 1]
-        D[1, 1] = D[0, 0]
-        D[1, 2] = D[0, 1]
-        D[2, 0] = D[0, 1]
-        D[2, 1] = D[0, 1]
-        D[2, 2] = D[0, 0]
-        D[3, 3] = E / (2.0 + 2.0 * v)
-        D[4, 4] = D[3, 3]
-        D[5, 5] = D[3, 3]
+        D[:, 0, 0] = fac * E * (v - 1.0)
+        D[:, 0, 1] = -1.0 * fac * E * v
+        D[:, 0, 2] = D[:, 0, 1]
+        D[:, 1, 0] = D[:, 0, 1]
+        D[:, 1, 1] = D[:, 0, 0]
+        D[:, 1, 2] = D[:, 0, 1]
+        D[:, 2, 0] = D[:, 0, 1]
+        D[:, 2, 1] = D[:, 0, 1]
+        D[:, 2, 2] = D[:, 0, 0]
+        D[:, 3, 3] = E / (2.0 + 2.0 * v)
+        D[:, 4, 4] = D[:, 3, 3]
+        D[:, 5, 5] = D[:, 3, 3]
         return D
 
     def getElementStrain(Model, U, ptg, element_number):
         elem_set = Model.element.getElementSet()
-        nodedof = len(elem_set["dofs"]["d"])
+        nodedof = elem_set.nodedof
 
         nodelist = Model.shape.getNodeList(Model.inci, element_number)
 
@@ -48,9 +61,12 @@ class SolidElastic(Material):
 
         elementcoord = Model.shape.getNodeCoord(Model.coord, nodelist)
 
-        diffN = Model.shape.getDiffShapeFuntion(np.array([ptg, ptg, ptg]), nodedof)
+        # ptg: center of the one point rule, tables of the cached reference element
+        ref = getReferenceElement(Model.shape, 1)
+
+        diffN = ref.getDiffShapeFuntion(nodedof)[0]
         
-        invJ = Model.shape.getinvJacobi(np.array([ptg, ptg, ptg]), elementcoord, nodedof)
+        invJ = Model.shape.getinvJacobi(ref.getPoint(0), elementcoord, nodedof)
 
         B = Model.element.getB(diffN, invJ)
 
@@ -99,7 +115,7 @@ class SolidElastic(Material):
 
     def getElementStress(Model, epsilon, element_number):
 
-        C = Model.material.getElasticTensor(Model.tabmat, Model.inci,  element_number)
+        C = Model.tabtensor[int(Model.inci[element_number, 2]) - 1]
 
         sigma = C.dot(epsilon) #np.dot(C, epsilon)
 
@@ -4,6 +4,7 @@ INT32 = np.uint32
 FLT64 = np.float64
 
 from myfempy.core.material.material import Material
+from myfempy.core.shapes.referenceelement import getReferenceElement
 from myfempy.core.utilities import get3D_LocalVector, getRotational_Matrix
 
 
@@ -18,18 +19,31 @@ class UniAxialStress(Material):
         return matset
 
     def getElasticTensor(tabmat, inci, element_number, Model=None):
-        E = tabmat[int(inci[element_number, 2]) - 1]["EXX"]
-        G = tabmat[int(inci[element_number, 2]) - 1]["GXY"]
-        C = np.zeros((4, 4), dtype=FLT64)
-        C[0, 0] = E
-        C[1, 1] = E
-        C[2, 2] = E
-        C[3, 3] = G
+        mat = int(inci[element_number, 2])
+        return UniAxialStress.getElasticTensorStack(tabmat[mat - 1 : mat])[0]
+
+    def getElasticTensorStack(tabmat, Model=None):
+        """
+        getElasticTensorStack elasticity tensor of all materials of the table
+
+        Arguments:
+            tabmat -- material table, structured array (nmat,)
+
+        Returns:
+            array (nmat, 4, 4), index by inci[:, 2] - 1
+        """
+        E = tabmat["EXX"]
+        G = tabmat["GXY"]
+        C = np.zeros((len(tabmat), 4, 4), dtype=FLT64)
+        C[:, 0, 0] = E
+        C[:, 1, 1] = E
+        C[:, 2, 2] = E
+        C[:, 3, 3] = G
         return C
 
     def getElementStrain(Model, U, ptg, element_number):
         elem_set = Model.element.getElementSet()
-        nodedof = len(elem_set["dofs"]["d"])
+        nodedof = elem_set.nodedof
         shape_set = Model.shape.getShapeSet()
         type_shape = shape_set["key"]
 
@@ -49,9 +63,12 @@ class UniAxialStress(Material):
         else:
             elementcoord_local = get3D_LocalVector(elementcoord, 2)
 
-        diffN = Model.shape.getDiffDiffShapeFuntion(np.array([ptg]), nodedof)
+        # ptg: center of the one point rule, tables of the cached reference element
+        ref = getReferenceElement(Model.shape, 1)
+
+        diffN = ref.getDiffDiffShapeFuntion(nodedof)[0]
         
-        invJ = Model.shape.getinvJacobi(np.array([ptg]), elementcoord, nodedof)
+        invJ = Model.shape.getinvJacobi(ref.getPoint(0), elementcoord, nodedof)
         
         B = Model.element.getB(diffN, invJ)
 
@@ -97,7 +114,7 @@ class UniAxialStress(Material):
 
     def getElementStress(Model, epsilon, element_number):
 
-        C = Model.material.getElasticTensor(Model.tabmat, Model.inci,  element_number)
+        C = Model.tabtensor[int(Model.inci[element_number, 2]) - 1]
 
         sigma = np.dot(C, epsilon)
 
@@ -4,7 +4,9 @@ import numpy as np
 from scipy.special import roots_legendre
 
 from myfempy.core.physic.structural import Structural
-from myfempy.core.utilities import (gauss_points, get_elemen_from_nodelist,
+from myfempy.core.shapes.referenceelement import getReferenceElement
+from myfempy.core.utilities import (getGaussQuadrature,
+                                    get_elemen_from_nodelist,
                                     get_nodes_from_list, poly_area,
                                     unit_normal)
 
@@ -157,7 +159,7 @@ class LoadStructural(Structural):
             )
 
             elem_set = Model.element.getElementSet()
-            nodedof = len(elem_set["dofs"]["d"])
+            nodedof = elem_set.nodedof
 
             if len(force_value_vector) > len(nodelist):
                 nodelist = np.repeat(nodelist, nodedof)
@@ -229,7 +231,7 @@ class LoadStructural(Structural):
             )
 
             elem_set = Model.element.getElementSet()
-            nodedof = len(elem_set["dofs"]["d"])
+            nodedof = elem_set.nodedof
 
             if len(force_value_vector) > len(nodelist):
                 nodelist = np.repeat(nodelist, int(len(force_value_vector) / nodedof))
@@ -307,7 +309,7 @@ class LoadStructural(Structural):
             )
 
             elem_set = Model.element.getElementSet()
-            nodedof = len(elem_set["dofs"]["d"])
+            nodedof = elem_set.nodedof
 
             nodes = nodeslist
             if len(force_value_vector) > len(nodeslist):
@@ -364,25 +366,22 @@ class LoadStructural(Structural):
     ):
         # body force
         elem_set = Model.element.getElementSet()
-        nodedof = len(elem_set["dofs"]["d"])
+        nodedof = elem_set.nodedof
         shape_set = Model.shape.getShapeSet()
-        nodecon = len(shape_set["nodes"])
-        type_shape = shape_set["key"]
+        nodecon = shape_set.nodecon
         edof = nodecon * nodedof
         nodelist = Model.shape.getNodeList(inci, element_number)
         elementcoord = Model.shape.getNodeCoord(coord, nodelist)
         R = tabmat[int(inci[element_number, 2]) - 1]["RHO"]
-        pt, wt = gauss_points(type_shape, intgauss)
+        ref = getReferenceElement(Model.shape, intgauss)
+        N = ref.getShapeFunctions(nodedof)
         G = gravity_value
         W = np.zeros((nodedof, 1))
         W[fc_type_dof - 1, 0] = R * G
         force_value_vector = np.zeros((edof, 1))
-        for ip in range(intgauss):
-            for jp in range(intgauss):
-                for kp in range(intgauss):
-                    detJ = Model.shape.getdetJacobi(np.array([pt[ip], pt[jp], pt[kp]]), elementcoord)
-                    N = Model.shape.getShapeFunctions(np.array([pt[ip], pt[jp], pt[kp]]), nodedof)
-                    force_value_vector += np.dot(N.transpose(), W) * abs(detJ) * wt[ip] * wt[jp] * wt[kp]
+        detJ, __, __ = Model.shape.getJacobianBatch(np.asarray(elementcoord)[np.newaxis], intgauss)
+        for pp in range(ref.npoint):
+            force_value_vector += np.dot(N[pp].transpose(), W) * abs(detJ[0, pp]) * ref.weight[pp]
         force_value_vector = force_value_vector[np.nonzero(force_value_vector)]
         # force_value_vector = np.reshape(force_value_vector, (edof))
         return force_value_vector, nodelist
@@ -399,9 +398,9 @@ class LoadStructural(Structural):
         fc_type,
     ):
         elem_set = Model.element.getElementSet()
-        nodedof = len(elem_set["dofs"]["d"])
+        nodedof = elem_set.nodedof
         shape_set = Model.shape.getShapeSet()
-        nodecon = len(shape_set["nodes"])
+        nodecon = shape_set.nodecon
         type_shape = shape_set["key"]
         edof = nodecon * nodedof
         nodelist = Model.shape.getNodeList(inci, element_number - 1)
@@ -437,14 +436,14 @@ class LoadStructural(Structural):
                 norm = (norm >= 1e-6).astype(int) #norm/norm        
             else:
                 T = np.array([[0.0], [0.0]])
-            pt, wt = gauss_points(type_shape, intgauss)
+            pt, wt = getGaussQuadrature(type_shape, intgauss, 1)
             force_value_vector = np.zeros((edof, 1))
-            for ip in range(intgauss):
-                points = Model.shape.getIsoParaSide(get_side, pt[ip])
+            for gp in range(wt.shape[0]):
+                points = Model.shape.getIsoParaSide(get_side, pt[gp, 0])
                 N = Model.shape.getShapeFunctions(np.array(points), nodedof)
                 J = Model.shape.getJacobian(np.array(points), elementcoord)
                 detJ_e = Model.shape.getEdgeLength(J, get_side)
-                force_value_vector += (np.dot(np.array(N).transpose(), T) * t * abs(detJ_e) * wt[ip])
+                force_value_vector += (np.dot(np.array(N).transpose(), T) * t * abs(detJ_e) * wt[gp])
             force_value_vector = force_value_vector[np.nonzero(force_value_vector)]
         return force_value_vector, nodes, norm
 
@@ -460,9 +459,9 @@ class LoadStructural(Structural):
         fc_type,
     ):
         elem_set = Model.element.getElementSet()
-        nodedof = len(elem_set["dofs"]["d"])
+        nodedof = elem_set.nodedof
         shape_set = Model.shape.getShapeSet()
-        nodecon = len(shape_set["nodes"])
+        nodecon = shape_set.nodecon
         type_shape = shape_set["key"]
         edof = nodecon * nodedof
         nodelist = Model.shape.getNodeList(inci, element_number - 1)
@@ -496,20 +495,17 @@ class LoadStructural(Structural):
                 norm = (norm >= 1e-6).astype(int) #norm/norm 
             else:
                 T = np.array([[0.0], [0.0], [0.0]])
-            pt, wt = gauss_points(type_shape, intgauss)
+            pt, wt = getGaussQuadrature(type_shape, intgauss, 2)
             force_value_vector = np.zeros((edof, 1))
-            for ip in range(intgauss):
-                for jp in range(intgauss):
-                    points = Model.shape.getIsoParaSide(get_side, [pt[ip], pt[jp]]) # [pt[ip], pt[jp]]
-                    N = Model.shape.getShapeFunctions(np.array(points), nodedof)
-                    # J = Model.shape.getJacobian(np.array(points), elementcoord)
-                    detJ_a = Model.shape.getAreaLength(get_side, elementcoord)
-                    force_value_vector += (
-                        np.dot(np.array(N).transpose(), T)
-                        * abs(detJ_a)
-                        * wt[ip]
-                        * wt[jp]
-                    )
+            detJ_a = Model.shape.getAreaLength(get_side, elementcoord)
+            for gp in range(wt.shape[0]):
+                points = Model.shape.getIsoParaSide(get_side, pt[gp])
+                N = Model.shape.getShapeFunctions(np.array(points), nodedof)
+                force_value_vector += (
+                    np.dot(np.array(N).transpose(), T)
+                    * abs(detJ_a)
+                    * wt[gp]
+                )
             
             # if fc_type == "pressure":
             #     force_value_vector = force_value_vector[np.nonzero(force_value_vector)]
@@ -531,9 +527,9 @@ class LoadStructural(Structural):
         fc_type,
     ):
         elem_set = Model.element.getElementSet()
-        nodedof = len(elem_set["dofs"]["d"])
+        nodedof = elem_set.nodedof
         shape_set = Model.shape.getShapeSet()
-        nodecon = len(shape_set["nodes"])
+        nodecon = shape_set.nodecon
         type_shape = shape_set["key"]
         edof = nodecon * nodedof
         nodelist = Model.shape.getNodeList(inci, element_number - 1)
@@ -579,15 +575,15 @@ class LoadStructural(Structural):
                 T = np.array([[0.0], [0.0]])
             idx_conec = np.array2string(idx_conec)
             get_side = Model.shape.getSideAxis(idx_conec[1:-1])
-            pt, wt = gauss_points(type_shape, intgauss)
+            pt, wt = getGaussQuadrature(type_shape, intgauss, 1)
             force_value_vector = np.zeros((edof, 1))
-            for ip in range(intgauss):
-                points = Model.shape.getIsoParaSide(get_side, pt[ip])
+            for gp in range(wt.shape[0]):
+                points = Model.shape.getIsoParaSide(get_side, pt[gp, 0])
                 N = Model.shape.getShapeFunctions(np.array(points), nodedof)
                 J = Model.shape.getJacobian(np.array(points), elementcoord)
                 detJ_e = Model.shape.getEdgeLength(J, get_side)
                 force_value_vector += (
-                    np.dot(np.array(N).transpose(), T) * abs(detJ_e) * wt[ip]
+                    np.dot(np.array(N).transpose(), T) * abs(detJ_e) * wt[gp]
                 )
             force_value_vector = force_value_vector[np.nonzero(force_value_vector)]
         return force_value_vector, nodes, norm
@@ -4,7 +4,9 @@ import numpy as np
 from scipy.special import roots_legendre
 
 from myfempy.core.physic.thermal import Thermal
-from myfempy.core.utilities import (gauss_points, get_elemen_from_nodelist,
+from myfempy.core.shapes.referenceelement import getReferenceElement
+from myfempy.core.utilities import (getGaussQuadrature,
+                                    get_elemen_from_nodelist,
                                     get_nodes_from_list, poly_area)
 
 
@@ -252,22 +254,19 @@ class LoadThermal(Thermal):
         fc_type_dof,
     ):
         elem_set = Model.element.getElementSet()
-        nodedof = len(elem_set["dofs"]["d"])
+        nodedof = elem_set.nodedof
         shape_set = Model.shape.getShapeSet()
-        nodecon = len(shape_set["nodes"])
-        type_shape = shape_set["key"]
+        nodecon = shape_set.nodecon
         edof = nodecon * nodedof
         nodelist = Model.shape.getNodeList(inci, element_number)
         elementcoord = Model.shape.getNodeCoord(coord, nodelist)
-        pt, wt = gauss_points(type_shape, intgauss)
+        ref = getReferenceElement(Model.shape, intgauss)
+        N = ref.getShapeFunctions(nodedof)
         Q = heat_gen
         force_value_vector = np.zeros((edof, 1))
-        for ip in range(intgauss):
-            for jp in range(intgauss):
-                for kp in range(intgauss):
-                    detJ = Model.shape.getdetJacobi(np.array([pt[ip], pt[jp], pt[kp]]), elementcoord)
-                    N = Model.shape.getShapeFunctions(np.array([pt[ip], pt[jp], pt[kp]]), nodedof)
-                    force_value_vector += np.dot(N.transpose(), Q) * abs(detJ) * wt[ip] * wt[jp] * wt[kp]
+        detJ, __, __ = Model.shape.getJacobianBatch(np.asarray(elementcoord)[np.newaxis], intgauss)
+        for pp in range(ref.npoint):
+            force_value_vector += np.dot(N[pp].transpose(), Q) * abs(detJ[0, pp]) * ref.weight[pp]
         force_value_vector = force_value_vector[np.nonzero(force_value_vector)]
         return force_value_vector, nodelist
 
@@ -283,9 +282,9 @@ class LoadThermal(Thermal):
         fc_type,
     ):
         elem_set = Model.element.getElementSet()
-        nodedof = len(elem_set["dofs"]["d"])
+        nodedof = elem_set.nodedof
         shape_set = Model.shape.getShapeSet()
-        nodecon = len(shape_set["nodes"])
+        nodecon = shape_set.nodecon
         type_shape = shape_set["key"]
         edof = nodecon * nodedof
         nodelist = Model.shape.getNodeList(inci, element_number - 1)
@@ -310,15 +309,14 @@ class LoadThermal(Thermal):
             else:
                 idx_conec = np.array2string(idx_conec)
                 get_side = Model.shape.getSideAxis(idx_conec[1:-1])
-                pt, wt = gauss_points(type_shape, intgauss)
+                pt, wt = getGaussQuadrature(type_shape, intgauss, 1)
                 force_value_vector = np.zeros((edof, 1))
-                for ip in range(intgauss):
-                    points = Model.shape.getIsoParaSide(get_side, pt[ip])
+                for gp in range(wt.shape[0]):
+                    points = Model.shape.getIsoParaSide(get_side, pt[gp, 0])
                     N = Model.shape.getShapeFunctions(np.array(points), nodedof)
-                    diffN = Model.shape.getDiffShapeFuntion(np.array(points), nodedof)
                     J = Model.shape.getJacobian(np.array(points), elementcoord)
                     detJ_e = Model.shape.getEdgeLength(J, get_side)
-                    force_value_vector += (np.dot(N.transpose(), q) * t * abs(detJ_e) * wt[ip])
+                    force_value_vector += (np.dot(N.transpose(), q) * t * abs(detJ_e) * wt[gp])
                 force_value_vector = force_value_vector[np.nonzero(force_value_vector)]
         return force_value_vector, nodes, norm
 
@@ -334,9 +332,9 @@ class LoadThermal(Thermal):
         fc_type,
     ):
         elem_set = Model.element.getElementSet()
-        nodedof = len(elem_set["dofs"]["d"])
+        nodedof = elem_set.nodedof
         shape_set = Model.shape.getShapeSet()
-        nodecon = len(shape_set["nodes"])
+        nodecon = shape_set.nodecon
         type_shape = shape_set["key"]
         edof = nodecon * nodedof
         nodelist = Model.shape.getNodeList(inci, element_number - 1)
@@ -357,13 +355,12 @@ class LoadThermal(Thermal):
             else:
                 idx_conec = np.array2string(nodes_conec)
                 get_side = Model.shape.getSideAxis(idx_conec[1:-1])
-                pt, wt = gauss_points(type_shape, intgauss)
+                pt, wt = getGaussQuadrature(type_shape, intgauss, 2)
                 force_value_vector = np.zeros((edof, 1))
-                for ip in range(intgauss):
-                    for jp in range(intgauss):
-                        points = Model.shape.getIsoParaSide(get_side, [pt[ip], pt[jp]]) # [pt[ip], pt[jp]]
-                        N = Model.shape.getShapeFunctions(np.array(points), nodedof)
-                        detJ_a = Model.shape.getAreaLength(get_side, elementcoord)
-                        force_value_vector += (np.dot(N.transpose(), q) * abs(detJ_a) * wt[ip] * wt[jp])
+                detJ_a = Model.shape.getAreaLength(get_side, elementcoord)
+                for gp in range(wt.shape[0]):
+                    points = Model.shape.getIsoParaSide(get_side, pt[gp])
+                    N = Model.shape.getShapeFunctions(np.array(points), nodedof)
+                    force_value_vector += (np.dot(N.transpose(), q) * abs(detJ_a) * wt[gp])
                 force_value_vector = force_value_vector[np.nonzero(force_value_vector)]
         return force_value_vector, nodes, norm
\ No newline at end of file
@@ -5,7 +5,8 @@ from scipy.special import roots_legendre
 
 from myfempy.core.physic.loadstruct import LoadStructural
 from myfempy.core.physic.structural import Structural
-from myfempy.core.utilities import (gauss_points, get_elemen_from_nodelist,
+from myfempy.core.shapes.referenceelement import getReferenceElement
+from myfempy.core.utilities import (get_elemen_from_nodelist,
                                     get_nodes_from_list, poly_area)
 
 
@@ -89,25 +90,22 @@ class ThermalStructuralCoupling(Structural):
     ):
         # body force
         elem_set = Model.element.getElementSet()
-        nodedof = len(elem_set["dofs"]["d"])
+        nodedof = elem_set.nodedof
         shape_set = Model.shape.getShapeSet()
-        nodecon = len(shape_set["nodes"])
-        type_shape = shape_set["key"]
+        nodecon = shape_set.nodecon
         edof = nodecon * nodedof
         nodelist = Model.shape.getNodeList(inci, element_number)
         elementcoord = Model.shape.getNodeCoord(coord, nodelist)
         a = tabmat[int(inci[element_number, 2]) - 1]["CTE"]
         C = Model.material.getElasticTensor(tabmat, inci, element_number)
-        pt, wt = gauss_points(type_shape, intgauss)
+        ref = getReferenceElement(Model.shape, intgauss)
+        diffN = ref.getDiffShapeFuntion(nodedof)
         W = np.zeros((nodedof, 1))
         force_value_vector = np.zeros((edof, 1))
-        for ip in range(intgauss):
-            for jp in range(intgauss):
-                for kp in range(intgauss):
-                    detJ = Model.shape.getdetJacobi(np.array([pt[ip], pt[jp], pt[kp]]), elementcoord)
-                    diffN = Model.shape.getDiffShapeFuntion(np.array([pt[ip], pt[jp], pt[kp]]), nodedof)
-                    invJ = Model.shape.getinvJacobi(np.array([pt[ip], pt[jp], pt[kp]]), elementcoord, nodedof)
-                    B = Model.element.getB(diffN, invJ)
-                    force_value_vector += np.dot(np.dot(B.transpose(), C), strain_thermal.reshape((-1,1))) * (a * abs(detJ) * wt[ip] * wt[jp] * wt[kp])
+        for pp in range(ref.npoint):
+            detJ = Model.shape.getdetJacobi(ref.getPoint(pp), elementcoord)
+            invJ = Model.shape.getinvJacobi(ref.getPoint(pp), elementcoord, nodedof)
+            B = Model.element.getB(diffN[pp], invJ)
+            force_value_vector += np.dot(np.dot(B.transpose(), C), strain_thermal.reshape((-1,1))) * (a * abs(detJ) * ref.weight[pp])
         force_value_vector = np.reshape(force_value_vector, (edof))
         return force_value_vector, nodelist
@@ -2,12 +2,14 @@ from __future__ import annotations
 
 from numpy import sqrt
 
-from myfempy.core.shapes.line3_tasks import (DiffDiffShapeFuntion,
-                                             DiffShapeFuntion, Jacobian,
-                                             LocKey, NodeCoord, NodeList,
-                                             ShapeFunctions, detJacobi,
-                                             invJacobi)
-from myfempy.core.shapes.shape import Shape
+from myfempy.core.backends import getShapeTasks
+from myfempy.core.descriptor import setDescriptor
+from myfempy.core.shapes.referenceelement import getReferenceElement
+from myfempy.core.shapes.shape import Shape, ShapeSet
+
+# compiled line3_tasks when built, else the pure NumPy shape tasks
+tasks = getShapeTasks("line3")
+
 
 # from myfempy.core.utilities import getRotational_3dVector
 
@@ -15,6 +17,7 @@ from myfempy.core.shapes.shape import Shape
 class Line3(Shape):
     """Line 3-Node Shape Class <ConcreteClassService>"""
 
+    @setDescriptor(ShapeSet)
     def getShapeSet():
         shapeset = {
             "def": "3-nodes_conec 2-interpol_order",
@@ -36,31 +39,34 @@ class Line3(Shape):
         return isops[side]
 
     def getShapeFunctions(r_coord, nodedof):
-        return ShapeFunctions(r_coord, nodedof)
+        return tasks.ShapeFunctions(r_coord, nodedof)
 
     def getDiffShapeFuntion(r_coord, nodedof):
-        return DiffShapeFuntion(r_coord, nodedof)
+        return tasks.DiffShapeFuntion(r_coord, nodedof)
 
     def getDiffDiffShapeFuntion(r_coord, nodedof):
-        return DiffDiffShapeFuntion(r_coord, nodedof)
+        return tasks.DiffDiffShapeFuntion(r_coord, nodedof)
 
     def getJacobian(r_coord, element_coord):
-        return Jacobian(r_coord, element_coord)
+        return tasks.Jacobian(r_coord, element_coord)
 
     def getinvJacobi(r_coord, element_coord, nodedof):
-        return invJacobi(r_coord, element_coord, nodedof)
+        return tasks.invJacobi(r_coord, element_coord, nodedof)
 
     def getdetJacobi(r_coord, element_coord):
-        return detJacobi(r_coord, element_coord)
+        return tasks.detJacobi(r_coord, element_coord)
+
+    def getJacobianBatch(element_coords, intgauss):
+        return getReferenceElement(Line3, intgauss).getJacobianBatch(element_coords)
 
     def getNodeList(inci, element_number):
-        return NodeList(inci, element_number)
+        return tasks.NodeList(inci, element_number)
 
     def getNodeCoord(coord, node_list):
-        return NodeCoord(coord, node_list)
+        return tasks.NodeCoord(coord, node_list)
 
     def getLocKey(node_list, nodedof):
-        return LocKey(node_list, nodedof)
+        return tasks.LocKey(node_list, nodedof)
 
     def getEdgeLength(J, side):
 
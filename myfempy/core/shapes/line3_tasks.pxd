@@ -0,0 +1,15 @@
+cimport numpy as np
+
+ctypedef np.int32_t INT32
+ctypedef np.float64_t FLT64
+
+# nogil kernels writing in caller buffers, for the compiled element loops (cimport from this module)
+cdef void ShapeFunctionsOut(const FLT64 [::1] r_coord, INT32 nodedof, FLT64 [:, ::1] out) noexcept nogil
+cdef void DiffShapeFuntionOut(const FLT64 [::1] r_coord, INT32 nodedof, FLT64 [:, ::1] out) noexcept nogil
+cdef void DiffDiffShapeFuntionOut(const FLT64 [::1] r_coord, INT32 nodedof, FLT64 [:, ::1] out) noexcept nogil
+cdef void JacobianOut(const FLT64 [::1] r_coord, const FLT64 [:, ::1] element_coord, FLT64 [:, ::1] out) noexcept nogil
+cdef void invJacobiOut(const FLT64 [::1] r_coord, const FLT64 [:, ::1] element_coord, INT32 nodedof, FLT64 [:, ::1] out) noexcept nogil
+cdef FLT64 detJacobiOut(const FLT64 [::1] r_coord, const FLT64 [:, ::1] element_coord) noexcept nogil
+cdef void NodeListOut(const INT32 [:, ::1] inci, Py_ssize_t element_number, INT32 [::1] out) noexcept nogil
+cdef void NodeCoordOut(const FLT64 [:, ::1] coord, const INT32 [::1] node_list, FLT64 [:, ::1] out) noexcept nogil
+cdef void LocKeyOut(const INT32 [::1] node_list, INT32 nodedof, INT32 [::1] out) noexcept nogil
@@ -7,203 +7,234 @@ from cython.parallel import parallel, prange
 cimport numpy as np
 
 DTYPE = np.float64
-ctypedef np.int32_t INT32
-ctypedef np.float64_t FLT64
+
+# INT32, FLT64 and the nogil kernels (*Out) are declared in line3_tasks.pxd
+
+@cdivision(True)
+@exceptval(check=False)
+@boundscheck(False) # turn off bounds-checking for entire function
+@wraparound(False)  # turn off negative index wrapping for entire function
+@nonecheck(False)
+cdef inline void MATDIFFN(const FLT64 [::1] r, FLT64 * dN) noexcept nogil:
+    # dN/dr (1, 9), on the x y z of each node
+    cdef FLT64 r0 = r[0]
+    dN[0] = -0.5 + r0
+    dN[1] = 0.0
+    dN[2] = 0.0
+    dN[3] = 0.5 + r0
+    dN[4] = 0.0
+    dN[5] = 0.0
+    dN[6] = -2.0*r0
+    dN[7] = 0.0
+    dN[8] = 0.0
+
+@cdivision(True)
+@exceptval(check=False)
+@boundscheck(False) # turn off bounds-checking for entire function
+@wraparound(False)  # turn off negative index wrapping for entire function
+@nonecheck(False)
+cdef inline FLT64 JACOBIANO(const FLT64 [::1] r_coord, const FLT64 [:, ::1] element_coord) noexcept nogil:
+    cdef FLT64 diffN[9]
+    cdef Py_ssize_t kk
+    cdef FLT64 jac
+    MATDIFFN(r_coord, diffN)
+    jac = diffN[0]*element_coord[0, 0]
+    for kk in range(1, 9):
+        jac = jac + diffN[kk]*element_coord[kk, 0]
+    return jac
 
 @cdivision(True)
 @exceptval(check=False)
 @boundscheck(False) # turn off bounds-checking for entire function
-@wraparound(False)  # turn off negative index wrapping for entire function           
-@nonecheck(False) 
-cdef FLT64 [:, ::1] MATN(FLT64 [::1] r_coord):
+@wraparound(False)  # turn off negative index wrapping for entire function
+@nonecheck(False)
+cdef void ShapeFunctionsOut(const FLT64 [::1] r_coord, INT32 nodedof, FLT64 [:, ::1] out) noexcept nogil:
+    # out (4, 18)
     cdef FLT64 r0 = r_coord[0]
-    N = np.zeros((4, 18), dtype=np.float64)
-    cdef FLT64 [:, ::1] N_view = N
-    N_view[0, 0] = 0.5*(1 - r0) - 0.5*(1 - r0**2)
-    N_view[0, 6] = 0.5*(1 + r0) - 0.5*(1 - r0**2)
-    N_view[0, 12] = 1 - r0**2
-    N_view[1, 1] = 0.25*(3*r0**5 - 2*r0**4 - 5*r0**3 + 4*r0**2)
-    N_view[1, 5] = 0.25*(0.5*r0**5 - 0.5*r0**4 - 0.5*r0**3 + 0.5*r0**2)
-    N_view[1, 7] = 0.25*(-3*r0**5 - 2*r0**4 + 5*r0**3 + 4*r0**2)
-    N_view[1, 11] = 0.25*(0.5*r0**5 + 0.5*r0**4 - 0.5*r0**3 - 0.5*r0**2)
-    N_view[1, 13] = 0.25*(4*r0**4 - 8*r0**2 + 4)
-    N_view[1, 17] = 0.25*(2*r0**5 - 4*r0**3 + 2*r0)
-    N_view[2, 2] = 0.25*(3*r0**5 - 2*r0**4 -5*r0**3 + 4*r0**2)
-    N_view[2, 4] = 0.25*(0.5*r0**5 - 0.5*r0**4 - 0.5*r0**3 + 0.5*r0**2)
-    N_view[2, 8] = 0.25*(-3*r0**5 - 2*r0**4 + 5*r0**3 + 4*r0**2)
-    N_view[2, 10] = 0.25*(0.5*r0**5 + 0.5*r0**4 - 0.5*r0**3 - 0.5*r0**2)
-    N_view[2, 14] = 0.25*(4*r0**4 - 8*r0**2 + 4)
-    N_view[2, 16] = 0.25*(2*r0**5 - 4*r0**3 + 2*r0)
-    N_view[3, 3] = 0.5*(1 - r0) - 0.5*(1 - r0**2)
-    N_view[3, 9] = 0.5*(1 + r0) - 0.5*(1 - r0**2)
-    N_view[3, 15] = 1 - r0**2
-    return N
+    out[:, :] = 0.0
+    out[0, 0] = 0.5*(1 - r0) - 0.5*(1 - r0**2)
+    out[0, 6] = 0.5*(1 + r0) - 0.5*(1 - r0**2)
+    out[0, 12] = 1 - r0**2
+    out[1, 1] = 0.25*(3*r0**5 - 2*r0**4 - 5*r0**3 + 4*r0**2)
+    out[1, 5] = 0.25*(0.5*r0**5 - 0.5*r0**4 - 0.5*r0**3 + 0.5*r0**2)
+    out[1, 7] = 0.25*(-3*r0**5 - 2*r0**4 + 5*r0**3 + 4*r0**2)
+    out[1, 11] = 0.25*(0.5*r0**5 + 0.5*r0**4 - 0.5*r0**3 - 0.5*r0**2)
+    out[1, 13] = 0.25*(4*r0**4 - 8*r0**2 + 4)
+    out[1, 17] = 0.25*(2*r0**5 - 4*r0**3 + 2*r0)
+    out[2, 2] = 0.25*(3*r0**5 - 2*r0**4 -5*r0**3 + 4*r0**2)
+    out[2, 4] = 0.25*(0.5*r0**5 - 0.5*r0**4 - 0.5*r0**3 + 0.5*r0**2)
+    out[2, 8] = 0.25*(-3*r0**5 - 2*r0**4 + 5*r0**3 + 4*r0**2)
+    out[2, 10] = 0.25*(0.5*r0**5 + 0.5*r0**4 - 0.5*r0**3 - 0.5*r0**2)
+    out[2, 14] = 0.25*(4*r0**4 - 8*r0**2 + 4)
+    out[2, 16] = 0.25*(2*r0**5 - 4*r0**3 + 2*r0)
+    out[3, 3] = 0.5*(1 - r0) - 0.5*(1 - r0**2)
+    out[3, 9] = 0.5*(1 + r0) - 0.5*(1 - r0**2)
+    out[3, 15] = 1 - r0**2
 
 @cdivision(True)
 @exceptval(check=False)
 @boundscheck(False) # turn off bounds-checking for entire function
-@wraparound(False)  # turn off negative index wrapping for entire function           
-@nonecheck(False) 
-cdef FLT64 [:, ::1] MATDIFFN(FLT64 [::1] r):
-    cdef FLT64 r0 = r[0]
-    dN = np.zeros((1,9), dtype=np.float64)
-    cdef FLT64 [:, ::1] dN_view = dN
-    dN_view[0, 0] = -0.5 + r0
-    dN_view[0, 3] = 0.5 + r0
-    dN_view[0, 6] = -2.0*r0
-    return dN
+@wraparound(False)  # turn off negative index wrapping for entire function
+@nonecheck(False)
+cdef void DiffShapeFuntionOut(const FLT64 [::1] r_coord, INT32 nodedof, FLT64 [:, ::1] out) noexcept nogil:
+    # out (1, 9)
+    cdef FLT64 diffN[9]
+    cdef Py_ssize_t kk
+    MATDIFFN(r_coord, diffN)
+    for kk in range(9):
+        out[0, kk] = diffN[kk]
 
 @cdivision(True)
 @exceptval(check=False)
 @boundscheck(False) # turn off bounds-checking for entire function
-@wraparound(False)  # turn off negative index wrapping for entire function           
-@nonecheck(False) 
-cdef FLT64 [:, ::1] MATDIFFDIFFN(FLT64 [::1] r):
-    cdef FLT64 r0 = r[0]
-    ddN = np.zeros((4,18), dtype=np.float64)
-    cdef FLT64 [:, ::1] ddN_view = ddN
-    ddN_view[0, 0] = r0
-    ddN_view[0, 6] = r0
-    ddN_view[0, 12] = -2.0
-    ddN_view[1, 1] = 0.25*(60*r0**3 - 24*r0**2 - 30*r0 + 8)
-    ddN_view[1, 5] = 0.25*(10*r0**3 - 6*r0**2 - 3*r0 + 1)
-    ddN_view[1, 7] = 0.25*(-60*r0**3 - 24*r0**2 + 30*r0 + 8)
-    ddN_view[1, 11] = 0.25*(10*r0**3 + 6*r0**2 - 3*r0 - 1)
-    ddN_view[1, 13] = 0.25*(48*r0**2 - 16)
-    ddN_view[1, 17] = 0.25*(40*r0**3 - 24*r0)
-    ddN_view[2, 2] = 0.25*(60*r0**3 - 24*r0**2 - 30*r0 + 8)
-    ddN_view[2, 4] = 0.25*(10*r0**3 - 6*r0**2 - 3*r0 + 1)
-    ddN_view[2, 8] = 0.25*(-60*r0**3 - 24*r0**2 + 30*r0 + 8)
-    ddN_view[2, 10] = 0.25*(10*r0**3 + 6*r0**2 - 3*r0 - 1)
-    ddN_view[2, 14] = 0.25*(48*r0**2 - 16)
-    ddN_view[2, 16] = 0.25*(40*r0**3 - 24*r0)
-    ddN_view[3, 3] = r0
-    ddN_view[3, 9] = r0
-    ddN_view[3, 15] = -2.0
-    return ddN
- 
-# @cdivision(True)
-# @exceptval(check=False)
-# @boundscheck(False) # turn off bounds-checking for entire function
-# @wraparound(False)  # turn off negative index wrapping for entire function           
-# @nonecheck(False) 
-# cdef FLT64 DET(FLT64 [:, ::1] A):
-#     cdef FLT64 det = A[0][0]
-#     return det
+@wraparound(False)  # turn off negative index wrapping for entire function
+@nonecheck(False)
+cdef void DiffDiffShapeFuntionOut(const FLT64 [::1] r_coord, INT32 nodedof, FLT64 [:, ::1] out) noexcept nogil:
+    # out (4, 18)
+    cdef FLT64 r0 = r_coord[0]
+    out[:, :] = 0.0
+    out[0, 0] = r0
+    out[0, 6] = r0
+    out[0, 12] = -2.0
+    out[1, 1] = 0.25*(60*r0**3 - 24*r0**2 - 30*r0 + 8)
+    out[1, 5] = 0.25*(10*r0**3 - 6*r0**2 - 3*r0 + 1)
+    out[1, 7] = 0.25*(-60*r0**3 - 24*r0**2 + 30*r0 + 8)
+    out[1, 11] = 0.25*(10*r0**3 + 6*r0**2 - 3*r0 - 1)
+    out[1, 13] = 0.25*(48*r0**2 - 16)
+    out[1, 17] = 0.25*(40*r0**3 - 24*r0)
+    out[2, 2] = 0.25*(60*r0**3 - 24*r0**2 - 30*r0 + 8)
+    out[2, 4] = 0.25*(10*r0**3 - 6*r0**2 - 3*r0 + 1)
+    out[2, 8] = 0.25*(-60*r0**3 - 24*r0**2 + 30*r0 + 8)
+    out[2, 10] = 0.25*(10*r0**3 + 6*r0**2 - 3*r0 - 1)
+    out[2, 14] = 0.25*(48*r0**2 - 16)
+    out[2, 16] = 0.25*(40*r0**3 - 24*r0)
+    out[3, 3] = r0
+    out[3, 9] = r0
+    out[3, 15] = -2.0
 
 @cdivision(True)
 @exceptval(check=False)
 @boundscheck(False) # turn off bounds-checking for entire function
-@wraparound(False)  # turn off negative index wrapping for entire function           
-@nonecheck(False)   
-cdef FLT64 INV(FLT64 [:, ::1] A):
-    cdef FLT64 detA = A[0][0]
-    cdef FLT64 invA = 1.0 / A[0][0]
-    return invA
-  
+@wraparound(False)  # turn off negative index wrapping for entire function
+@nonecheck(False)
+cdef void JacobianOut(const FLT64 [::1] r_coord, const FLT64 [:, ::1] element_coord, FLT64 [:, ::1] out) noexcept nogil:
+    # out (1, 1)
+    out[0, 0] = JACOBIANO(r_coord, element_coord)
+
 @cdivision(True)
 @exceptval(check=False)
 @boundscheck(False) # turn off bounds-checking for entire function
-@wraparound(False)  # turn off negative index wrapping for entire function           
-@nonecheck(False) 
-cdef FLT64 [:, ::1] JACOBIANO(FLT64 [::1] r_coord, FLT64 [:, ::1] element_coord):  
-    cdef FLT64 [:, ::1] diffN = MATDIFFN(r_coord)  
-    jac = np.zeros((1, 1), dtype=np.float64)
-    cdef FLT64 [:, ::1] jac_view = jac
-    jac_view[0][0] = diffN[0][0]*element_coord[0][0]+diffN[0][1]*element_coord[1][0]+diffN[0][2]*element_coord[2][0]+diffN[0][3]*element_coord[3][0]+diffN[0][4]*element_coord[4][0]+diffN[0][5]*element_coord[5][0]+diffN[0][6]*element_coord[6][0]+diffN[0][7]*element_coord[7][0]+diffN[0][8]*element_coord[8][0]
-    return jac
+@wraparound(False)  # turn off negative index wrapping for entire function
+@nonecheck(False)
+cdef void invJacobiOut(const FLT64 [::1] r_coord, const FLT64 [:, ::1] element_coord, INT32 nodedof, FLT64 [:, ::1] out) noexcept nogil:
+    # out (4, 4), diag(invJ, invJ^2, invJ^2, invJ)
+    cdef FLT64 invJ = 1.0 / JACOBIANO(r_coord, element_coord)
+    out[:, :] = 0.0
+    out[0, 0] = invJ
+    out[1, 1] = invJ*invJ
+    out[2, 2] = out[1, 1]
+    out[3, 3] = out[0, 0]
+
+@cdivision(True)
+@exceptval(check=False)
+@boundscheck(False) # turn off bounds-checking for entire function
+@wraparound(False)  # turn off negative index wrapping for entire function
+@nonecheck(False)
+cdef FLT64 detJacobiOut(const FLT64 [::1] r_coord, const FLT64 [:, ::1] element_coord) noexcept nogil:
+    return JACOBIANO(r_coord, element_coord)
+
+@cdivision(True)
+@exceptval(check=False)
+@boundscheck(False) # turn off bounds-checking for entire function
+@wraparound(False)  # turn off negative index wrapping for entire function
+@nonecheck(False)
+cdef void NodeListOut(const INT32 [:, ::1] inci, Py_ssize_t element_number, INT32 [::1] out) noexcept nogil:
+    # out (3,)
+    cdef Py_ssize_t node
+    for node in range(3):
+        out[node] = inci[element_number, 4 + node]
+
+@cdivision(True)
+@exceptval(check=False)
+@boundscheck(False) # turn off bounds-checking for entire function
+@wraparound(False)  # turn off negative index wrapping for entire function
+@nonecheck(False)
+cdef void NodeCoordOut(const FLT64 [:, ::1] coord, const INT32 [::1] node_list, FLT64 [:, ::1] out) noexcept nogil:
+    # out (9, 1), x y z of each node in a column
+    cdef Py_ssize_t node, dim
+    for node in range(3):
+        for dim in range(3):
+            out[3*node+dim, 0] = coord[node_list[node] - 1, 1 + dim]
+
+@cdivision(True)
+@exceptval(check=False)
+@boundscheck(False) # turn off bounds-checking for entire function
+@wraparound(False)  # turn off negative index wrapping for entire function
+@nonecheck(False)
+cdef void LocKeyOut(const INT32 [::1] node_list, INT32 nodedof, INT32 [::1] out) noexcept nogil:
+    # out (3*nodedof,)
+    cdef Py_ssize_t node, dof
+    for node in range(node_list.shape[0]):
+        for dof in range(nodedof):
+            out[nodedof*node+dof] = nodedof * node_list[node] - (nodedof-dof)
 
 @boundscheck(False) # turn off bounds-checking for entire function
-@wraparound(False)  # turn off negative index wrapping for entire function                 
-def ShapeFunctions(FLT64 [::1] r_coord, INT32 nodedof):
-    N = MATN(r_coord)
-    cdef FLT64 [:, ::1] shape_function = N
-    matN = np.zeros((4, 3*nodedof), dtype=np.float64) 
-    cdef FLT64 [:, ::1] mat_N = matN
-    mat_N = shape_function
+@wraparound(False)  # turn off negative index wrapping for entire function
+def ShapeFunctions(const FLT64 [::1] r_coord, INT32 nodedof):
+    matN = np.empty((4, 3*nodedof), dtype=np.float64)
+    ShapeFunctionsOut(r_coord, nodedof, matN)
     return matN
 
 @boundscheck(False) # turn off bounds-checking for entire function
-@wraparound(False)  # turn off negative index wrapping for entire function           
-def DiffShapeFuntion(FLT64 [::1] r_coord, INT32 nodedof):
-    diffN = MATDIFFN(r_coord)
-    cdef FLT64 [:, ::1] diff_shape_function = diffN
-    matdiffN = np.zeros((1, 9), dtype=np.float64) 
-    cdef FLT64 [:, ::1] mat_diff_N = matdiffN
-    mat_diff_N = diff_shape_function
+@wraparound(False)  # turn off negative index wrapping for entire function
+def DiffShapeFuntion(const FLT64 [::1] r_coord, INT32 nodedof):
+    matdiffN = np.empty((1, 9), dtype=np.float64)
+    DiffShapeFuntionOut(r_coord, nodedof, matdiffN)
+    return matdiffN
+
+@boundscheck(False) # turn off bounds-checking for entire function
+@wraparound(False)  # turn off negative index wrapping for entire function
+def DiffDiffShapeFuntion(const FLT64 [::1] r_coord, INT32 nodedof):
+    matdiffN = np.empty((4, 3*nodedof), dtype=np.float64)
+    DiffDiffShapeFuntionOut(r_coord, nodedof, matdiffN)
     return matdiffN
 
 @boundscheck(False) # turn off bounds-checking for entire function
-@wraparound(False)  # turn off negative index wrapping for entire function           
-def DiffDiffShapeFuntion(FLT64 [::1] r_coord, INT32 nodedof):
-    diffN = MATDIFFDIFFN(r_coord)
-    cdef FLT64 [:, ::1] diff_shape_function = diffN
-    matdiffN = np.zeros((4, 3*nodedof), dtype=np.float64) 
-    cdef FLT64 [:, ::1] mat_diff_N = matdiffN
-    mat_diff_N = diff_shape_function
-    return mat_diff_N
-    
-@boundscheck(False) # turn off bounds-checking for entire function
-@wraparound(False)  # turn off negative index wrapping for entire function           
-def Jacobian(FLT64 [::1] r_coord, FLT64 [:, ::1] element_coord):  
-    cdef FLT64 [:, ::1] Jac = JACOBIANO(r_coord, element_coord)
-    return Jac
-    
-@boundscheck(False) # turn off bounds-checking for entire function
-@wraparound(False)  # turn off negative index wrapping for entire function           
-def invJacobi(FLT64 [::1] r_coord, FLT64 [:, ::1] element_coord, INT32 nodedof):
-    cdef FLT64 [:, ::1] Jac = JACOBIANO(r_coord, element_coord)
-    cdef FLT64 invJ = INV(Jac)
-    mat_invJ = np.zeros((4, 4), dtype=np.float64)  
-    cdef FLT64 [:, ::1] mat_invJ_view = mat_invJ
-    mat_invJ_view[0][0] = invJ
-    mat_invJ_view[1][1] = invJ*invJ
-    mat_invJ_view[2][2] = mat_invJ_view[1][1]
-    mat_invJ_view[3][3] = mat_invJ_view[0][0]
-    
+@wraparound(False)  # turn off negative index wrapping for entire function
+def Jacobian(const FLT64 [::1] r_coord, const FLT64 [:, ::1] element_coord):
+    jac = np.empty((1, 1), dtype=np.float64)
+    JacobianOut(r_coord, element_coord, jac)
+    return jac
+
+@boundscheck(False) # turn off bounds-checking for entire function
+@wraparound(False)  # turn off negative index wrapping for entire function
+def invJacobi(const FLT64 [::1] r_coord, const FLT64 [:, ::1] element_coord, INT32 nodedof):
+    mat_invJ = np.empty((4, 4), dtype=np.float64)
+    invJacobiOut(r_coord, element_coord, nodedof, mat_invJ)
     return mat_invJ
 
 @boundscheck(False) # turn off bounds-checking for entire function
-@wraparound(False)  # turn off negative index wrapping for entire function           
-def detJacobi(FLT64 [::1] r_coord, FLT64 [:, ::1] element_coord):
-    cdef FLT64 [:, ::1] Jac = JACOBIANO(r_coord, element_coord)
-    cdef FLT64 detJ = Jac[0][0] 
-    return detJ
+@wraparound(False)  # turn off negative index wrapping for entire function
+def detJacobi(const FLT64 [::1] r_coord, const FLT64 [:, ::1] element_coord):
+    return detJacobiOut(r_coord, element_coord)
 
 @boundscheck(False) # turn off bounds-checking for entire function
-@wraparound(False)  # turn off negative index wrapping for entire function            
-def NodeList(INT32 [:, ::1] inci, INT32 element_number):
-    cdef INT32 noi = inci[element_number, 4]
-    cdef INT32 noj = inci[element_number, 5]
-    cdef INT32 nok = inci[element_number, 6]
-    cdef INT32 [::1] node_list = np.array([noi, noj, nok], dtype=np.int32)                          
+@wraparound(False)  # turn off negative index wrapping for entire function
+def NodeList(const INT32 [:, ::1] inci, INT32 element_number):
+    node_list = np.empty(3, dtype=np.int32)
+    NodeListOut(inci, element_number, node_list)
     return node_list
-            
-@boundscheck(False) # turn off bounds-checking for entire function
-@wraparound(False)  # turn off negative index wrapping for entire function             
-def NodeCoord(FLT64 [:, ::1] coord, INT32 [::1] node_list):
-    cdef INT32 noi = node_list[0]
-    cdef INT32 noj = node_list[1]
-    cdef INT32 nok = node_list[2]
-    cdef FLT64 xi = coord[noi - 1, 1]
-    cdef FLT64 yi = coord[noi - 1, 2]
-    cdef FLT64 zi = coord[noi - 1, 3]
-    cdef FLT64 xj = coord[noj - 1, 1]
-    cdef FLT64 yj = coord[noj - 1, 2]
-    cdef FLT64 zj = coord[noj - 1, 3]
-    cdef FLT64 xk = coord[nok - 1, 1]
-    cdef FLT64 yk = coord[nok - 1, 2]
-    cdef FLT64 zk = coord[nok - 1, 3]
-    cdef FLT64 [:, ::1] element_coord = np.array([[xi], [yi], [zi], [xj], [yj], [zj], [xk], [yk], [zk]], dtype=np.float64)
+
+@boundscheck(False) # turn off bounds-checking for entire function
+@wraparound(False)  # turn off negative index wrapping for entire function
+def NodeCoord(const FLT64 [:, ::1] coord, const INT32 [::1] node_list):
+    element_coord = np.empty((9, 1), dtype=np.float64)
+    NodeCoordOut(coord, node_list, element_coord)
     return element_coord
 
 @boundscheck(False) # turn off bounds-checking for entire function
-@wraparound(False)  # turn off negative index wrapping for entire function           
-def LocKey(INT32 [::1] node_list, INT32 nodedof):
-    shape_key = np.zeros(3*nodedof, dtype=np.int32)
-    cdef INT32 [::1] shape_key_view = shape_key
-    cdef Py_ssize_t node, dof
-    for node in range(len(node_list)):
-        for dof in range(nodedof):
-            shape_key_view[nodedof*node+dof] = nodedof * node_list[node] - (nodedof-dof)
-    return shape_key
\ No newline at end of file
+@wraparound(False)  # turn off negative index wrapping for entire function
+def LocKey(const INT32 [::1] node_list, INT32 nodedof):
+    shape_key = np.empty(3*nodedof, dtype=np.int32)
+    LocKeyOut(node_list, nodedof, shape_key)
+    return shape_key
@@ -3,16 +3,19 @@ from __future__ import annotations
 from numpy import sqrt, array, abs, zeros
 from numpy.linalg import norm
 
-from myfempy.core.shapes.quad4_tasks import (DiffShapeFuntion, Jacobian,
-                                             LocKey, NodeCoord, NodeList,
-                                             ShapeFunctions, detJacobi,
-                                             invJacobi)
-from myfempy.core.shapes.shape import Shape
+from myfempy.core.backends import getShapeTasks
+from myfempy.core.descriptor import setDescriptor
+from myfempy.core.shapes.referenceelement import getReferenceElement
+from myfempy.core.shapes.shape import Shape, ShapeSet
+
+# compiled quad4_tasks when built, else the pure NumPy shape tasks
+tasks = getShapeTasks("quad4")
 
 
 class Quad4(Shape):
     """Quadrilateral 4-Node Shape Class <ConcreteClassService>"""
 
+    @setDescriptor(ShapeSet)
     def getShapeSet():
         shapeset = {
             "def": "4-nodes_conec 1-interpol_order",
@@ -101,27 +104,30 @@ class Quad4(Shape):
         return normal
 
     def getShapeFunctions(r_coord, nodedof):
-        return ShapeFunctions(r_coord, nodedof)
+        return tasks.ShapeFunctions(r_coord, nodedof)
 
     def getDiffShapeFuntion(r_coord, nodedof):
-        return DiffShapeFuntion(r_coord, nodedof)
+        return tasks.DiffShapeFuntion(r_coord, nodedof)
 
     def getJacobian(r_coord, element_coord):
-        return Jacobian(r_coord, element_coord)
+        return tasks.Jacobian(r_coord, element_coord)
 
     def getinvJacobi(r_coord, element_coord, nodedof):
-        return invJacobi(r_coord, element_coord, nodedof)
+        return tasks.invJacobi(r_coord, element_coord, nodedof)
 
     def getdetJacobi(r_coord, element_coord):
-        return detJacobi(r_coord, element_coord)
+        return tasks.detJacobi(r_coord, element_coord)
+
+    def getJacobianBatch(element_coords, intgauss):
+        return getReferenceElement(Quad4, intgauss).getJacobianBatch(element_coords)
 
     def getNodeList(inci, element_number):
-        return NodeList(inci, element_number)
+        return tasks.NodeList(inci, element_number)
 
     def getNodeCoord(coord, node_list):
-        return NodeCoord(coord, node_list)
+        return tasks.NodeCoord(coord, node_list)
 
     def getLocKey(node_list, nodedof):
-        return LocKey(node_list, nodedof)
+        return tasks.LocKey(node_list, nodedof)
 
 
@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+from numpy import (array, asarray, ascontiguousarray, empty, float64, int32,
+                   matmul, newaxis, sqrt)
+
+INT32 = int32
+FLT64 = float64
+
+from myfempy.core.utilities import getGaussQuadrature
+
+# dimension of the reference (parametric) space of the shapes
+REF_DIM = {
+    "line2": 1,
+    "line3": 1,
+    "tria3": 2,
+    "tria6": 2,
+    "quad4": 2,
+    "quad8": 2,
+    "tetr4": 3,
+    "hexa8": 3,
+}
+
+# reference element factor applied by <shape>_tasks.detJacobi
+REF_FACTOR = {
+    "line2": 1.0,
+    "line3": 1.0,
+    "tria3": 0.5,
+    "tria6": 0.5,
+    "quad4": 1.0,
+    "quad8": 1.0,
+    "tetr4": 1.0 / 6.0,
+    "hexa8": 1.0,
+}
+
+# linear simplex shapes: dN/dr constant, constant strain elements
+REF_CONSTANT = ("tria3", "tetr4")
+
+
+class ReferenceElement:
+    """
+    Reference Element Class <ClassOrder>
+
+    Integration points, weights and the shape functions and derivatives of a
+    shape at all integration points, for one integration order. The points and
+    weights are the flattened gauss rule of getGaussQuadrature. Every array is
+    read-only and built once per process, see getReferenceElement.
+    """
+
+    def __init__(self, shape, intgauss):
+        shape_set = shape.getShapeSet()
+        self.key = shape_set["key"]
+        self.nodecon = shape_set.nodecon
+        self.intgauss = intgauss
+        self.ndim = REF_DIM[self.key]
+        # detJacobi = factor * det(J)
+        self.factor = REF_FACTOR[self.key]
+        self.constant = self.key in REF_CONSTANT
+        self.points, self.weight = getGaussQuadrature(self.key, intgauss, self.ndim)
+        self.npoint = self.points.shape[0]
+        # writable copies for the <shape>_tasks routines (memoryview arguments)
+        self.__point = [array(pp) for pp in self.points]
+        self.__shape = shape
+        self.__table = dict()
+
+    def getPoint(self, pp):
+        """
+        getPoint integration point pp, to pass to the Shape routines (not to be modified)
+
+        Arguments:
+            pp -- integration point index
+
+        Returns:
+            array (ndim,)
+        """
+        return self.__point[pp]
+
+    def getShapeFunctions(self, nodedof=1):
+        """
+        getShapeFunctions shape functions matrix at all integration points
+
+        Arguments:
+            nodedof -- dofs per node of the shape functions matrix
+
+        Returns:
+            read-only array (npoint, ...) of Shape.getShapeFunctions
+        """
+        return self.__getTable("getShapeFunctions", nodedof)
+
+    def getDiffShapeFuntion(self, nodedof=1):
+        """
+        getDiffShapeFuntion shape functions derivatives matrix at all integration points
+
+        Arguments:
+            nodedof -- dofs per node of the derivatives matrix, 1 for dN/dr (ndim, nodecon)
+
+        Returns:
+            read-only array (npoint, ...) of Shape.getDiffShapeFuntion
+        """
+        return self.__getTable("getDiffShapeFuntion", nodedof)
+
+    def getDiffDiffShapeFuntion(self, nodedof=1):
+        """
+        getDiffDiffShapeFuntion shape functions second derivatives at all integration points (line shapes)
+
+        Arguments:
+            nodedof -- dofs per node of the derivatives matrix
+
+        Returns:
+            read-only array (npoint, ...) of Shape.getDiffDiffShapeFuntion
+        """
+        return self.__getTable("getDiffDiffShapeFuntion", nodedof)
+
+    def getJacobianBatch(self, element_coords):
+        """
+        getJacobianBatch jacobian of many elements at all integration points in one pass
+
+        Line shapes use the arc length |dX/dr| of the element in space, i.e.
+        the jacobian of the element in its local axis.
+
+        Arguments:
+            element_coords -- node coordinates (nelem, nodecon, dim), dim >= ndim
+
+        Returns:
+            detJ -- factor * det(J) as Shape.getdetJacobi, array (nelem, npoint)
+            invJ -- inverse of J, array (nelem, npoint, ndim, ndim)
+            diffNx -- shape functions derivatives in the physical space, array (nelem, npoint, ndim, nodecon)
+        """
+        X = asarray(element_coords, dtype=FLT64)
+        dN = self.__getDiffShapeNode()
+        nelem = X.shape[0]
+        if self.ndim == 1:
+            dXdr = matmul(dN[newaxis], X[:, newaxis])
+            detJ = sqrt((dXdr**2).sum(axis=3))[:, :, 0]
+            invJ = (1.0 / detJ)[:, :, newaxis, newaxis]
+        else:
+            J = matmul(dN[newaxis], X[:, newaxis, :, : self.ndim])
+            invJ = empty((nelem, self.npoint, self.ndim, self.ndim), dtype=FLT64)
+            if self.ndim == 2:
+                detJ = J[..., 0, 0] * J[..., 1, 1] - J[..., 0, 1] * J[..., 1, 0]
+                invJ[..., 0, 0] = J[..., 1, 1]
+                invJ[..., 0, 1] = -J[..., 0, 1]
+                invJ[..., 1, 0] = -J[..., 1, 0]
+                invJ[..., 1, 1] = J[..., 0, 0]
+            else:
+                # adjugate (cofactors transposed)
+                invJ[..., 0, 0] = J[..., 1, 1] * J[..., 2, 2] - J[..., 1, 2] * J[..., 2, 1]
+                invJ[..., 0, 1] = J[..., 0, 2] * J[..., 2, 1] - J[..., 0, 1] * J[..., 2, 2]
+                invJ[..., 0, 2] = J[..., 0, 1] * J[..., 1, 2] - J[..., 0, 2] * J[..., 1, 1]
+                invJ[..., 1, 0] = J[..., 1, 2] * J[..., 2, 0] - J[..., 1, 0] * J[..., 2, 2]
+                invJ[..., 1, 1] = J[..., 0, 0] * J[..., 2, 2] - J[..., 0, 2] * J[..., 2, 0]
+                invJ[..., 1, 2] = J[..., 0, 2] * J[..., 1, 0] - J[..., 0, 0] * J[..., 1, 2]
+                invJ[..., 2, 0] = J[..., 1, 0] * J[..., 2, 1] - J[..., 1, 1] * J[..., 2, 0]
+                invJ[..., 2, 1] = J[..., 0, 1] * J[..., 2, 0] - J[..., 0, 0] * J[..., 2, 1]
+                invJ[..., 2, 2] = J[..., 0, 0] * J[..., 1, 1] - J[..., 0, 1] * J[..., 1, 0]
+                detJ = (
+                    J[..., 0, 0] * invJ[..., 0, 0]
+                    + J[..., 0, 1] * invJ[..., 1, 0]
+                    + J[..., 0, 2] * invJ[..., 2, 0]
+                )
+            invJ /= detJ[:, :, newaxis, newaxis]
+        diffNx = matmul(invJ, dN[newaxis])
+        return self.factor * detJ, invJ, diffNx
+
+    def getVolumeBatch(self, element_coords):
+        """
+        getVolumeBatch measure (length, area or volume) of many elements in one pass
+
+        Integrates |detJ| on the rule of the reference element, detJ only (no
+        inverse), so the work arrays stay at (nelem, npoint, ndim, ndim).
+
+        Arguments:
+            element_coords -- node coordinates (nelem, nodecon, dim), dim >= ndim
+
+        Returns:
+            array (nelem,)
+        """
+        X = asarray(element_coords, dtype=FLT64)
+        dN = self.__getDiffShapeNode()
+        if self.ndim == 1:
+            dXdr = matmul(dN[newaxis], X[:, newaxis])
+            detJ = sqrt((dXdr**2).sum(axis=3))[:, :, 0]
+        else:
+            J = matmul(dN[newaxis], X[:, newaxis, :, : self.ndim])
+            if self.ndim == 2:
+                detJ = J[..., 0, 0] * J[..., 1, 1] - J[..., 0, 1] * J[..., 1, 0]
+            else:
+                detJ = (
+                    J[..., 0, 0] * (J[..., 1, 1] * J[..., 2, 2] - J[..., 1, 2] * J[..., 2, 1])
+                    - J[..., 0, 1] * (J[..., 1, 0] * J[..., 2, 2] - J[..., 1, 2] * J[..., 2, 0])
+                    + J[..., 0, 2] * (J[..., 1, 0] * J[..., 2, 1] - J[..., 1, 1] * J[..., 2, 0])
+                )
+        return abs(self.factor * detJ).dot(self.weight)
+
+    def __getDiffShapeNode(self):
+        # dN/dr (npoint, ndim, nodecon); the line shapes lay dN/dr on the 3 translations of each node
+        key = ("DiffShapeNode", 1)
+        if key not in self.__table:
+            dN = self.getDiffShapeFuntion(1)
+            if self.ndim == 1:
+                dN = dN[:, :, 0::3]
+            self.__table[key] = _setReadOnly(dN)
+        return self.__table[key]
+
+    def __getTable(self, name, nodedof):
+        key = (name, nodedof)
+        if key not in self.__table:
+            function = getattr(self.__shape, name)
+            self.__table[key] = _setReadOnly(
+                array([function(pp, nodedof) for pp in self.__point], dtype=FLT64)
+            )
+        return self.__table[key]
+
+
+_reference = dict()
+
+
+def getReferenceElement(shape, intgauss):
+    """
+    getReferenceElement cached reference element of a shape and integration order
+
+    Arguments:
+        shape -- shape class, e.g. Model.shape
+        intgauss -- number of gauss points per direction
+
+    Returns:
+        ReferenceElement
+    """
+    key = (shape.getShapeSet().key, int(intgauss))
+    reference = _reference.get(key)
+    if reference is None:
+        reference = ReferenceElement(shape, int(intgauss))
+        _reference[key] = reference
+    return reference
+
+
+def _setReadOnly(values):
+    values = ascontiguousarray(values)
+    values.setflags(write=False)
+    return values
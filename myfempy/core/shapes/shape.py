@@ -1,5 +1,24 @@
 from abc import ABC, abstractmethod
 
+from myfempy.core.descriptor import Descriptor
+
+
+class ShapeSet(Descriptor):
+    """
+    Shape Set Class <ClassOrder>
+
+    Read-only getShapeSet of a shape, built once. Besides the dict keys,
+    the fields key, id and nodecon (len of nodes) are precomputed.
+    """
+
+    __slots__ = ("key", "id", "nodecon")
+
+    def __init__(self, data):
+        super().__init__(data)
+        object.__setattr__(self, "key", self["key"])
+        object.__setattr__(self, "id", self["id"])
+        object.__setattr__(self, "nodecon", len(self["nodes"]))
+
 
 class Shape(ABC):
     """Shape API Class <ClassService>"""
@@ -28,6 +47,10 @@ class Shape(ABC):
     def getdetJacobi():
         pass
 
+    @abstractmethod
+    def getJacobianBatch():
+        pass
+
     @abstractmethod
     def getNodeList():
         pass
@@ -0,0 +1,400 @@
+from __future__ import annotations
+
+from numpy import array, asarray, float64, int32, zeros
+from numpy.linalg import det, inv
+
+INT32 = int32
+FLT64 = float64
+
+# pure NumPy fallback of the compiled <shape>_tasks modules
+# same routines, argument order and array layouts, one element at a time
+
+
+def _N_tria3(r):
+    r0 = r[0]
+    r1 = r[1]
+    return array([1 -r0 - r1, r0, r1], dtype=FLT64)
+
+
+def _dN_tria3(r):
+    return array(
+        [
+            [-1.0, 1.0, 0.0],
+            [-1.0, 0.0, 1.0],
+        ],
+        dtype=FLT64,
+    )
+
+
+def _N_tria6(r):
+    r0 = r[0]
+    r1 = r[1]
+    return array(
+        [
+            (1 - r0 - r1)*(1 - 2*r0 - 2*r1),
+            r0*(2*r0 - 1),
+            r1*(2*r1 - 1),
+            4*r0*(1 - r0 - r1),
+            4*r0*r1,
+            4*r1*(1 - r0 - r1),
+        ],
+        dtype=FLT64,
+    )
+
+
+def _dN_tria6(r):
+    r0 = r[0]
+    r1 = r[1]
+    return array(
+        [
+            [4*r0 + 4*r1 - 3, 4*r0 - 1, 0.0, -8*r0 - 4*r1 + 4, 4*r1, -4*r1],
+            [4*r0 + 4*r1 - 3, 0.0, 4*r1 - 1, -4*r0, 4*r0, -8*r1 - 4*r0 + 4],
+        ],
+        dtype=FLT64,
+    )
+
+
+def _N_quad4(r):
+    r0 = r[0]
+    r1 = r[1]
+    return array(
+        [
+            0.25*(1-r0)*(1-r1),
+            0.25*(1+r0)*(1-r1),
+            0.25*(1+r0)*(1+r1),
+            0.25*(1-r0)*(1+r1),
+        ],
+        dtype=FLT64,
+    )
+
+
+def _dN_quad4(r):
+    r0 = r[0]
+    r1 = r[1]
+    return array(
+        [
+            [0.25*(-1.0+r1), 0.25*(1.0-r1), 0.25*(1.0+r1), 0.25*(-1.0-r1)],
+            [0.25*(-1.0+r0), 0.25*(-1.0-r0), 0.25*(1.0+r0), 0.25*(1.0-r0)],
+        ],
+        dtype=FLT64,
+    )
+
+
+def _N_quad8(r):
+    r0 = r[0]
+    r1 = r[1]
+    return array(
+        [
+            0.25*(1-r0)*(1-r1)*(-r0-r1-1),
+            0.25*(1+r0)*(1-r1)*(r0-r1-1),
+            0.25*(1+r0)*(1+r1)*(+r0+r1-1),
+            0.25*(1-r0)*(1+r1)*(-r0+r1-1),
+            0.5*(1-r0*r0)*(1-r1),
+            0.5*(1+r0)*(1-r1*r1),
+            0.5*(1-r0*r0)*(1+r1),
+            0.5*(1-r0)*(1-r1*r1),
+        ],
+        dtype=FLT64,
+    )
+
+
+def _dN_quad8(r):
+    r0 = r[0]
+    r1 = r[1]
+    return array(
+        [
+            [
+                0.25*(1-r1)*(2*r0+r1),
+                0.25*(1-r1)*(2*r0-r1),
+                0.25*(1+r1)*(2*r0+r1),
+                0.25*(1+r1)*(2*r0-r1),
+                -r0*(1-r1),
+                0.5*(1-r1*r1),
+                -r0*(1+r1),
+                -0.5*(1-r1*r1),
+            ],
+            [
+                0.25*(1-r0)*(2*r1+r0),
+                0.25*(1+r0)*(2*r1-r0),
+                0.25*(1+r0)*(2*r1+r0),
+                0.25*(1-r0)*(2*r1-r0),
+                -0.5*(1-r0*r0),
+                -r1*(1+r0),
+                0.5*(1-r0*r0),
+                -r1*(1-r0),
+            ],
+        ],
+        dtype=FLT64,
+    )
+
+
+def _N_tetr4(r):
+    r0 = r[0]
+    r1 = r[1]
+    r2 = r[2]
+    return array([1 - r0 - r1 - r2, r0, r1, r2], dtype=FLT64)
+
+
+def _dN_tetr4(r):
+    return array(
+        [
+            [-1.0, 1.0, 0.0, 0.0],
+            [-1.0, 0.0, 1.0, 0.0],
+            [-1.0, 0.0, 0.0, 1.0],
+        ],
+        dtype=FLT64,
+    )
+
+
+def _N_hexa8(r):
+    r0 = r[0]
+    r1 = r[1]
+    r2 = r[2]
+    return array(
+        [
+            0.125 * (1 - r0) * (1 - r1) * (1 - r2),
+            0.125 * (1 + r0) * (1 - r1) * (1 - r2),
+            0.125 * (1 + r0) * (1 + r1) * (1 - r2),
+            0.125 * (1 - r0) * (1 + r1) * (1 - r2),
+            0.125 * (1 - r0) * (1 - r1) * (1 + r2),
+            0.125 * (1 + r0) * (1 - r1) * (1 + r2),
+            0.125 * (1 + r0) * (1 + r1) * (1 + r2),
+            0.125 * (1 - r0) * (1 + r1) * (1 + r2),
+        ],
+        dtype=FLT64,
+    )
+
+
+def _dN_hexa8(r):
+    r0 = r[0]
+    r1 = r[1]
+    r2 = r[2]
+    return array(
+        [
+            [
+                0.125 * (-1 + r1) * (1 - r2),
+                0.125 * (1 - r1) * (1 - r2),
+                0.125 * (1 + r1) * (1 - r2),
+                0.125 * (-1 - r1) * (1 - r2),
+                0.125 * (-1 + r1) * (1 + r2),
+                0.125 * (1 - r1) * (1 + r2),
+                0.125 * (1 + r1) * (1 + r2),
+                0.125 * (-1 - r1) * (1 + r2),
+            ],
+            [
+                0.125 * (-1 + r0) * (1 - r2),
+                0.125 * (-1 - r0) * (1 - r2),
+                0.125 * (1 + r0) * (1 - r2),
+                0.125 * (1 - r0) * (1 - r2),
+                0.125 * (-1 + r0) * (1 + r2),
+                0.125 * (-1 - r0) * (1 + r2),
+                0.125 * (1 + r0) * (1 + r2),
+                0.125 * (1 - r0) * (1 + r2),
+            ],
+            [
+                0.125 * (-1 + r0) * (1 - r1),
+                0.125 * (-1 - r0) * (1 - r1),
+                0.125 * (-1 - r0) * (1 + r1),
+                0.125 * (-1 + r0) * (1 + r1),
+                0.125 * (1 - r0) * (1 - r1),
+                0.125 * (1 + r0) * (1 - r1),
+                0.125 * (1 + r0) * (1 + r1),
+                0.125 * (1 - r0) * (1 + r1),
+            ],
+        ],
+        dtype=FLT64,
+    )
+
+
+def _N_line2(r):
+    r0 = r[0]
+    values = zeros((4, 12), dtype=FLT64)
+    values[0, 0] = 0.5*(1 - r0)
+    values[0, 6] = 0.5*(1 + r0)
+    values[1, 1] = 0.25*(r0**3 - 3*r0 + 2)
+    values[1, 5] = 0.25*(0.5*r0**3 - 0.5*r0**2 -0.5*r0 + 0.5)
+    values[1, 7] = 0.25*(r0**3 + 3*r0 + 2)
+    values[1, 11] = 0.25*(0.5*r0**3 + 0.5*r0**2 -0.5*r0 - 0.5)
+    values[2, 2] = 0.25*(r0**3 - 3*r0 + 2)
+    values[2, 4] = 0.25*(0.5*r0**3 - 0.5*r0**2 -0.5*r0 + 0.5)
+    values[2, 8] = 0.25*(-r0**3 + 3*r0 + 2)
+    values[2, 10] = 0.25*(0.5*r0**3 + 0.5*r0**2 -0.5*r0 - 0.5)
+    values[3, 3] = 0.5*(1 - r0)
+    values[3, 9] = 0.5*(1 + r0)
+    return values
+
+
+def _ddN_line2(r):
+    r0 = r[0]
+    values = zeros((4, 12), dtype=FLT64)
+    values[0, 0] = -0.5
+    values[0, 6] = 0.5
+    values[1, 1] = 0.25*(6*r0)
+    values[1, 5] = 0.25*(3*r0 - 1)
+    values[1, 7] = 0.25*(-6*r0)
+    values[1, 11] = 0.25*(3*r0 + 1)
+    values[2, 2] = 0.25*(6*r0)
+    values[2, 4] = 0.25*(3*r0 - 1)
+    values[2, 8] = 0.25*(-6*r0)
+    values[2, 10] = 0.25*(3*r0 + 1)
+    values[3, 3] = -0.5
+    values[3, 9] = 0.5
+    return values
+
+
+def _dN_line2(r):
+    values = zeros((1, 6), dtype=FLT64)
+    values[0, 0] = -0.5
+    values[0, 3] = 0.5
+    return values
+
+
+def _N_line3(r):
+    r0 = r[0]
+    values = zeros((4, 18), dtype=FLT64)
+    values[0, 0] = 0.5*(1 - r0) - 0.5*(1 - r0**2)
+    values[0, 6] = 0.5*(1 + r0) - 0.5*(1 - r0**2)
+    values[0, 12] = 1 - r0**2
+    values[1, 1] = 0.25*(3*r0**5 - 2*r0**4 - 5*r0**3 + 4*r0**2)
+    values[1, 5] = 0.25*(0.5*r0**5 - 0.5*r0**4 - 0.5*r0**3 + 0.5*r0**2)
+    values[1, 7] = 0.25*(-3*r0**5 - 2*r0**4 + 5*r0**3 + 4*r0**2)
+    values[1, 11] = 0.25*(0.5*r0**5 + 0.5*r0**4 - 0.5*r0**3 - 0.5*r0**2)
+    values[1, 13] = 0.25*(4*r0**4 - 8*r0**2 + 4)
+    values[1, 17] = 0.25*(2*r0**5 - 4*r0**3 + 2*r0)
+    values[2, 2] = 0.25*(3*r0**5 - 2*r0**4 -5*r0**3 + 4*r0**2)
+    values[2, 4] = 0.25*(0.5*r0**5 - 0.5*r0**4 - 0.5*r0**3 + 0.5*r0**2)
+    values[2, 8] = 0.25*(-3*r0**5 - 2*r0**4 + 5*r0**3 + 4*r0**2)
+    values[2, 10] = 0.25*(0.5*r0**5 + 0.5*r0**4 - 0.5*r0**3 - 0.5*r0**2)
+    values[2, 14] = 0.25*(4*r0**4 - 8*r0**2 + 4)
+    values[2, 16] = 0.25*(2*r0**5 - 4*r0**3 + 2*r0)
+    values[3, 3] = 0.5*(1 - r0) - 0.5*(1 - r0**2)
+    values[3, 9] = 0.5*(1 + r0) - 0.5*(1 - r0**2)
+    values[3, 15] = 1 - r0**2
+    return values
+
+
+def _ddN_line3(r):
+    r0 = r[0]
+    values = zeros((4, 18), dtype=FLT64)
+    values[0, 0] = r0
+    values[0, 6] = r0
+    values[0, 12] = -2.0
+    values[1, 1] = 0.25*(60*r0**3 - 24*r0**2 - 30*r0 + 8)
+    values[1, 5] = 0.25*(10*r0**3 - 6*r0**2 - 3*r0 + 1)
+    values[1, 7] = 0.25*(-60*r0**3 - 24*r0**2 + 30*r0 + 8)
+    values[1, 11] = 0.25*(10*r0**3 + 6*r0**2 - 3*r0 - 1)
+    values[1, 13] = 0.25*(48*r0**2 - 16)
+    values[1, 17] = 0.25*(40*r0**3 - 24*r0)
+    values[2, 2] = 0.25*(60*r0**3 - 24*r0**2 - 30*r0 + 8)
+    values[2, 4] = 0.25*(10*r0**3 - 6*r0**2 - 3*r0 + 1)
+    values[2, 8] = 0.25*(-60*r0**3 - 24*r0**2 + 30*r0 + 8)
+    values[2, 10] = 0.25*(10*r0**3 + 6*r0**2 - 3*r0 - 1)
+    values[2, 14] = 0.25*(48*r0**2 - 16)
+    values[2, 16] = 0.25*(40*r0**3 - 24*r0)
+    values[3, 3] = r0
+    values[3, 9] = r0
+    values[3, 15] = -2.0
+    return values
+
+
+def _dN_line3(r):
+    r0 = r[0]
+    values = zeros((1, 9), dtype=FLT64)
+    values[0, 0] = -0.5 + r0
+    values[0, 3] = 0.5 + r0
+    values[0, 6] = -2.0*r0
+    return values
+
+
+# shape: (nodecon, space dim, detJ factor, N, dN/dr, d2N/dr2)
+SHAPETASKS = {
+    "line2": (2, 1, 1.0, _N_line2, _dN_line2, _ddN_line2),
+    "line3": (3, 1, 1.0, _N_line3, _dN_line3, _ddN_line3),
+    "tria3": (3, 2, 0.5, _N_tria3, _dN_tria3, None),
+    "tria6": (6, 2, 0.5, _N_tria6, _dN_tria6, None),
+    "quad4": (4, 2, 1.0, _N_quad4, _dN_quad4, None),
+    "quad8": (8, 2, 1.0, _N_quad8, _dN_quad8, None),
+    "tetr4": (4, 3, 0.166666666666667, _N_tetr4, _dN_tetr4, None),
+    "hexa8": (8, 3, 1.0, _N_hexa8, _dN_hexa8, None),
+}
+
+
+class ShapeTasksNumPy:
+    """
+    Shape Tasks NumPy Class <ClassOrder>
+
+    Stands in for the compiled <shape>_tasks module when it was not built.
+    """
+
+    def __init__(self, key):
+        self.key = key
+        (self.nodecon, self.ndim, self.factor,
+         self.__N, self.__dN, self.__ddN) = SHAPETASKS[key]
+
+    def __jacobian(self, r_coord, element_coord):
+        if self.ndim == 1:
+            # beam: x y z of each node in a column, J = dx/dr
+            return self.__dN(r_coord).dot(asarray(element_coord)[:, 0])[0]
+        return self.__dN(r_coord).dot(asarray(element_coord))
+
+    def ShapeFunctions(self, r_coord, nodedof):
+        if self.ndim == 1:
+            return self.__N(r_coord)
+        N = self.__N(r_coord)
+        matN = zeros((nodedof, self.nodecon * nodedof), dtype=FLT64)
+        for dof in range(nodedof):
+            matN[dof, dof::nodedof] = N
+        return matN
+
+    def DiffShapeFuntion(self, r_coord, nodedof):
+        if self.ndim == 1:
+            return self.__dN(r_coord)
+        dN = self.__dN(r_coord)
+        matdiffN = zeros((self.ndim * nodedof, self.nodecon * nodedof), dtype=FLT64)
+        for dof in range(nodedof):
+            matdiffN[self.ndim * dof : self.ndim * (dof + 1), dof::nodedof] = dN
+        return matdiffN
+
+    def DiffDiffShapeFuntion(self, r_coord, nodedof):
+        return self.__ddN(r_coord)
+
+    def Jacobian(self, r_coord, element_coord):
+        if self.ndim == 1:
+            return array([[self.__jacobian(r_coord, element_coord)]], dtype=FLT64)
+        return self.__jacobian(r_coord, element_coord)
+
+    def invJacobi(self, r_coord, element_coord, nodedof):
+        J = self.__jacobian(r_coord, element_coord)
+        if self.ndim == 1:
+            # diag(invJ, invJ^2, invJ^2, invJ)
+            invJ = 1.0 / J
+            mat_invJ = zeros((4, 4), dtype=FLT64)
+            mat_invJ[[0, 1, 2, 3], [0, 1, 2, 3]] = invJ, invJ * invJ, invJ * invJ, invJ
+            return mat_invJ
+        invJ = inv(J)
+        mat_invJ = zeros((self.ndim * nodedof, self.ndim * nodedof), dtype=FLT64)
+        for block in range(nodedof):
+            mat_invJ[
+                block * nodedof : block * nodedof + self.ndim,
+                block * nodedof : block * nodedof + self.ndim,
+            ] = invJ
+        return mat_invJ
+
+    def detJacobi(self, r_coord, element_coord):
+        if self.ndim == 1:
+            return self.__jacobian(r_coord, element_coord)
+        return self.factor * det(self.__jacobian(r_coord, element_coord))
+
+    def NodeList(self, inci, element_number):
+        return array(inci[element_number, 4 : 4 + self.nodecon], dtype=INT32)
+
+    def NodeCoord(self, coord, node_list):
+        node_list = asarray(node_list) - 1
+        if self.ndim == 1:
+            return array(coord[node_list, 1:4], dtype=FLT64).reshape(-1, 1)
+        return array(coord[node_list, 1 : 1 + self.ndim], dtype=FLT64)
+
+    def LocKey(self, node_list, nodedof):
+        node_list = asarray(node_list, dtype=INT32)
+        dof = array(range(nodedof), dtype=INT32)
+        return (nodedof * node_list[:, None] - (nodedof - dof)[None, :]).ravel()
@@ -7,178 +7,241 @@ from cython.parallel import parallel, prange
 cimport numpy as np
 
 # DTYPE = np.float64
-ctypedef np.int32_t INT32
-ctypedef np.float64_t FLT64
+
+# INT32, FLT64 and the nogil kernels (*Out) are declared in tetr4_tasks.pxd
 
 @cdivision(True)
 @exceptval(check=False)
 @boundscheck(False) # turn off bounds-checking for entire function
-@wraparound(False)  # turn off negative index wrapping for entire function           
-@nonecheck(False) 
-cdef FLT64 [:, ::1] MATN(FLT64 [::1] r_coord):
+@wraparound(False)  # turn off negative index wrapping for entire function
+@nonecheck(False)
+cdef inline void MATN(const FLT64 [::1] r_coord, FLT64 * N) noexcept nogil:
+    # N (4,)
     cdef FLT64 r0 = r_coord[0]
     cdef FLT64 r1 = r_coord[1]
     cdef FLT64 r2 = r_coord[2]
-    N = np.zeros((1,4), dtype=np.float64)
-    cdef FLT64 [:, ::1] N_view = N
-    N_view[0][0] = 1 - r0 - r1 - r2
-    N_view[0][1] = r0
-    N_view[0][2] = r1
-    N_view[0][3] = r2
-    return N
+    N[0] = 1 - r0 - r1 - r2
+    N[1] = r0
+    N[2] = r1
+    N[3] = r2
 
 @cdivision(True)
 @exceptval(check=False)
 @boundscheck(False) # turn off bounds-checking for entire function
-@wraparound(False)  # turn off negative index wrapping for entire function           
-@nonecheck(False) 
-cdef FLT64 [:, ::1] MATDIFFN(FLT64 [::1] r):
-    cdef FLT64 r0 = r[0]
-    cdef FLT64 r1 = r[1]
-    dN = np.zeros((3, 4), dtype=np.float64)
-    cdef FLT64 [:, ::1] dN_view = dN
-    dN_view[0][0] = -1.0
-    dN_view[0][1] = 1.0
-    dN_view[1][0] = -1.0
-    dN_view[1][2] = 1.0
-    dN_view[2][0] = -1.0
-    dN_view[2][3] = 1.0
-    return dN
+@wraparound(False)  # turn off negative index wrapping for entire function
+@nonecheck(False)
+cdef inline void MATDIFFN(const FLT64 [::1] r, FLT64 * dN) noexcept nogil:
+    # dN/dr (3, 4) row major
+    dN[0] = -1.0
+    dN[1] = 1.0
+    dN[2] = 0.0
+    dN[3] = 0.0
+    dN[4] = -1.0
+    dN[5] = 0.0
+    dN[6] = 1.0
+    dN[7] = 0.0
+    dN[8] = -1.0
+    dN[9] = 0.0
+    dN[10] = 0.0
+    dN[11] = 1.0
 
 @cdivision(True)
 @exceptval(check=False)
 @boundscheck(False) # turn off bounds-checking for entire function
-@wraparound(False)  # turn off negative index wrapping for entire function           
-@nonecheck(False)  
-cdef FLT64 [:, ::1] INV(FLT64 [:, ::1] A):
-    cdef FLT64 detA = A[0][0]*A[1][1]*A[2][2] + A[0][1]*A[1][2]*A[2][0] + A[0][2]*A[1][0]*A[2][1] - A[2][0]*A[1][1]*A[0][2] - A[2][1]*A[1][2]*A[0][0] - A[2][2]*A[1][0]*A[0][1]
+@wraparound(False)  # turn off negative index wrapping for entire function
+@nonecheck(False)
+cdef inline void INV(const FLT64 * A, FLT64 * invA) noexcept nogil:
+    # A, invA (3, 3) row major
+    cdef FLT64 detA = A[0]*A[4]*A[8] + A[1]*A[5]*A[6] + A[2]*A[3]*A[7] - A[6]*A[4]*A[2] - A[7]*A[5]*A[0] - A[8]*A[3]*A[1]
     cdef FLT64 invDet = 1.0 / detA
-    invA = np.zeros((3, 3), dtype=np.float64)
-    cdef FLT64 [:, ::1] invA_view = invA
-    invA_view[0][0] = invDet * (A[1][1]*A[2][2]-A[2][1]*A[1][2])
-    invA_view[0][1] = -invDet * (A[0][1]*A[2][2]-A[2][1]*A[0][2])
-    invA_view[0][2] = invDet * (A[0][1]*A[1][2]-A[1][1]*A[0][2])
-    invA_view[1][0] = -invDet * (A[1][0]*A[2][2]-A[2][0]*A[1][2])
-    invA_view[1][1] = invDet * (A[0][0]*A[2][2]-A[2][0]*A[0][2])
-    invA_view[1][2] = -invDet * (A[0][0]*A[1][2]-A[1][0]*A[0][2])
-    invA_view[2][0] = invDet * (A[1][0]*A[2][1]-A[2][0]*A[1][1])
-    invA_view[2][1] = -invDet * (A[0][0]*A[2][1]-A[2][0]*A[0][1])
-    invA_view[2][2] = invDet * (A[0][0]*A[1][1]-A[1][0]*A[0][1])
-    return invA
+    invA[0] = invDet * (A[4]*A[8]-A[7]*A[5])
+    invA[1] = -invDet * (A[1]*A[8]-A[7]*A[2])
+    invA[2] = invDet * (A[1]*A[5]-A[4]*A[2])
+    invA[3] = -invDet * (A[3]*A[8]-A[6]*A[5])
+    invA[4] = invDet * (A[0]*A[8]-A[6]*A[2])
+    invA[5] = -invDet * (A[0]*A[5]-A[3]*A[2])
+    invA[6] = invDet * (A[3]*A[7]-A[6]*A[4])
+    invA[7] = -invDet * (A[0]*A[7]-A[6]*A[1])
+    invA[8] = invDet * (A[0]*A[4]-A[3]*A[1])
 
 @cdivision(True)
 @exceptval(check=False)
 @boundscheck(False) # turn off bounds-checking for entire function
-@wraparound(False)  # turn off negative index wrapping for entire function           
-@nonecheck(False) 
-cdef FLT64 [:, ::1] JACOBIANO(FLT64 [::1] r_coord, FLT64 [:, ::1] element_coord):  
-    cdef FLT64 [:, ::1] diffN = MATDIFFN(r_coord)
-    jac = np.zeros((3, 3), dtype=np.float64)
-    cdef FLT64 [:, ::1] jac_view = jac
-    jac_view[0][0] = diffN[0][0]*element_coord[0][0]+diffN[0][1]*element_coord[1][0]+diffN[0][2]*element_coord[2][0]+diffN[0][3]*element_coord[3][0]
-    jac_view[0][1] = diffN[0][0]*element_coord[0][1]+diffN[0][1]*element_coord[1][1]+diffN[0][2]*element_coord[2][1]+diffN[0][3]*element_coord[3][1]
-    jac_view[0][2] = diffN[0][0]*element_coord[0][2]+diffN[0][1]*element_coord[1][2]+diffN[0][2]*element_coord[2][2]+diffN[0][3]*element_coord[3][2]
-    jac_view[1][0] = diffN[1][0]*element_coord[0][0]+diffN[1][1]*element_coord[1][0]+diffN[1][2]*element_coord[2][0]+diffN[1][3]*element_coord[3][0]
-    jac_view[1][1] = diffN[1][0]*element_coord[0][1]+diffN[1][1]*element_coord[1][1]+diffN[1][2]*element_coord[2][1]+diffN[1][3]*element_coord[3][1]
-    jac_view[1][2] = diffN[1][0]*element_coord[0][2]+diffN[1][1]*element_coord[1][2]+diffN[1][2]*element_coord[2][2]+diffN[1][3]*element_coord[3][2]
-    jac_view[2][0] = diffN[2][0]*element_coord[0][0]+diffN[2][1]*element_coord[1][0]+diffN[2][2]*element_coord[2][0]+diffN[2][3]*element_coord[3][0]
-    jac_view[2][1] = diffN[2][0]*element_coord[0][1]+diffN[2][1]*element_coord[1][1]+diffN[2][2]*element_coord[2][1]+diffN[2][3]*element_coord[3][1]
-    jac_view[2][2] = diffN[2][0]*element_coord[0][2]+diffN[2][1]*element_coord[1][2]+diffN[2][2]*element_coord[2][2]+diffN[2][3]*element_coord[3][2]    
-    return jac
+@wraparound(False)  # turn off negative index wrapping for entire function
+@nonecheck(False)
+cdef inline void JACOBIANO(const FLT64 [::1] r_coord, const FLT64 [:, ::1] element_coord, FLT64 * J) noexcept nogil:
+    # J (3, 3) row major
+    cdef FLT64 diffN[12]
+    cdef Py_ssize_t ii, jj, kk
+    cdef FLT64 acc
+    MATDIFFN(r_coord, diffN)
+    for ii in range(3):
+        for jj in range(3):
+            acc = diffN[ii*4]*element_coord[0, jj]
+            for kk in range(1, 4):
+                acc = acc + diffN[ii*4+kk]*element_coord[kk, jj]
+            J[ii*3+jj] = acc
 
+@cdivision(True)
+@exceptval(check=False)
 @boundscheck(False) # turn off bounds-checking for entire function
-@wraparound(False)  # turn off negative index wrapping for entire function                  
-def ShapeFunctions(FLT64 [::1] r_coord, INT32 nodedof):
-    cdef FLT64 [:, ::1] shape_function = MATN(r_coord)
-    matN = np.zeros((nodedof, 4*nodedof), dtype=np.float64) 
-    cdef FLT64 [:, ::1] matN_view = matN
+@wraparound(False)  # turn off negative index wrapping for entire function
+@nonecheck(False)
+cdef void ShapeFunctionsOut(const FLT64 [::1] r_coord, INT32 nodedof, FLT64 [:, ::1] out) noexcept nogil:
+    # out (nodedof, 4*nodedof)
+    cdef FLT64 N[4]
     cdef Py_ssize_t block, dof
+    MATN(r_coord, N)
+    out[:, :] = 0.0
     for block in range(4):
         for dof in range(nodedof):
-            matN_view[dof, block*nodedof+dof] = shape_function[0, block]
-    return matN
+            out[dof, block*nodedof+dof] = N[block]
 
+@cdivision(True)
+@exceptval(check=False)
 @boundscheck(False) # turn off bounds-checking for entire function
-@wraparound(False)  # turn off negative index wrapping for entire function           
-def DiffShapeFuntion(FLT64 [::1] r_coord, INT32 nodedof):
-    cdef FLT64 [:, ::1] diff_shape_function = MATDIFFN(r_coord)
-    matdiffN = np.zeros((3*nodedof, 4*nodedof), dtype=np.float64) 
-    cdef FLT64 [:, ::1] matdiffN_view = matdiffN
-    cdef Py_ssize_t block, dof
+@wraparound(False)  # turn off negative index wrapping for entire function
+@nonecheck(False)
+cdef void DiffShapeFuntionOut(const FLT64 [::1] r_coord, INT32 nodedof, FLT64 [:, ::1] out) noexcept nogil:
+    # out (3*nodedof, 4*nodedof)
+    cdef FLT64 diffN[12]
+    cdef Py_ssize_t block, dof, dim
+    MATDIFFN(r_coord, diffN)
+    out[:, :] = 0.0
     for block in range(4):
         for dof in range(nodedof):
-            matdiffN_view[nodedof*dof-dof*(nodedof-3), block*nodedof+dof] = diff_shape_function[0, block]
-            matdiffN_view[nodedof*dof-dof*(nodedof-3)+1, block*nodedof+dof] = diff_shape_function[1, block]
-            matdiffN_view[nodedof*dof-dof*(nodedof-3)+2, block*nodedof+dof] = diff_shape_function[2, block]
-    return matdiffN
-    
+            for dim in range(3):
+                out[3*dof+dim, block*nodedof+dof] = diffN[dim*4+block]
+
+@cdivision(True)
+@exceptval(check=False)
 @boundscheck(False) # turn off bounds-checking for entire function
-@wraparound(False)  # turn off negative index wrapping for entire function           
-def Jacobian(FLT64 [::1] r_coord, FLT64 [:, ::1] element_coord):  
-    cdef FLT64 [:, ::1] Jac = JACOBIANO(r_coord, element_coord)
-    return Jac
+@wraparound(False)  # turn off negative index wrapping for entire function
+@nonecheck(False)
+cdef void JacobianOut(const FLT64 [::1] r_coord, const FLT64 [:, ::1] element_coord, FLT64 [:, ::1] out) noexcept nogil:
+    # out (3, 3)
+    cdef FLT64 J[9]
+    cdef Py_ssize_t dimr, dimc
+    JACOBIANO(r_coord, element_coord, J)
+    for dimr in range(3):
+        for dimc in range(3):
+            out[dimr, dimc] = J[dimr*3+dimc]
 
+@cdivision(True)
+@exceptval(check=False)
 @boundscheck(False) # turn off bounds-checking for entire function
-@wraparound(False)  # turn off negative index wrapping for entire function           
-def invJacobi(FLT64 [::1] r_coord, FLT64 [:, ::1] element_coord, INT32 nodedof):
-    cdef FLT64 [:, ::1] Jac = JACOBIANO(r_coord, element_coord)
-    cdef FLT64 [:, ::1] invJ = INV(Jac)
-    mat_invJ = np.zeros((3*nodedof, 3*nodedof), dtype=np.float64)  
-    cdef FLT64 [:, ::1] mat_invJ_view = mat_invJ
+@wraparound(False)  # turn off negative index wrapping for entire function
+@nonecheck(False)
+cdef void invJacobiOut(const FLT64 [::1] r_coord, const FLT64 [:, ::1] element_coord, INT32 nodedof, FLT64 [:, ::1] out) noexcept nogil:
+    # out (3*nodedof, 3*nodedof), invJ in the diagonal blocks
+    cdef FLT64 J[9]
+    cdef FLT64 invJ[9]
     cdef Py_ssize_t block, dimr, dimc
+    JACOBIANO(r_coord, element_coord, J)
+    INV(J, invJ)
+    out[:, :] = 0.0
     for block in range(nodedof):
         for dimr in range(3):
             for dimc in range(3):
-                mat_invJ_view[block*nodedof+dimr, block*nodedof+dimc] = invJ[dimr, dimc]
-    return mat_invJ
+                out[block*nodedof+dimr, block*nodedof+dimc] = invJ[dimr*3+dimc]
 
+@cdivision(True)
+@exceptval(check=False)
 @boundscheck(False) # turn off bounds-checking for entire function
-@wraparound(False)  # turn off negative index wrapping for entire function             
-def detJacobi(FLT64 [::1] r_coord, FLT64 [:, ::1] element_coord):
-    cdef FLT64 [:, ::1] Jac = JACOBIANO(r_coord, element_coord)
-    cdef FLT64 detJ = Jac[0][0]*Jac[1][1]*Jac[2][2] + Jac[0][1]*Jac[1][2]*Jac[2][0] + Jac[0][2]*Jac[1][0]*Jac[2][1] - Jac[2][0]*Jac[1][1]*Jac[0][2] - Jac[2][1]*Jac[1][2]*Jac[0][0] - Jac[2][2]*Jac[1][0]*Jac[0][1]
+@wraparound(False)  # turn off negative index wrapping for entire function
+@nonecheck(False)
+cdef FLT64 detJacobiOut(const FLT64 [::1] r_coord, const FLT64 [:, ::1] element_coord) noexcept nogil:
+    cdef FLT64 J[9]
+    cdef FLT64 detJ
+    JACOBIANO(r_coord, element_coord, J)
+    detJ = J[0]*J[4]*J[8] + J[1]*J[5]*J[6] + J[2]*J[3]*J[7] - J[6]*J[4]*J[2] - J[7]*J[5]*J[0] - J[8]*J[3]*J[1]
     return 0.166666666666667*detJ
 
+@cdivision(True)
+@exceptval(check=False)
 @boundscheck(False) # turn off bounds-checking for entire function
-@wraparound(False)  # turn off negative index wrapping for entire function            
-def NodeList(INT32 [:, ::1] inci, INT32 element_number):
-    cdef INT32 noi = int(inci[element_number, 4])
-    cdef INT32 noj = int(inci[element_number, 5])
-    cdef INT32 nok = int(inci[element_number, 6])
-    cdef INT32 nol = int(inci[element_number, 7])
-    cdef INT32 [::1] node_list = np.array([noi, noj, nok, nol], dtype=np.int32)                  
-    return node_list
-            
-@boundscheck(False) # turn off bounds-checking for entire function
-@wraparound(False)  # turn off negative index wrapping for entire function           
-def NodeCoord(FLT64 [:, ::1] coord, INT32 [::1] node_list):
-    cdef INT32 noi = node_list[0]
-    cdef INT32 noj = node_list[1]
-    cdef INT32 nok = node_list[2]
-    cdef INT32 nol = node_list[3]
-    cdef FLT64 xi = coord[noi - 1, 1]
-    cdef FLT64 yi = coord[noi - 1, 2]
-    cdef FLT64 zi = coord[noi - 1, 3]
-    cdef FLT64 xj = coord[noj - 1, 1]
-    cdef FLT64 yj = coord[noj - 1, 2]
-    cdef FLT64 zj = coord[noj - 1, 3]
-    cdef FLT64 xk = coord[nok - 1, 1]
-    cdef FLT64 yk = coord[nok - 1, 2]
-    cdef FLT64 zk = coord[nok - 1, 3]
-    cdef FLT64 xl = coord[nol - 1, 1]
-    cdef FLT64 yl = coord[nol - 1, 2]
-    cdef FLT64 zl = coord[nol - 1, 3]
-    cdef FLT64 [:, ::1] element_coord = np.array([[xi, yi, zi], [xj, yj, zj], [xk, yk, zk], [xl, yl, zl]], dtype=np.float64)
-    return element_coord
+@wraparound(False)  # turn off negative index wrapping for entire function
+@nonecheck(False)
+cdef void NodeListOut(const INT32 [:, ::1] inci, Py_ssize_t element_number, INT32 [::1] out) noexcept nogil:
+    # out (4,)
+    cdef Py_ssize_t node
+    for node in range(4):
+        out[node] = inci[element_number, 4 + node]
 
+@cdivision(True)
+@exceptval(check=False)
+@boundscheck(False) # turn off bounds-checking for entire function
+@wraparound(False)  # turn off negative index wrapping for entire function
+@nonecheck(False)
+cdef void NodeCoordOut(const FLT64 [:, ::1] coord, const INT32 [::1] node_list, FLT64 [:, ::1] out) noexcept nogil:
+    # out (4, 3)
+    cdef Py_ssize_t node, dim
+    for node in range(4):
+        for dim in range(3):
+            out[node, dim] = coord[node_list[node] - 1, 1 + dim]
 
+@cdivision(True)
+@exceptval(check=False)
 @boundscheck(False) # turn off bounds-checking for entire function
-@wraparound(False)  # turn off negative index wrapping for entire function           
-def LocKey(INT32 [::1] node_list, INT32 nodedof):
-    shape_key = np.zeros(4*nodedof, dtype=np.int32)
-    cdef INT32 [::1] shape_key_view = shape_key
+@wraparound(False)  # turn off negative index wrapping for entire function
+@nonecheck(False)
+cdef void LocKeyOut(const INT32 [::1] node_list, INT32 nodedof, INT32 [::1] out) noexcept nogil:
+    # out (4*nodedof,)
     cdef Py_ssize_t node, dof
-    for node in range(len(node_list)):
+    for node in range(node_list.shape[0]):
         for dof in range(nodedof):
-            shape_key_view[nodedof*node+dof] = nodedof * node_list[node] - (nodedof-dof)
-    return shape_key
\ No newline at end of file
+            out[nodedof*node+dof] = nodedof * node_list[node] - (nodedof-dof)
+
+@boundscheck(False) # turn off bounds-checking for entire function
+@wraparound(False)  # turn off negative index wrapping for entire function
+def ShapeFunctions(const FLT64 [::1] r_coord, INT32 nodedof):
+    matN = np.empty((nodedof, 4*nodedof), dtype=np.float64)
+    ShapeFunctionsOut(r_coord, nodedof, matN)
+    return matN
+
+@boundscheck(False) # turn off bounds-checking for entire function
+@wraparound(False)  # turn off negative index wrapping for entire function
+def DiffShapeFuntion(const FLT64 [::1] r_coord, INT32 nodedof):
+    matdiffN = np.empty((3*nodedof, 4*nodedof), dtype=np.float64)
+    DiffShapeFuntionOut(r_coord, nodedof, matdiffN)
+    return matdiffN
+
+@boundscheck(False) # turn off bounds-checking for entire function
+@wraparound(False)  # turn off negative index wrapping for entire function
+def Jacobian(const FLT64 [::1] r_coord, const FLT64 [:, ::1] element_coord):
+    jac = np.empty((3, 3), dtype=np.float64)
+    JacobianOut(r_coord, element_coord, jac)
+    return jac
+
+@boundscheck(False) # turn off bounds-checking for entire function
+@wraparound(False)  # turn off negative index wrapping for entire function
+def invJacobi(const FLT64 [::1] r_coord, const FLT64 [:, ::1] element_coord, INT32 nodedof):
+    mat_invJ = np.empty((3*nodedof, 3*nodedof), dtype=np.float64)
+    invJacobiOut(r_coord, element_coord, nodedof, mat_invJ)
+    return mat_invJ
+
+@boundscheck(False) # turn off bounds-checking for entire function
+@wraparound(False)  # turn off negative index wrapping for entire function
+def detJacobi(const FLT64 [::1] r_coord, const FLT64 [:, ::1] element_coord):
+    return detJacobiOut(r_coord, element_coord)
+
+@boundscheck(False) # turn off bounds-checking for entire function
+@wraparound(False)  # turn off negative index wrapping for entire function
+def NodeList(const INT32 [:, ::1] inci, INT32 element_number):
+    node_list = np.empty(4, dtype=np.int32)
+    NodeListOut(inci, element_number, node_list)
+    return node_list
+
+@boundscheck(False) # turn off bounds-checking for entire function
+@wraparound(False)  # turn off negative index wrapping for entire function
+def NodeCoord(const FLT64 [:, ::1] coord, const INT32 [::1] node_list):
+    element_coord = np.empty((4, 3), dtype=np.float64)
+    NodeCoordOut(coord, node_list, element_coord)
+    return element_coord
+
+@boundscheck(False) # turn off bounds-checking for entire function
+@wraparound(False)  # turn off negative index wrapping for entire function
+def LocKey(const INT32 [::1] node_list, INT32 nodedof):
+    shape_key = np.empty(4*nodedof, dtype=np.int32)
+    LocKeyOut(node_list, nodedof, shape_key)
+    return shape_key
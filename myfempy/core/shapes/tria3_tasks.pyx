@@ -7,163 +7,228 @@ from cython.parallel import parallel, prange
 cimport numpy as np
 
 # DTYPE = np.float64
-ctypedef np.int32_t INT32
-ctypedef np.float64_t FLT64
+
+# INT32, FLT64 and the nogil kernels (*Out) are declared in tria3_tasks.pxd
 
 @cdivision(True)
 @exceptval(check=False)
 @boundscheck(False) # turn off bounds-checking for entire function
-@wraparound(False)  # turn off negative index wrapping for entire function           
-@nonecheck(False) 
-cdef FLT64 [:, ::1] MATN(FLT64 [::1] r_coord):
+@wraparound(False)  # turn off negative index wrapping for entire function
+@nonecheck(False)
+cdef inline void MATN(const FLT64 [::1] r_coord, FLT64 * N) noexcept nogil:
+    # N (3,)
     cdef FLT64 r0 = r_coord[0]
     cdef FLT64 r1 = r_coord[1]
-    N = np.zeros((1,3), dtype=np.float64)
-    cdef FLT64 [:, ::1] N_view = N
-    N_view[0][0] = 1 -r0 - r1
-    N_view[0][1] = r0
-    N_view[0][2] = r1
-    return N
+    N[0] = 1 -r0 - r1
+    N[1] = r0
+    N[2] = r1
 
 @cdivision(True)
 @exceptval(check=False)
 @boundscheck(False) # turn off bounds-checking for entire function
-@wraparound(False)  # turn off negative index wrapping for entire function           
-@nonecheck(False) 
-cdef FLT64 [:, ::1] MATDIFFN(FLT64 [::1] r):
-    cdef FLT64 r0 = r[0]
-    cdef FLT64 r1 = r[1]
-    dN = np.zeros((2,3), dtype=np.float64)
-    cdef FLT64 [:, ::1] dN_view = dN
-    dN_view[0][0] = -1.0
-    dN_view[0][1] = 1.0
-    dN_view[1][0] = -1.0
-    dN_view[1][2] = 1.0
-    return dN
-
-# @cdivision(True)
-# @exceptval(check=False)
-# @boundscheck(False) # turn off bounds-checking for entire function
-# @wraparound(False)  # turn off negative index wrapping for entire function           
-# @nonecheck(False) 
-# cdef FLT64 DET(FLT64 [:, ::1] A):
-#     cdef FLT64 det = A[0][0]*A[1][1]-A[0][1]*A[1][0]
-#     return det
+@wraparound(False)  # turn off negative index wrapping for entire function
+@nonecheck(False)
+cdef inline void MATDIFFN(const FLT64 [::1] r, FLT64 * dN) noexcept nogil:
+    # dN/dr (2, 3) row major
+    dN[0] = -1.0
+    dN[1] = 1.0
+    dN[2] = 0.0
+    dN[3] = -1.0
+    dN[4] = 0.0
+    dN[5] = 1.0
 
 @cdivision(True)
 @exceptval(check=False)
 @boundscheck(False) # turn off bounds-checking for entire function
-@wraparound(False)  # turn off negative index wrapping for entire function           
-@nonecheck(False)  
-cdef FLT64 [:, ::1] INV(FLT64 [:, ::1] A):
-    cdef FLT64 detA = A[0][0] * A[1][1] - A[0][1] * A[1][0]
+@wraparound(False)  # turn off negative index wrapping for entire function
+@nonecheck(False)
+cdef inline void INV(const FLT64 * A, FLT64 * invA) noexcept nogil:
+    # A, invA (2, 2) row major
+    cdef FLT64 detA = A[0] * A[3] - A[1] * A[2]
     cdef FLT64 invDet = 1.0 / detA
-    invA = np.zeros((2, 2), dtype=np.float64)
-    cdef FLT64 [:, ::1] invA_view = invA
-    invA_view[0][0] = invDet * A[1][1]
-    invA_view[0][1] = -invDet * A[0][1]
-    invA_view[1][0] = -invDet * A[1][0]
-    invA_view[1][1] = invDet * A[0][0]
-    return invA
+    invA[0] = invDet * A[3]
+    invA[1] = -invDet * A[1]
+    invA[2] = -invDet * A[2]
+    invA[3] = invDet * A[0]
 
 @cdivision(True)
 @exceptval(check=False)
 @boundscheck(False) # turn off bounds-checking for entire function
-@wraparound(False)  # turn off negative index wrapping for entire function           
-@nonecheck(False) 
-cdef FLT64 [:, ::1] JACOBIANO(FLT64 [::1] r_coord, FLT64 [:, ::1] element_coord):  
-    cdef FLT64 [:, ::1] diffN = MATDIFFN(r_coord)  
-    jac = np.zeros((2, 2), dtype=np.float64)
-    cdef FLT64 [:, ::1] jac_view = jac
-    jac_view[0][0] = diffN[0][0]*element_coord[0][0]+diffN[0][1]*element_coord[1][0]+diffN[0][2]*element_coord[2][0]
-    jac_view[0][1] = diffN[0][0]*element_coord[0][1]+diffN[0][1]*element_coord[1][1]+diffN[0][2]*element_coord[2][1]
-    jac_view[1][0] = diffN[1][0]*element_coord[0][0]+diffN[1][1]*element_coord[1][0]+diffN[1][2]*element_coord[2][0]
-    jac_view[1][1] = diffN[1][0]*element_coord[0][1]+diffN[1][1]*element_coord[1][1]+diffN[1][2]*element_coord[2][1]
-    return jac
+@wraparound(False)  # turn off negative index wrapping for entire function
+@nonecheck(False)
+cdef inline void JACOBIANO(const FLT64 [::1] r_coord, const FLT64 [:, ::1] element_coord, FLT64 * J) noexcept nogil:
+    # J (2, 2) row major
+    cdef FLT64 diffN[6]
+    cdef Py_ssize_t ii, jj, kk
+    cdef FLT64 acc
+    MATDIFFN(r_coord, diffN)
+    for ii in range(2):
+        for jj in range(2):
+            acc = diffN[ii*3]*element_coord[0, jj]
+            for kk in range(1, 3):
+                acc = acc + diffN[ii*3+kk]*element_coord[kk, jj]
+            J[ii*2+jj] = acc
 
+@cdivision(True)
+@exceptval(check=False)
 @boundscheck(False) # turn off bounds-checking for entire function
-@wraparound(False)  # turn off negative index wrapping for entire function                
-def ShapeFunctions(FLT64 [::1] r_coord, INT32 nodedof):
-    cdef FLT64 [:, ::1] shape_function = MATN(r_coord)
-    matN = np.zeros((nodedof, 3*nodedof), dtype=np.float64) 
-    cdef FLT64 [:, ::1] matN_view = matN
+@wraparound(False)  # turn off negative index wrapping for entire function
+@nonecheck(False)
+cdef void ShapeFunctionsOut(const FLT64 [::1] r_coord, INT32 nodedof, FLT64 [:, ::1] out) noexcept nogil:
+    # out (nodedof, 3*nodedof)
+    cdef FLT64 N[3]
     cdef Py_ssize_t block, dof
+    MATN(r_coord, N)
+    out[:, :] = 0.0
     for block in range(3):
         for dof in range(nodedof):
-            matN_view[dof, block*nodedof+dof] = shape_function[0, block]
-    return matN
+            out[dof, block*nodedof+dof] = N[block]
 
+@cdivision(True)
+@exceptval(check=False)
 @boundscheck(False) # turn off bounds-checking for entire function
-@wraparound(False)  # turn off negative index wrapping for entire function           
-def DiffShapeFuntion(FLT64 [::1] r_coord, INT32 nodedof):
-    cdef FLT64 [:, ::1] diff_shape_function = MATDIFFN(r_coord)
-    matdiffN = np.zeros((2*nodedof, 3*nodedof), dtype=np.float64) 
-    cdef FLT64 [:, ::1] matdiffN_view = matdiffN
-    cdef Py_ssize_t block, dof
+@wraparound(False)  # turn off negative index wrapping for entire function
+@nonecheck(False)
+cdef void DiffShapeFuntionOut(const FLT64 [::1] r_coord, INT32 nodedof, FLT64 [:, ::1] out) noexcept nogil:
+    # out (2*nodedof, 3*nodedof)
+    cdef FLT64 diffN[6]
+    cdef Py_ssize_t block, dof, dim
+    MATDIFFN(r_coord, diffN)
+    out[:, :] = 0.0
     for block in range(3):
         for dof in range(nodedof):
-            matdiffN_view[nodedof*dof-dof*(nodedof-2), block*nodedof+dof] = diff_shape_function[0, block]
-            matdiffN_view[nodedof*dof-dof*(nodedof-2)+1, block*nodedof+dof] = diff_shape_function[1, block]
-    return matdiffN
-    
-@boundscheck(False) # turn off bounds-checking for entire function
-@wraparound(False)  # turn off negative index wrapping for entire function           
-def Jacobian(FLT64 [::1] r_coord, FLT64 [:, ::1] element_coord):  
-    cdef FLT64 [:, ::1] Jac = JACOBIANO(r_coord, element_coord)
-    return Jac
-    
-@boundscheck(False) # turn off bounds-checking for entire function
-@wraparound(False)  # turn off negative index wrapping for entire function             
-def invJacobi(FLT64 [::1] r_coord, FLT64 [:, ::1] element_coord, INT32 nodedof):
-    cdef FLT64 [:, ::1] Jac = JACOBIANO(r_coord, element_coord)
-    cdef FLT64 [:, ::1] invJ = INV(Jac)
-    mat_invJ = np.zeros((2*nodedof, 2*nodedof), dtype=np.float64)  
-    cdef FLT64 [:, ::1] mat_invJ_view = mat_invJ
+            for dim in range(2):
+                out[2*dof+dim, block*nodedof+dof] = diffN[dim*3+block]
+
+@cdivision(True)
+@exceptval(check=False)
+@boundscheck(False) # turn off bounds-checking for entire function
+@wraparound(False)  # turn off negative index wrapping for entire function
+@nonecheck(False)
+cdef void JacobianOut(const FLT64 [::1] r_coord, const FLT64 [:, ::1] element_coord, FLT64 [:, ::1] out) noexcept nogil:
+    # out (2, 2)
+    cdef FLT64 J[4]
+    cdef Py_ssize_t dimr, dimc
+    JACOBIANO(r_coord, element_coord, J)
+    for dimr in range(2):
+        for dimc in range(2):
+            out[dimr, dimc] = J[dimr*2+dimc]
+
+@cdivision(True)
+@exceptval(check=False)
+@boundscheck(False) # turn off bounds-checking for entire function
+@wraparound(False)  # turn off negative index wrapping for entire function
+@nonecheck(False)
+cdef void invJacobiOut(const FLT64 [::1] r_coord, const FLT64 [:, ::1] element_coord, INT32 nodedof, FLT64 [:, ::1] out) noexcept nogil:
+    # out (2*nodedof, 2*nodedof), invJ in the diagonal blocks
+    cdef FLT64 J[4]
+    cdef FLT64 invJ[4]
     cdef Py_ssize_t block, dimr, dimc
+    JACOBIANO(r_coord, element_coord, J)
+    INV(J, invJ)
+    out[:, :] = 0.0
     for block in range(nodedof):
         for dimr in range(2):
             for dimc in range(2):
-                mat_invJ_view[block*nodedof+dimr, block*nodedof+dimc] = invJ[dimr, dimc]
-    return mat_invJ
+                out[block*nodedof+dimr, block*nodedof+dimc] = invJ[dimr*2+dimc]
 
+@cdivision(True)
+@exceptval(check=False)
 @boundscheck(False) # turn off bounds-checking for entire function
-@wraparound(False)  # turn off negative index wrapping for entire function             
-def detJacobi(FLT64 [::1] r_coord, FLT64 [:, ::1] element_coord):
-    cdef FLT64 [:, ::1] Jac = JACOBIANO(r_coord, element_coord)
-    cdef FLT64 detJ = Jac[0][0] * Jac[1][1] - Jac[0][1] * Jac[1][0]
+@wraparound(False)  # turn off negative index wrapping for entire function
+@nonecheck(False)
+cdef FLT64 detJacobiOut(const FLT64 [::1] r_coord, const FLT64 [:, ::1] element_coord) noexcept nogil:
+    cdef FLT64 J[4]
+    cdef FLT64 detJ
+    JACOBIANO(r_coord, element_coord, J)
+    detJ = J[0] * J[3] - J[1] * J[2]
     return 0.5*detJ
 
+@cdivision(True)
+@exceptval(check=False)
 @boundscheck(False) # turn off bounds-checking for entire function
-@wraparound(False)  # turn off negative index wrapping for entire function               
-def NodeList(INT32 [:, ::1] inci, INT32 element_number):
-    cdef INT32 noi = inci[element_number, 4]
-    cdef INT32 noj = inci[element_number, 5]
-    cdef INT32 nok = inci[element_number, 6]
-    cdef INT32 [::1] node_list = np.array([noi, noj, nok], dtype=np.int32)                  
-    return node_list
-            
-@boundscheck(False) # turn off bounds-checking for entire function
-@wraparound(False)  # turn off negative index wrapping for entire function           
-def NodeCoord(FLT64 [:, ::1] coord, INT32 [::1] node_list):
-    cdef INT32 noi = node_list[0]
-    cdef INT32 noj = node_list[1]
-    cdef INT32 nok = node_list[2]
-    cdef FLT64 xi = coord[noi - 1, 1]
-    cdef FLT64 yi = coord[noi - 1, 2]
-    cdef FLT64 xj = coord[noj - 1, 1]
-    cdef FLT64 yj = coord[noj - 1, 2]
-    cdef FLT64 xk = coord[nok - 1, 1]
-    cdef FLT64 yk = coord[nok - 1, 2]
-    cdef FLT64 [:, ::1] element_coord = np.array([[xi, yi], [xj, yj], [xk, yk]], dtype=np.float64)
-    return element_coord
+@wraparound(False)  # turn off negative index wrapping for entire function
+@nonecheck(False)
+cdef void NodeListOut(const INT32 [:, ::1] inci, Py_ssize_t element_number, INT32 [::1] out) noexcept nogil:
+    # out (3,)
+    cdef Py_ssize_t node
+    for node in range(3):
+        out[node] = inci[element_number, 4 + node]
+
+@cdivision(True)
+@exceptval(check=False)
+@boundscheck(False) # turn off bounds-checking for entire function
+@wraparound(False)  # turn off negative index wrapping for entire function
+@nonecheck(False)
+cdef void NodeCoordOut(const FLT64 [:, ::1] coord, const INT32 [::1] node_list, FLT64 [:, ::1] out) noexcept nogil:
+    # out (3, 2)
+    cdef Py_ssize_t node, dim
+    for node in range(3):
+        for dim in range(2):
+            out[node, dim] = coord[node_list[node] - 1, 1 + dim]
 
+@cdivision(True)
+@exceptval(check=False)
 @boundscheck(False) # turn off bounds-checking for entire function
-@wraparound(False)  # turn off negative index wrapping for entire function           
-def LocKey(INT32 [::1] node_list, INT32 nodedof):
-    shape_key = np.zeros(3*nodedof, dtype=np.int32)
-    cdef INT32 [::1] shape_key_view = shape_key
+@wraparound(False)  # turn off negative index wrapping for entire function
+@nonecheck(False)
+cdef void LocKeyOut(const INT32 [::1] node_list, INT32 nodedof, INT32 [::1] out) noexcept nogil:
+    # out (3*nodedof,)
     cdef Py_ssize_t node, dof
-    for node in range(len(node_list)):
+    for node in range(node_list.shape[0]):
         for dof in range(nodedof):
-            shape_key_view[nodedof*node+dof] = nodedof * node_list[node] - (nodedof-dof)
-    return shape_key
\ No newline at end of file
+            out[nodedof*node+dof] = nodedof * node_list[node] - (nodedof-dof)
+
+@boundscheck(False) # turn off bounds-checking for entire function
+@wraparound(False)  # turn off negative index wrapping for entire function
+def ShapeFunctions(const FLT64 [::1] r_coord, INT32 nodedof):
+    matN = np.empty((nodedof, 3*nodedof), dtype=np.float64)
+    ShapeFunctionsOut(r_coord, nodedof, matN)
+    return matN
+
+@boundscheck(False) # turn off bounds-checking for entire function
+@wraparound(False)  # turn off negative index wrapping for entire function
+def DiffShapeFuntion(const FLT64 [::1] r_coord, INT32 nodedof):
+    matdiffN = np.empty((2*nodedof, 3*nodedof), dtype=np.float64)
+    DiffShapeFuntionOut(r_coord, nodedof, matdiffN)
+    return matdiffN
+
+@boundscheck(False) # turn off bounds-checking for entire function
+@wraparound(False)  # turn off negative index wrapping for entire function
+def Jacobian(const FLT64 [::1] r_coord, const FLT64 [:, ::1] element_coord):
+    jac = np.empty((2, 2), dtype=np.float64)
+    JacobianOut(r_coord, element_coord, jac)
+    return jac
+
+@boundscheck(False) # turn off bounds-checking for entire function
+@wraparound(False)  # turn off negative index wrapping for entire function
+def invJacobi(const FLT64 [::1] r_coord, const FLT64 [:, ::1] element_coord, INT32 nodedof):
+    mat_invJ = np.empty((2*nodedof, 2*nodedof), dtype=np.float64)
+    invJacobiOut(r_coord, element_coord, nodedof, mat_invJ)
+    return mat_invJ
+
+@boundscheck(False) # turn off bounds-checking for entire function
+@wraparound(False)  # turn off negative index wrapping for entire function
+def detJacobi(const FLT64 [::1] r_coord, const FLT64 [:, ::1] element_coord):
+    return detJacobiOut(r_coord, element_coord)
+
+@boundscheck(False) # turn off bounds-checking for entire function
+@wraparound(False)  # turn off negative index wrapping for entire function
+def NodeList(const INT32 [:, ::1] inci, INT32 element_number):
+    node_list = np.empty(3, dtype=np.int32)
+    NodeListOut(inci, element_number, node_list)
+    return node_list
+
+@boundscheck(False) # turn off bounds-checking for entire function
+@wraparound(False)  # turn off negative index wrapping for entire function
+def NodeCoord(const FLT64 [:, ::1] coord, const INT32 [::1] node_list):
+    element_coord = np.empty((3, 2), dtype=np.float64)
+    NodeCoordOut(coord, node_list, element_coord)
+    return element_coord
+
+@boundscheck(False) # turn off bounds-checking for entire function
+@wraparound(False)  # turn off negative index wrapping for entire function
+def LocKey(const INT32 [::1] node_list, INT32 nodedof):
+    shape_key = np.empty(3*nodedof, dtype=np.int32)
+    LocKeyOut(node_list, nodedof, shape_key)
+    return shape_key
@@ -0,0 +1,306 @@
+from __future__ import annotations
+
+from numpy import (abs, arange, argsort, asarray, bincount, concatenate,
+                   cumsum, diff, float64, full, inf, int32, int64, maximum,
+                   ones, repeat, sqrt, unique, where, zeros)
+from numpy.linalg import pinv, qr
+from numpy.random import default_rng
+from scipy.sparse import csc_matrix, csr_matrix, diags, tril, triu
+from scipy.sparse.linalg import LinearOperator, splu
+
+INT32 = int32
+INT64 = int64
+FLT64 = float64
+
+# strength of connection threshold, |C_ij| >= theta sqrt(C_ii C_jj) on the nodal graph
+AMG_THETA = 0.08
+# prolongator smoothing, omega = AMG_OMEGA / rho(D^-1 A)
+AMG_OMEGA = 4.0 / 3.0
+# max size of the coarsest level (direct solve) and max number of levels
+AMG_COARSE = 500
+AMG_MAXLEVEL = 10
+# power iterations of the spectral radius estimate
+AMG_POWERIT = 15
+
+
+def getRigidBodyModes(coord, nodedof, dofs=None):
+    """
+    getRigidBodyModes rigid body modes of the mesh, near nullspace of the stiffness
+
+    nodedof 1 (heat): constant. nodedof 2 (plane): 2 translations and the
+    in-plane rotation. nodedof 3 (solid): 3 translations and 3 rotations.
+    nodedof 6 (beam ux, uy, uz, rx, ry, rz): 3 translations and 3 rotations.
+    Other nodedof: a constant per node dof.
+
+    Arguments:
+        coord -- nodes coordinates [id, x, y, z]
+        nodedof -- dofs per node
+        dofs -- dofs list of the rows (e.g. freedof), None for all dofs
+
+    Returns:
+        array (ndofs, nmodes)
+    """
+    xyz = asarray(coord, dtype=FLT64)[:, 1:4]
+    xyz = xyz - xyz.mean(axis=0)
+    x, y, z = xyz[:, 0], xyz[:, 1], xyz[:, 2]
+    nnode = xyz.shape[0]
+    if nodedof == 2:
+        B = zeros((nnode, 2, 3), dtype=FLT64)
+        B[:, 0, 0] = 1.0
+        B[:, 1, 1] = 1.0
+        B[:, 0, 2] = -y
+        B[:, 1, 2] = x
+    elif nodedof in (3, 6):
+        B = zeros((nnode, nodedof, 6), dtype=FLT64)
+        B[:, 0, 0] = 1.0
+        B[:, 1, 1] = 1.0
+        B[:, 2, 2] = 1.0
+        # rotations about x, y, z: u = theta x r
+        B[:, 1, 3], B[:, 2, 3] = -z, y
+        B[:, 0, 4], B[:, 2, 4] = z, -x
+        B[:, 0, 5], B[:, 1, 5] = -y, x
+        if nodedof == 6:
+            B[:, 3, 3] = 1.0
+            B[:, 4, 4] = 1.0
+            B[:, 5, 5] = 1.0
+    else:
+        B = zeros((nnode, nodedof, nodedof), dtype=FLT64)
+        B[:, arange(nodedof), arange(nodedof)] = 1.0
+    B = B.reshape(nnode * nodedof, -1)
+    if dofs is not None:
+        B = B[asarray(dofs).ravel()]
+    return B
+
+
+def _getMaxNeighbor(S, value):
+    # max of value over the neighbors of each node (CSR rows), -inf with no neighbor
+    out = full(S.shape[0], -inf, dtype=FLT64)
+    rows = where(diff(S.indptr) > 0)[0]
+    if rows.shape[0] > 0:
+        out[rows] = maximum.reduceat(value[S.indices], S.indptr[rows])
+    return out
+
+
+def getStrength(A, blocks, theta=AMG_THETA):
+    """
+    getStrength strong connections of the nodal graph of A
+
+    Arguments:
+        A -- csr_matrix (n, n)
+        blocks -- node of each dof, array (n,)
+        theta -- threshold, |C_ij| >= theta sqrt(C_ii C_jj), C = nodal |A|
+
+    Returns:
+        csr_matrix (nnode, nnode) without diagonal
+    """
+    nnode = int(blocks.max()) + 1
+    N = csr_matrix(
+        (ones(blocks.shape[0], dtype=FLT64), (arange(blocks.shape[0]), blocks)),
+        shape=(blocks.shape[0], nnode),
+    )
+    absA = csr_matrix((abs(A.data), A.indices, A.indptr), shape=A.shape)
+    C = (N.T.tocsr() @ (absA @ N)).tocoo()
+    diag = zeros(nnode, dtype=FLT64)
+    diag[C.row[C.row == C.col]] = C.data[C.row == C.col]
+    strong = (C.row != C.col) & (C.data >= theta * sqrt(diag[C.row] * diag[C.col]))
+    S = csr_matrix(
+        (ones(strong.sum(), dtype=FLT64), (C.row[strong], C.col[strong])),
+        shape=(nnode, nnode),
+    )
+    S.sum_duplicates()
+    return S
+
+
+def getAggregates(S, seed=0):
+    """
+    getAggregates aggregation of the nodes of a strength graph
+
+    The roots are a distance-2 maximal independent set (random weights,
+    vectorized rounds); an aggregate is a root and its neighbors. The
+    nodes left join an aggregated neighbor, isolated nodes stay alone.
+
+    Arguments:
+        S -- csr_matrix (nnode, nnode) strength graph without diagonal
+
+    Returns:
+        aggregate of each node, array (nnode,)
+    """
+    nnode = S.shape[0]
+    weight = diff(S.indptr) + default_rng(seed).random(nnode)
+    undecided = ones(nnode, dtype=bool)
+    root = zeros(nnode, dtype=bool)
+    while undecided.any():
+        value = where(undecided, weight, -inf)
+        near = maximum(value, _getMaxNeighbor(S, value))
+        far = maximum(near, _getMaxNeighbor(S, near))
+        new = undecided & (value >= far)
+        root |= new
+        # nodes up to distance 2 of a root cannot be roots
+        dist1 = _getMaxNeighbor(S, new.astype(FLT64)) > 0
+        dist2 = _getMaxNeighbor(S, (new | dist1).astype(FLT64)) > 0
+        undecided &= ~(new | dist1 | dist2)
+    aggregate = full(nnode, -1, dtype=INT64)
+    aggregate[root] = arange(root.sum())
+    # neighbors of the roots (roots are 3 edges apart, no overlap)
+    join = _getMaxNeighbor(S, where(root, aggregate, -1).astype(FLT64))
+    first = (aggregate < 0) & (join >= 0)
+    aggregate[first] = join[first].astype(INT64)
+    while True:
+        left = aggregate < 0
+        if not left.any():
+            break
+        join = _getMaxNeighbor(S, aggregate.astype(FLT64))
+        joined = left & (join >= 0)
+        if not joined.any():
+            # isolated nodes
+            aggregate[left] = aggregate.max() + 1 + arange(left.sum())
+            break
+        aggregate[joined] = join[joined].astype(INT64)
+    # dense numbering
+    __, aggregate = unique(aggregate, return_inverse=True)
+    return aggregate
+
+
+def getTentative(aggregate, blocks, B):
+    """
+    getTentative tentative prolongator, near nullspace fitted on each aggregate (QR)
+
+    Arguments:
+        aggregate -- aggregate of each node, array (nnode,)
+        blocks -- node of each dof, array (n,)
+        B -- near nullspace, array (n, nmodes)
+
+    Returns:
+        T csr_matrix (n, ncoarse), coarse near nullspace (ncoarse, nmodes),
+        coarse node (aggregate) of each coarse dof
+    """
+    n, nmodes = B.shape
+    dofagg = aggregate[blocks]
+    order = argsort(dofagg, kind="stable")
+    size = bincount(dofagg)
+    start = concatenate(([0], cumsum(size)[:-1]))
+    rank = where(size < nmodes, size, nmodes)
+    cstart = concatenate(([0], cumsum(rank)[:-1]))
+    ncoarse = int(rank.sum())
+    rows = []
+    cols = []
+    vals = []
+    Bc = zeros((ncoarse, nmodes), dtype=FLT64)
+    # aggregates of the same size in one batched QR
+    for m in unique(size):
+        aggs = where(size == m)[0]
+        r = min(m, nmodes)
+        idx = order[start[aggs][:, None] + arange(m)]
+        Q, R = qr(B[idx], mode="reduced")
+        cidx = cstart[aggs][:, None] + arange(r)
+        rows.append(repeat(idx, r, axis=1).ravel())
+        cols.append(repeat(cidx[:, None, :], m, axis=1).ravel())
+        vals.append(Q.ravel())
+        Bc[cidx.ravel()] = R.reshape(-1, nmodes)
+    T = csr_matrix(
+        (concatenate(vals), (concatenate(rows), concatenate(cols))), shape=(n, ncoarse)
+    )
+    return T, Bc, repeat(arange(size.shape[0]), rank)
+
+
+def getSpectralRadius(A, invdiag, iterations=AMG_POWERIT, seed=0):
+    """
+    getSpectralRadius estimate of rho(D^-1 A), power iterations
+
+    Returns:
+        float
+    """
+    x = default_rng(seed).random(A.shape[0])
+    rho = 1.0
+    for __ in range(iterations):
+        y = invdiag * A.dot(x)
+        rho = sqrt(y.dot(y) / x.dot(x))
+        x = y / sqrt(y.dot(y))
+    return rho
+
+
+class SmoothedAggregationAMG(LinearOperator):
+    """
+    Smoothed Aggregation AMG Class <ClassOrder>
+
+    Algebraic multigrid preconditioner M^-1 (one V-cycle). Levels are
+    built by aggregation of the nodal strength graph, the tentative
+    prolongator fits the near nullspace (rigid body modes) on each
+    aggregate and is smoothed by one damped Jacobi step. Gauss-Seidel
+    forward pre-smoothing and backward post-smoothing (symmetric cycle,
+    SPD for CG), direct solve on the coarsest level.
+    """
+
+    def __init__(
+        self, matrix, B, blocks, theta=AMG_THETA, coarse=AMG_COARSE, maxlevel=AMG_MAXLEVEL
+    ):
+        A = csr_matrix(matrix)
+        B = asarray(B, dtype=FLT64)
+        blocks = asarray(blocks).ravel()
+        self.levels = []
+        while A.shape[0] > coarse and len(self.levels) + 1 < maxlevel:
+            aggregate = getAggregates(getStrength(A, blocks, theta))
+            T, Bc, cblocks = getTentative(aggregate, blocks, B)
+            if T.shape[1] >= A.shape[0]:
+                # no coarsening
+                break
+            diag = A.diagonal()
+            invdiag = 1.0 / where(diag != 0.0, diag, 1.0)
+            omega = AMG_OMEGA / getSpectralRadius(A, invdiag)
+            P = (T - diags(omega * invdiag) @ (A @ T)).tocsr()
+            self.levels.append(
+                {
+                    "A": A,
+                    "P": P,
+                    "R": P.T.tocsr(),
+                    # Gauss-Seidel sweeps, natural order triangular solves
+                    "lower": splu(csc_matrix(tril(A)), permc_spec="NATURAL", diag_pivot_thresh=0.0),
+                    "upper": splu(csc_matrix(triu(A)), permc_spec="NATURAL", diag_pivot_thresh=0.0),
+                }
+            )
+            A = (self.levels[-1]["R"] @ (A @ P)).tocsr()
+            B, blocks = Bc, cblocks
+        self.coarse = A
+        if A.shape[0] <= coarse:
+            # small and maybe singular (rank deficient near nullspace): pseudo inverse
+            invA = pinv(A.toarray())
+            self.__solve = lambda b: invA.dot(b)
+        else:
+            lu = splu(csc_matrix(A))
+            self.__solve = lu.solve
+        super().__init__(dtype=FLT64, shape=matrix.shape)
+
+    def _matvec(self, x):
+        return self.__getCycle(0, asarray(x, dtype=FLT64).ravel())
+
+    def _adjoint(self):
+        return self
+
+    def getComplexity(self):
+        """
+        getComplexity operator complexity, sum nnz(A_l) / nnz(A_0)
+
+        Returns:
+            float
+        """
+        nnz = [level["A"].nnz for level in self.levels] + [self.coarse.nnz]
+        return sum(nnz) / nnz[0]
+
+    def getLevels(self):
+        """
+        getLevels size of each level
+
+        Returns:
+            list of int
+        """
+        return [level["A"].shape[0] for level in self.levels] + [self.coarse.shape[0]]
+
+    def __getCycle(self, ll, b):
+        if ll == len(self.levels):
+            return self.__solve(b)
+        level = self.levels[ll]
+        A = level["A"]
+        x = level["lower"].solve(b)
+        x += level["P"].dot(self.__getCycle(ll + 1, level["R"].dot(b - A.dot(x))))
+        x += level["upper"].solve(b - A.dot(x))
+        return x
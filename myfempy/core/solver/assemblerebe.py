@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from numpy import arange, empty, float64, int32
+
+INT32 = int32
+FLT64 = float64
+
+from myfempy.core.solver.assembler import Assembler
+from myfempy.core.solver.assemblerfull import AssemblerFULL
+from myfempy.core.solver.assemblerfull_numpy_v1 import getLocKeyBatch
+from myfempy.core.solver.congruentelements import getCongruentElements
+from myfempy.core.solver.elementoperator import ElementOperator
+
+
+class AssemblerEBE(Assembler):
+    """
+    Assembler Element By Element (matrix-free) Class <ConcreteClassService>
+
+    The global matrix is an ElementOperator over the element matrices of the
+    congruent groups, for the iterative solvers. With type_assembler
+    "*_recompute" no element matrix is kept.
+    """
+
+    def getLinearStiffnessGlobalMatrixAssembler(
+        Model, inci, coord, tabmat, tabgeo, intgauss, type_assembler, MP
+    ):
+        if str(type_assembler).endswith("recompute"):
+
+            def kernel(start, stop):
+                inci_block = inci[start:stop]
+                matrix = AssemblerFULL.getStifLinearMatBatch(
+                    Model, inci_block, coord, tabmat, tabgeo, intgauss, MP
+                )
+                if matrix is None:
+                    matrix = AssemblerFULL.getElementMatrixStack(
+                        Model.element.getStifLinearMat, Model, inci_block, coord, tabmat, tabgeo, intgauss
+                    )
+                return matrix
+
+            return AssemblerEBE.getElementOperator(Model, inci, coord, None, None, kernel)
+        elem_rep, elem_inv = getCongruentElements(Model, inci, coord)
+        inci_rep = inci[elem_rep]
+        matrix = AssemblerFULL.getStifLinearMatBatch(Model, inci_rep, coord, tabmat, tabgeo, intgauss, MP)
+        if matrix is None:
+            matrix = AssemblerFULL.getElementMatrixStack(
+                Model.element.getStifLinearMat, Model, inci_rep, coord, tabmat, tabgeo, intgauss
+            )
+        return AssemblerEBE.getElementOperator(Model, inci, coord, matrix, elem_inv)
+
+    def getNonLinearStiffnessGlobalMatrixAssembler():
+        pass
+
+    def getMassConsistentGlobalMatrixAssembler(
+        Model, inci, coord, tabmat, tabgeo, intgauss, type_assembler, MP
+    ):
+        elem_rep, elem_inv = getCongruentElements(Model, inci, coord)
+        matrix = AssemblerFULL.getElementMatrixStack(
+            Model.element.getMassConsistentMat, Model, inci[elem_rep], coord, tabmat, tabgeo, intgauss
+        )
+        return AssemblerEBE.getElementOperator(Model, inci, coord, matrix, elem_inv)
+
+    def getMassLumpedGlobalMatrixAssembler(
+        Model, inci, coord, tabmat, tabgeo, intgauss, type_assembler, MP
+    ):
+        return AssemblerFULL.getMassLumpedGlobalMatrixAssembler(
+            Model, inci, coord, tabmat, tabgeo, intgauss, type_assembler, MP
+        )
+
+    def getLoadAssembler(loadaply, nodetot, nodedof):
+        return AssemblerFULL.getLoadAssembler(loadaply, nodetot, nodedof)
+
+    def getConstrains(constrains, nodetot, nodedof):
+        return AssemblerFULL.getConstrains(constrains, nodetot, nodedof)
+
+    def getDirichletNH(constrains, nodetot, nodedof):
+        return AssemblerFULL.getDirichletNH(constrains, nodetot, nodedof)
+
+    def getElementOperator(Model, inci, coord, matrix, elem_inv, kernel=None):
+        """
+        getElementOperator matrix-free global operator
+
+        Arguments:
+            matrix -- element matrices of the congruent groups (ngroup, edof, edof)
+            elem_inv -- group of each element (nelem,)
+            kernel -- kernel(start, stop) element matrices of a block, if matrix is None
+
+        Returns:
+            ElementOperator (sdof, sdof)
+        """
+        elem_set = Model.element.getElementSet()
+        nodedof = elem_set.nodedof
+        shape_set = Model.shape.getShapeSet()
+        nodecon = shape_set.nodecon
+        loc = getLocKeyBatch(inci, nodecon, nodedof)
+        if matrix is None:
+            matrix = empty((0, nodecon * nodedof, nodecon * nodedof), dtype=FLT64)
+            elem_inv = arange(inci.shape[0])
+        return ElementOperator(matrix, elem_inv, loc, nodedof * coord.shape[0], kernel=kernel)
@@ -1,18 +1,38 @@
 from __future__ import annotations
 
-from numpy import array, float64, int32, zeros, empty
-from scipy.sparse import coo_matrix, csc_matrix
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import os
+
+from numpy import (array, ascontiguousarray, bincount, empty, float64, int32,
+                   ones)
 
 INT32 = int32
 FLT64 = float64
 
+# shapes of the compiled element pipeline (cython/numba)
+# tria3/tetr4 also have the closed form constant strain kernel of the elements, the autotuner picks
+OMP_SHAPES = ("tria3", "quad4", "tetr4", "hexa8")
+# elements (by id) of the compiled element pipeline: structural plane and solid
+OMP_ELEMENTS = (22, 33)
+
+from myfempy.core.backends import getKernel, setKernel
+from myfempy.core.material.material import getElasticTensorStack
 from myfempy.core.solver.assembler import Assembler
+from myfempy.core.solver.assemblerfull_numba_v1 import getStifLinearMatNumba
 from myfempy.core.solver.assemblerfull_numpy_v1 import (getConstrains,
                                                         getDirichletNH,
-                                                        getLoadAssembler)
+                                                        getLoadAssembler,
+                                                        getLocKeyBatch)
+
+try:
+    from myfempy.core.solver.assemblerfull_cython_v5 import getStifLinearMatOMP
+except ImportError:
+    # not compiled, the cython backend is left out
+    getStifLinearMatOMP = None
+from myfempy.core.solver.chunkedassembly import getChunkedMatrix
+from myfempy.core.solver.congruentelements import getCongruentElements
+from myfempy.core.solver.sparsitypattern import getSparsityPattern
+from myfempy.core.shapes.referenceelement import getReferenceElement
 
-from myfempy.core.solver.assemblerfull_cython_v5 import getVectorization
 
 class AssemblerFULL(Assembler):
     """
@@ -23,27 +43,14 @@ class AssemblerFULL(Assembler):
     def getLinearStiffnessGlobalMatrixAssembler(
         Model, inci, coord, tabmat, tabgeo, intgauss, type_assembler, MP
     ):
-        elem_set = Model.element.getElementSet()
-        nodedof = len(elem_set["dofs"]["d"])
-        shape_set = Model.shape.getShapeSet()
-        nodecon = len(shape_set["nodes"])
-        elemdof = nodecon * nodedof
-        nodetot = coord.shape[0]
-        sdof = nodedof * nodetot
-
-        # Initialize lists to store sparse matrix data
-        ith = zeros((inci.shape[0] * (elemdof * elemdof)), dtype=INT32)
-        jth = zeros((inci.shape[0] * (elemdof * elemdof)), dtype=INT32)
-        val = zeros((inci.shape[0] * (elemdof * elemdof)), dtype=FLT64)
-        
-        # ith_list, jth_list, val_list = [], [], []
-
-        for ee in range(inci.shape[0]):
-            matrix = Model.element.getStifLinearMat(Model, inci, coord, tabmat, tabgeo, intgauss, ee)
-            loc = AssemblerFULL.__getLoc(Model, inci, ee)
-            ith, jth, val = AssemblerFULL.__getVectorization(ith, jth, val, loc, matrix, ee, elemdof)
-        A_sp_scipy_csc = csc_matrix((val, (ith, jth)), shape=(sdof, sdof))
-        return A_sp_scipy_csc
+        budget = getattr(Model, "membudget", None)
+        if budget:
+            return getChunkedMatrix(
+                AssemblerFULL.getStifLinearMatStack, Model, inci, coord, tabmat, tabgeo, intgauss, MP, budget
+            )
+        pattern = getSparsityPattern(Model, inci, coord)
+        matrix = AssemblerFULL.getStifLinearMatStack(Model, inci, coord, tabmat, tabgeo, intgauss, MP)
+        return pattern.getMatrix(matrix)
 
     def getNonLinearStiffnessGlobalMatrixAssembler():
         pass
@@ -51,33 +58,66 @@ class AssemblerFULL(Assembler):
     def getMassConsistentGlobalMatrixAssembler(
         Model, inci, coord, tabmat, tabgeo, intgauss, type_assembler, MP
     ):
-        elem_set = Model.element.getElementSet()
-        nodedof = len(elem_set["dofs"]["d"])
-        shape_set = Model.shape.getShapeSet()
-        nodecon = len(shape_set["nodes"])
-        elemdof = nodecon * nodedof
-        nodetot = coord.shape[0]
-        sdof = nodedof * nodetot
+        budget = getattr(Model, "membudget", None)
+        if budget:
+            return getChunkedMatrix(
+                AssemblerFULL.getMassConsistentMatStack, Model, inci, coord, tabmat, tabgeo, intgauss, MP, budget
+            )
+        pattern = getSparsityPattern(Model, inci, coord)
+        matrix = AssemblerFULL.getMassConsistentMatStack(Model, inci, coord, tabmat, tabgeo, intgauss)
+        return pattern.getMatrix(matrix)
 
-        # Initialize lists to store sparse matrix data
-        ith = empty((inci.shape[0] * (elemdof * elemdof)), dtype=INT32)
-        jth = empty((inci.shape[0] * (elemdof * elemdof)), dtype=INT32)
-        val = empty((inci.shape[0] * (elemdof * elemdof)), dtype=FLT64)
+    def getStifMassGlobalMatrixAssembler(
+        Model, inci, coord, tabmat, tabgeo, intgauss, type_assembler, MP
+    ):
+        """
+        getStifMassGlobalMatrixAssembler stiffness and consistent mass in one assembly pass
 
-        for ee in range(inci.shape[0]):
-            matrix = Model.element.getMassConsistentMat(
-                Model, inci, coord, tabmat, tabgeo, intgauss, ee
-            )
-            loc = AssemblerFULL.__getLoc(Model, inci, ee)
-            ith, jth, val = AssemblerFULL.__getVectorization(
-                ith, jth, val, loc, matrix, ee, elemdof
+        Returns:
+            (stiffness, mass) csc_matrix on the same sparsity pattern
+        """
+        budget = getattr(Model, "membudget", None)
+        if budget:
+            return getChunkedMatrix(
+                AssemblerFULL.getStifMassMatStack, Model, inci, coord, tabmat, tabgeo, intgauss, MP, budget
             )
+        pattern = getSparsityPattern(Model, inci, coord)
+        stiffness, mass = AssemblerFULL.getStifMassMatStack(
+            Model, inci, coord, tabmat, tabgeo, intgauss, MP
+        )
+        return pattern.getMatrix(stiffness), pattern.getMatrix(mass)
 
-        A_sp_scipy_csc = csc_matrix((val, (ith, jth)), shape=(sdof, sdof))
-        return A_sp_scipy_csc
+    def getMassLumpedGlobalMatrixAssembler(
+        Model, inci, coord, tabmat, tabgeo, intgauss, type_assembler, MP
+    ):
+        """
+        getMassLumpedGlobalMatrixAssembler global lumped (diagonal) mass
 
-    def getMassLumpedGlobalMatrixAssembler():
-        pass
+        Arguments:
+            type_assembler -- "mass_lumped" (HRZ) or "mass_lumped_rowsum"
+
+        Returns:
+            diagonal of the global mass, array (sdof,)
+        """
+        elem_set = Model.element.getElementSet()
+        nodedof = elem_set.nodedof
+        shape_set = Model.shape.getShapeSet()
+        nodecon = shape_set.nodecon
+        elemdof = nodecon * nodedof
+        sdof = nodedof * coord.shape[0]
+        if str(type_assembler).endswith("rowsum"):
+            type_lumped = "rowsum"
+        else:
+            type_lumped = "hrz"
+        elem_rep, elem_inv = getCongruentElements(Model, inci, coord)
+        inci_rep = inci[elem_rep]
+        vector = empty((inci_rep.shape[0], elemdof), dtype=FLT64)
+        for ee in range(inci_rep.shape[0]):
+            vector[ee] = Model.element.getMassLumpedMat(
+                Model, inci_rep, coord, tabmat, tabgeo, intgauss, ee, type_lumped
+            )
+        loc = getLocKeyBatch(inci, nodecon, nodedof)
+        return bincount(loc.ravel(), weights=vector[elem_inv].ravel(), minlength=sdof)
 
     def getLoadAssembler(loadaply, nodetot, nodedof):
         return getLoadAssembler(loadaply, nodetot, nodedof)
@@ -90,14 +130,216 @@ class AssemblerFULL(Assembler):
     def getDirichletNH(constrains, nodetot, nodedof):
         return getDirichletNH(constrains, nodetot, nodedof)
 
-    # @profile
-    def __getVectorization(ith, jth, val, loc, matrix, element_number, elemdof):
-        return getVectorization(ith, jth, val, loc, matrix, element_number, elemdof)
+    def getStifLinearMatBatch(Model, inci, coord, tabmat, tabgeo, intgauss, MP=None):
+        """
+        getStifLinearMatBatch element stiffness stack from the fastest kernel backend
+
+        Returns:
+            array (nelem, edof, edof), None if no kernel supports the element/shape
+        """
+        __, kernel = AssemblerFULL.getStifLinearMatKernel(Model, inci, coord, tabmat, tabgeo, intgauss, MP)
+        if kernel is None:
+            return None
+        return kernel(Model, inci, coord, tabmat, tabgeo, intgauss, MP)
+
+    def getStifLinearMatKernel(Model, inci, coord, tabmat, tabgeo, intgauss, MP=None):
+        """
+        getStifLinearMatKernel element stiffness kernel of the fastest backend
+
+        The cython, numba and numpy kernels that support the element/shape are
+        timed on the mesh at first use and the winner is kept per element,
+        shape, integration order and mode, and threads. Model.backend (solverset
+        "BACKEND") forces one backend, "auto" (default) autotunes. The backend
+        that ran is kept in Model.kernelbackend.
+
+        Returns:
+            (backend, kernel), (None, None) if no kernel supports the element/shape
+        """
+        key = (
+            Model.element.getElementSet().id,
+            Model.shape.getShapeSet().key,
+            intgauss,
+            getattr(Model, "integration", "full"),
+            MP,
+        )
 
-    def __getLoc(Model, inci, element_number):
+        def run(kernel, nelem):
+            return kernel(Model, inci[:nelem], coord, tabmat, tabgeo, intgauss, MP)
+
+        backend, kernel = getKernel("stiffness", key, run, getattr(Model, "backend", "auto"))
+        # backend that ran, "element" for the element routines
+        Model.kernelbackend = backend or "element"
+        return backend, kernel
+
+    def getStifLinearMatNumPy(Model, inci, coord, tabmat, tabgeo, intgauss, MP=None):
+        """
+        getStifLinearMatNumPy element stiffness stack from the vectorized kernel of the element
+
+        Returns:
+            array (nelem, edof, edof), None if the element/shape has no batched kernel
+        """
+        if hasattr(Model.element, "getStifLinearMatBatch"):
+            return Model.element.getStifLinearMatBatch(Model, inci, coord, tabmat, tabgeo, intgauss)
+        return None
+
+    def getStifLinearMatOMP(Model, inci, coord, tabmat, tabgeo, intgauss, MP=None):
+        """
+        getStifLinearMatOMP element stiffness stack from the compiled element pipeline
+
+        Node coord, jacobian, B and B^T C B run without the GIL in a prange over
+        the elements (plane and solid, tria3/quad4/tetr4/hexa8).
+
+        Arguments:
+            MP -- number of threads, None/False 1 thread, True all cores
+
+        Returns:
+            array (nelem, edof, edof), None if the element/shape is not supported
+        """
+        if getStifLinearMatOMP is None:
+            return None
+        return AssemblerFULL.__getStifLinearMatPipeline(
+            getStifLinearMatOMP, Model, inci, coord, tabmat, tabgeo, intgauss, MP
+        )
+
+    def getStifLinearMatNumba(Model, inci, coord, tabmat, tabgeo, intgauss, MP=None):
+        """
+        getStifLinearMatNumba element stiffness stack from the numba element pipeline
+
+        Same pipeline as getStifLinearMatOMP, jit compiled at the first call.
+
+        Returns:
+            array (nelem, edof, edof), None if the element/shape is not supported
+        """
+        if getStifLinearMatNumba is None:
+            return None
+        return AssemblerFULL.__getStifLinearMatPipeline(
+            getStifLinearMatNumba, Model, inci, coord, tabmat, tabgeo, intgauss, MP
+        )
+
+    def __getStifLinearMatPipeline(pipeline, Model, inci, coord, tabmat, tabgeo, intgauss, MP):
         elem_set = Model.element.getElementSet()
-        nodedof = len(elem_set["dofs"]["d"])
-        nodelist = Model.shape.getNodeList(inci, element_number)
-        loc = Model.shape.getLocKey(nodelist, nodedof)
-        return array(loc)
-        
\ No newline at end of file
+        shape_set = Model.shape.getShapeSet()
+        type_shape = shape_set.key
+        if elem_set.id not in OMP_ELEMENTS or type_shape not in OMP_SHAPES:
+            return None
+        if getattr(Model, "integration", "full") != "full":
+            # reduced/selective integration runs in the element kernel
+            return None
+        nodedof = elem_set.nodedof
+        nodecon = shape_set.nodecon
+        elemdof = nodecon * nodedof
+        nelem = inci.shape[0]
+        if not MP:
+            num_threads = 1
+        elif MP is True:
+            num_threads = os.cpu_count() or 1
+        else:
+            num_threads = int(MP)
+
+        # structural plane and solid: space dim == nodedof
+        conec = ascontiguousarray(inci[:, 4 : 4 + nodecon] - 1, dtype=INT32)
+        xyz = ascontiguousarray(coord[:, 1 : 1 + nodedof], dtype=FLT64)
+        tensor = ascontiguousarray(getElasticTensorStack(Model.material, tabmat), dtype=FLT64)
+        if nodedof == 2:
+            factor = tabgeo["THICKN"][inci[:, 3] - 1]
+        else:
+            factor = ones(nelem, dtype=FLT64)
+        ref = getReferenceElement(Model.shape, intgauss)
+        # writable copies, the compiled pipeline takes memoryviews
+        diffN = array(ref.getDiffShapeFuntion(1), dtype=FLT64)
+        weight = ref.weight * ref.factor
+
+        K_elem_mat = empty((nelem, elemdof, elemdof), dtype=FLT64)
+        pipeline(
+            conec,
+            xyz,
+            tensor,
+            ascontiguousarray(inci[:, 2] - 1, dtype=INT32),
+            ascontiguousarray(factor, dtype=FLT64),
+            diffN,
+            weight,
+            K_elem_mat,
+            num_threads,
+        )
+        return K_elem_mat
+
+    def getStifMassMatStack(Model, inci, coord, tabmat, tabgeo, intgauss, MP=None):
+        """
+        getStifMassMatStack element stiffness and consistent mass stacks
+
+        Uses the fused element kernel (shared jacobian and detJ) when the
+        element has one, else the stiffness and mass routines one by one.
+        Computed once per group of congruent elements.
+
+        Returns:
+            (stiffness, mass) arrays (nelem, edof, edof)
+        """
+        elem_rep, elem_inv = getCongruentElements(Model, inci, coord)
+        inci_rep = inci[elem_rep]
+        if hasattr(Model.element, "getStifMassLinearMatBatch"):
+            matrix = Model.element.getStifMassLinearMatBatch(
+                Model, inci_rep, coord, tabmat, tabgeo, intgauss
+            )
+            if matrix is not None:
+                # fused vectorized kernel of the element
+                Model.kernelbackend = "numpy"
+                return matrix[0][elem_inv], matrix[1][elem_inv]
+        stiffness = AssemblerFULL.getStifLinearMatBatch(Model, inci_rep, coord, tabmat, tabgeo, intgauss, MP)
+        if stiffness is None:
+            stiffness = AssemblerFULL.getElementMatrixStack(
+                Model.element.getStifLinearMat, Model, inci_rep, coord, tabmat, tabgeo, intgauss
+            )
+        mass = AssemblerFULL.getElementMatrixStack(
+            Model.element.getMassConsistentMat, Model, inci_rep, coord, tabmat, tabgeo, intgauss
+        )
+        return stiffness[elem_inv], mass[elem_inv]
+
+    def getStifLinearMatStack(Model, inci, coord, tabmat, tabgeo, intgauss, MP=None):
+        """
+        getStifLinearMatStack element stiffness stack, computed once per group of congruent elements
+
+        Returns:
+            array (nelem, edof, edof)
+        """
+        elem_rep, elem_inv = getCongruentElements(Model, inci, coord)
+        inci_rep = inci[elem_rep]
+        matrix = AssemblerFULL.getStifLinearMatBatch(Model, inci_rep, coord, tabmat, tabgeo, intgauss, MP)
+        if matrix is None:
+            matrix = AssemblerFULL.getElementMatrixStack(
+                Model.element.getStifLinearMat, Model, inci_rep, coord, tabmat, tabgeo, intgauss
+            )
+        return matrix[elem_inv]
+
+    def getMassConsistentMatStack(Model, inci, coord, tabmat, tabgeo, intgauss, MP=None):
+        """
+        getMassConsistentMatStack element consistent mass stack, computed once per group of congruent elements
+
+        Returns:
+            array (nelem, edof, edof)
+        """
+        elem_rep, elem_inv = getCongruentElements(Model, inci, coord)
+        matrix = AssemblerFULL.getElementMatrixStack(
+            Model.element.getMassConsistentMat, Model, inci[elem_rep], coord, tabmat, tabgeo, intgauss
+        )
+        return matrix[elem_inv]
+
+    def getElementMatrixStack(getElementMat, Model, inci, coord, tabmat, tabgeo, intgauss):
+        """
+        getElementMatrixStack element matrix stack from the element by element loop
+
+        Arguments:
+            getElementMat -- element routine, e.g. Model.element.getStifLinearMat
+
+        Returns:
+            array (nelem, edof, edof)
+        """
+        elemdof = Model.edof
+        matrix = empty((inci.shape[0], elemdof, elemdof), dtype=FLT64)
+        for ee in range(inci.shape[0]):
+            matrix[ee] = getElementMat(Model, inci, coord, tabmat, tabgeo, intgauss, ee)
+        return matrix
+
+
+setKernel("stiffness", "cython", AssemblerFULL.getStifLinearMatOMP if getStifLinearMatOMP else None)
+setKernel("stiffness", "numba", AssemblerFULL.getStifLinearMatNumba if getStifLinearMatNumba else None)
+setKernel("stiffness", "numpy", AssemblerFULL.getStifLinearMatNumPy)
@@ -3,7 +3,7 @@
 # distutils: extra_compile_args=-fopenmp
 # distutils: extra_link_args=-fopenmp
 cimport openmp
-from cython cimport boundscheck, wraparound
+from cython cimport boundscheck, cdivision, wraparound
 
 from cython.parallel import parallel, prange
 
@@ -35,4 +35,148 @@ def getVectorization(INT32_t [::1] ith, INT32_t [::1] jth, FLT64_t [::1] val, IN
             ith_view[(LOOP_MAX*LOOP_MAX)*ee+LOOP_MAX*ii+jj]=KI
             jth_view[(LOOP_MAX*LOOP_MAX)*ee+LOOP_MAX*ii+jj]=KJ
             val_view[(LOOP_MAX*LOOP_MAX)*ee+LOOP_MAX*ii+jj]=VAL
-    return ith, jth, val
\ No newline at end of file
+    return ith, jth, val
+
+from libc.math cimport fabs
+from libc.stdlib cimport free, malloc
+
+
+@cdivision(True)
+@boundscheck(False) # turn off bounds-checking for entire function
+@wraparound(False)  # turn off negative index wrapping for entire function
+cdef inline void ELEMENTSTIF(Py_ssize_t ee,
+                             INT32_t [:, ::1] conec,
+                             FLT64_t [:, ::1] xyz,
+                             FLT64_t [:, :, ::1] tensor,
+                             INT32_t [::1] tensor_id,
+                             FLT64_t [::1] factor,
+                             FLT64_t [:, :, ::1] diffN,
+                             FLT64_t [::1] weight,
+                             FLT64_t [:, :, ::1] out,
+                             FLT64_t * work) noexcept nogil:
+    # element pipeline: node coord -> jacobian -> dN/dx -> B -> B^T C B, 2D (ntens 3) or 3D (ntens 6)
+    cdef Py_ssize_t nodecon = conec.shape[1]
+    cdef Py_ssize_t dim = xyz.shape[1]
+    cdef Py_ssize_t ntens = tensor.shape[1]
+    cdef Py_ssize_t edof = nodecon * dim
+    cdef Py_ssize_t npoint = weight.shape[0]
+    cdef FLT64_t * X = work
+    cdef FLT64_t * J = work + 24
+    cdef FLT64_t * invJ = work + 33
+    cdef FLT64_t * dNdx = work + 42
+    cdef FLT64_t * B = work + 66
+    cdef FLT64_t * CB = work + 210
+    cdef Py_ssize_t aa, ii, jj, kk, ll, pp, node
+    cdef FLT64_t detJ, scale, acc
+    cdef INT32_t mat = tensor_id[ee]
+
+    for aa in range(nodecon):
+        node = conec[ee, aa]
+        for ii in range(dim):
+            X[aa * dim + ii] = xyz[node, ii]
+
+    for ii in range(edof):
+        for jj in range(edof):
+            out[ee, ii, jj] = 0.0
+
+    for pp in range(npoint):
+        for ii in range(dim):
+            for jj in range(dim):
+                acc = 0.0
+                for aa in range(nodecon):
+                    acc = acc + diffN[pp, ii, aa] * X[aa * dim + jj]
+                J[ii * dim + jj] = acc
+
+        if dim == 2:
+            detJ = J[0] * J[3] - J[1] * J[2]
+            invJ[0] = J[3] / detJ
+            invJ[1] = -J[1] / detJ
+            invJ[2] = -J[2] / detJ
+            invJ[3] = J[0] / detJ
+        else:
+            detJ = (J[0] * (J[4] * J[8] - J[5] * J[7])
+                    - J[1] * (J[3] * J[8] - J[5] * J[6])
+                    + J[2] * (J[3] * J[7] - J[4] * J[6]))
+            invJ[0] = (J[4] * J[8] - J[5] * J[7]) / detJ
+            invJ[1] = (J[2] * J[7] - J[1] * J[8]) / detJ
+            invJ[2] = (J[1] * J[5] - J[2] * J[4]) / detJ
+            invJ[3] = (J[5] * J[6] - J[3] * J[8]) / detJ
+            invJ[4] = (J[0] * J[8] - J[2] * J[6]) / detJ
+            invJ[5] = (J[2] * J[3] - J[0] * J[5]) / detJ
+            invJ[6] = (J[3] * J[7] - J[4] * J[6]) / detJ
+            invJ[7] = (J[1] * J[6] - J[0] * J[7]) / detJ
+            invJ[8] = (J[0] * J[4] - J[1] * J[3]) / detJ
+
+        for ii in range(dim):
+            for aa in range(nodecon):
+                acc = 0.0
+                for jj in range(dim):
+                    acc = acc + invJ[ii * dim + jj] * diffN[pp, jj, aa]
+                dNdx[ii * nodecon + aa] = acc
+
+        for ii in range(ntens * edof):
+            B[ii] = 0.0
+        if dim == 2:
+            for aa in range(nodecon):
+                B[0 * edof + 2 * aa] = dNdx[aa]
+                B[1 * edof + 2 * aa + 1] = dNdx[nodecon + aa]
+                B[2 * edof + 2 * aa] = dNdx[nodecon + aa]
+                B[2 * edof + 2 * aa + 1] = dNdx[aa]
+        else:
+            for aa in range(nodecon):
+                B[0 * edof + 3 * aa] = dNdx[aa]
+                B[1 * edof + 3 * aa + 1] = dNdx[nodecon + aa]
+                B[2 * edof + 3 * aa + 2] = dNdx[2 * nodecon + aa]
+                B[3 * edof + 3 * aa] = dNdx[nodecon + aa]
+                B[3 * edof + 3 * aa + 1] = dNdx[aa]
+                B[4 * edof + 3 * aa + 1] = dNdx[2 * nodecon + aa]
+                B[4 * edof + 3 * aa + 2] = dNdx[nodecon + aa]
+                B[5 * edof + 3 * aa] = dNdx[2 * nodecon + aa]
+                B[5 * edof + 3 * aa + 2] = dNdx[aa]
+
+        for kk in range(ntens):
+            for jj in range(edof):
+                acc = 0.0
+                for ll in range(ntens):
+                    acc = acc + tensor[mat, kk, ll] * B[ll * edof + jj]
+                CB[kk * edof + jj] = acc
+
+        scale = factor[ee] * fabs(detJ) * weight[pp]
+        for ii in range(edof):
+            for jj in range(edof):
+                acc = 0.0
+                for kk in range(ntens):
+                    acc = acc + B[kk * edof + ii] * CB[kk * edof + jj]
+                out[ee, ii, jj] += acc * scale
+
+
+@boundscheck(False) # turn off bounds-checking for entire function
+@wraparound(False)  # turn off negative index wrapping for entire function
+def getStifLinearMatOMP(INT32_t [:, ::1] conec,
+                        FLT64_t [:, ::1] xyz,
+                        FLT64_t [:, :, ::1] tensor,
+                        INT32_t [::1] tensor_id,
+                        FLT64_t [::1] factor,
+                        FLT64_t [:, :, ::1] diffN,
+                        FLT64_t [::1] weight,
+                        FLT64_t [:, :, ::1] out,
+                        int num_threads):
+    """
+    element stiffness B^T C B of all elements in a prange over the elements (nogil)
+
+    conec (nelem, nodecon) 0-based node index, xyz (nnode, dim) node coord,
+    tensor (nmat, ntens, ntens) with tensor_id (nelem), factor (nelem) thickness,
+    diffN (npoint, dim, nodecon) reference derivatives, weight (npoint) gauss weights,
+    out (nelem, edof, edof) element matrices written at the element offset
+    """
+    cdef Py_ssize_t nelem = conec.shape[0]
+    cdef Py_ssize_t ee
+    cdef FLT64_t * work
+    if conec.shape[1] > 8 or xyz.shape[1] > 3 or tensor.shape[1] > 6:
+        raise ValueError("getStifLinearMatOMP: up to 8 nodes, 3 dim, 6 tensor comp")
+    with nogil, parallel(num_threads=num_threads):
+        work = <FLT64_t *> malloc(354 * sizeof(FLT64_t))
+        for ee in prange(nelem, schedule="static"):
+            ELEMENTSTIF(ee, conec, xyz, tensor, tensor_id, factor, diffN, weight, out, work)
+        free(work)
+    return out
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+from numpy import empty, float64, int32
+
+try:
+    from numba import config, njit, prange, set_num_threads
+except ImportError:
+    # numba is optional, the kernel is left out of the backends
+    njit = None
+    prange = range
+
+INT32 = int32
+FLT64 = float64
+
+
+def ELEMENTSTIF(ee, conec, xyz, tensor, tensor_id, factor, diffN, weight, out):
+    # element pipeline: node coord -> jacobian -> dN/dx -> B -> B^T C B, 2D (ntens 3) or 3D (ntens 6)
+    nodecon = conec.shape[1]
+    dim = xyz.shape[1]
+    ntens = tensor.shape[1]
+    edof = nodecon * dim
+    npoint = weight.shape[0]
+    mat = tensor_id[ee]
+    X = empty((nodecon, dim), dtype=FLT64)
+    J = empty((dim, dim), dtype=FLT64)
+    invJ = empty((dim, dim), dtype=FLT64)
+    dNdx = empty((dim, nodecon), dtype=FLT64)
+    B = empty((ntens, edof), dtype=FLT64)
+    CB = empty((ntens, edof), dtype=FLT64)
+
+    for aa in range(nodecon):
+        for ii in range(dim):
+            X[aa, ii] = xyz[conec[ee, aa], ii]
+
+    for ii in range(edof):
+        for jj in range(edof):
+            out[ee, ii, jj] = 0.0
+
+    for pp in range(npoint):
+        for ii in range(dim):
+            for jj in range(dim):
+                acc = 0.0
+                for aa in range(nodecon):
+                    acc += diffN[pp, ii, aa] * X[aa, jj]
+                J[ii, jj] = acc
+
+        if dim == 2:
+            detJ = J[0, 0] * J[1, 1] - J[0, 1] * J[1, 0]
+            invJ[0, 0] = J[1, 1] / detJ
+            invJ[0, 1] = -J[0, 1] / detJ
+            invJ[1, 0] = -J[1, 0] / detJ
+            invJ[1, 1] = J[0, 0] / detJ
+        else:
+            detJ = (J[0, 0] * (J[1, 1] * J[2, 2] - J[1, 2] * J[2, 1])
+                    - J[0, 1] * (J[1, 0] * J[2, 2] - J[1, 2] * J[2, 0])
+                    + J[0, 2] * (J[1, 0] * J[2, 1] - J[1, 1] * J[2, 0]))
+            invJ[0, 0] = (J[1, 1] * J[2, 2] - J[1, 2] * J[2, 1]) / detJ
+            invJ[0, 1] = (J[0, 2] * J[2, 1] - J[0, 1] * J[2, 2]) / detJ
+            invJ[0, 2] = (J[0, 1] * J[1, 2] - J[0, 2] * J[1, 1]) / detJ
+            invJ[1, 0] = (J[1, 2] * J[2, 0] - J[1, 0] * J[2, 2]) / detJ
+            invJ[1, 1] = (J[0, 0] * J[2, 2] - J[0, 2] * J[2, 0]) / detJ
+            invJ[1, 2] = (J[0, 2] * J[1, 0] - J[0, 0] * J[1, 2]) / detJ
+            invJ[2, 0] = (J[1, 0] * J[2, 1] - J[1, 1] * J[2, 0]) / detJ
+            invJ[2, 1] = (J[0, 1] * J[2, 0] - J[0, 0] * J[2, 1]) / detJ
+            invJ[2, 2] = (J[0, 0] * J[1, 1] - J[0, 1] * J[1, 0]) / detJ
+
+        for ii in range(dim):
+            for aa in range(nodecon):
+                acc = 0.0
+                for jj in range(dim):
+                    acc += invJ[ii, jj] * diffN[pp, jj, aa]
+                dNdx[ii, aa] = acc
+
+        B[:, :] = 0.0
+        if dim == 2:
+            for aa in range(nodecon):
+                B[0, 2 * aa] = dNdx[0, aa]
+                B[1, 2 * aa + 1] = dNdx[1, aa]
+                B[2, 2 * aa] = dNdx[1, aa]
+                B[2, 2 * aa + 1] = dNdx[0, aa]
+        else:
+            for aa in range(nodecon):
+                B[0, 3 * aa] = dNdx[0, aa]
+                B[1, 3 * aa + 1] = dNdx[1, aa]
+                B[2, 3 * aa + 2] = dNdx[2, aa]
+                B[3, 3 * aa] = dNdx[1, aa]
+                B[3, 3 * aa + 1] = dNdx[0, aa]
+                B[4, 3 * aa + 1] = dNdx[2, aa]
+                B[4, 3 * aa + 2] = dNdx[1, aa]
+                B[5, 3 * aa] = dNdx[2, aa]
+                B[5, 3 * aa + 2] = dNdx[0, aa]
+
+        for kk in range(ntens):
+            for jj in range(edof):
+                acc = 0.0
+                for ll in range(ntens):
+                    acc += tensor[mat, kk, ll] * B[ll, jj]
+                CB[kk, jj] = acc
+
+        scale = factor[ee] * abs(detJ) * weight[pp]
+        for ii in range(edof):
+            for jj in range(edof):
+                acc = 0.0
+                for kk in range(ntens):
+                    acc += B[kk, ii] * CB[kk, jj]
+                out[ee, ii, jj] += acc * scale
+
+
+def STIFLINEARMAT(conec, xyz, tensor, tensor_id, factor, diffN, weight, out):
+    for ee in prange(conec.shape[0]):
+        ELEMENTSTIF(ee, conec, xyz, tensor, tensor_id, factor, diffN, weight, out)
+    return out
+
+
+if njit is not None:
+    ELEMENTSTIF = njit(cache=True, nogil=True)(ELEMENTSTIF)
+    STIFLINEARMAT = njit(cache=True, nogil=True, parallel=True)(STIFLINEARMAT)
+
+    def getStifLinearMatNumba(conec, xyz, tensor, tensor_id, factor, diffN, weight, out, num_threads):
+        """
+        element stiffness B^T C B of all elements in a numba prange over the elements
+
+        Same arguments and layouts as assemblerfull_cython_v5.getStifLinearMatOMP.
+        """
+        set_num_threads(max(1, min(num_threads, config.NUMBA_NUM_THREADS)))
+        return STIFLINEARMAT(conec, xyz, tensor, tensor_id, factor, diffN, weight, out)
+
+else:
+    getStifLinearMatNumba = None
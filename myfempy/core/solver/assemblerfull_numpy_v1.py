@@ -16,6 +16,32 @@ def getVectorization(ith, jth, val, loc, matrix, ee, elemdof):
     return ith, jth, val
 
 
+def getLocKeyBatch(inci, nodecon, nodedof):
+    nodelist = inci[:, 4 : 4 + nodecon].astype(np.int32)
+    dofs = np.arange(nodedof, dtype=np.int32)
+    loc = nodedof * nodelist[:, :, np.newaxis] - (nodedof - dofs)
+    return loc.reshape(inci.shape[0], nodecon * nodedof)
+
+
+def getVectorizationBatch(loc, matrix):
+    elemdof = loc.shape[1]
+    ith = np.repeat(loc, elemdof, axis=1).ravel()
+    jth = np.tile(loc, (1, elemdof)).ravel()
+    val = matrix.ravel()
+    return ith, jth, val
+
+
+def getVectorizationSymmBatch(loc, matrix):
+    elemdof = loc.shape[1]
+    iu, ju = np.triu_indices(elemdof, 1)
+    ith_diag = loc.ravel()
+    val_diag = np.diagonal(matrix, axis1=1, axis2=2).ravel()
+    ith_band = loc[:, iu].ravel()
+    jth_band = loc[:, ju].ravel()
+    val_band = matrix[:, iu, ju].ravel()
+    return ith_diag, val_diag, ith_band, jth_band, val_band
+
+
 def getLoadAssembler(loadaply, nodetot, nodedof):
     """
     getLoadAssembler Assembler module <ConcreteClassService>
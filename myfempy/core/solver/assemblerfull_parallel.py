@@ -1,157 +1,66 @@
 from __future__ import annotations
 
 import os
-from numpy import array, float64, int32, zeros, empty, append
-from scipy.sparse import coo_matrix, csc_matrix
-from concurrent.futures import ThreadPoolExecutor, as_completed
-# from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_all_start_methods, get_context
+from multiprocessing.shared_memory import SharedMemory
+
+from numpy import float64, int32, linspace, ndarray, unique
 
 INT32 = int32
 FLT64 = float64
 
+from myfempy.core.backends import THREADED
+from myfempy.core.shapes.referenceelement import getReferenceElement
 from myfempy.core.solver.assembler import Assembler
+from myfempy.core.solver.assemblerfull import AssemblerFULL
 from myfempy.core.solver.assemblerfull_numpy_v1 import (getConstrains,
                                                         getDirichletNH,
                                                         getLoadAssembler
                                                         )
-from myfempy.core.solver.assemblerfull_cython_v5 import getVectorization
+from myfempy.core.solver.congruentelements import getCongruentElements
+from myfempy.core.solver.sparsitypattern import getSparsityPattern
+
+# minimum number of elements per worker, below it the serial assembler is used
+CHUNK_MIN = 256
+# chunks per worker, for load balance between the processes
+CHUNK_PER_CORE = 4
 
 
 class AssemblerFULLPOOL(Assembler):
     """
-    Assembler Full System Class <ConcreteClassService>
+    Assembler Full System Parallel Class <ConcreteClassService>
+
+    The elements are split in chunks and computed by worker processes, each one
+    writing the element matrices in a shared memory buffer at the chunk offset.
+    The global matrix is assembled from the buffer with the cached sparsity pattern.
     """
+
     # @profile
     def getLinearStiffnessGlobalMatrixAssembler(Model, inci, coord, tabmat, tabgeo, intgauss, type_assembler, MP=None):
-        # Get element and shape properties
-        elem_set = Model.element.getElementSet()
-        nodedof = len(elem_set["dofs"]["d"])
-        shape_set = Model.shape.getShapeSet()
-        nodecon = len(shape_set["nodes"])
-        elemdof = nodecon * nodedof
-        nodetot = coord.shape[0]
-        sdof = nodedof * nodetot
-
-        # Estimate the size of the output (adjust based on your problem)
-        # Each element contributes elemdof * elemdof entries to the global matrix
-        estimated_size = inci.shape[0] * elemdof * elemdof
-
-        # Preallocate memory using NumPy arrays
-        ith_array = zeros((estimated_size), dtype=INT32)
-        jth_array = zeros((estimated_size), dtype=INT32)
-        val_array = zeros((estimated_size), dtype=FLT64)
-
-        # Track the current position in the arrays
-        current_index = 0
-
-        # Define the batch size for parallel processing
-        batch_size = 64  # Adjust based on memory constraints and performance testing
-
-        # Use ThreadPoolExecutor for parallel processing
-        num_cores = MP if MP is not None else os.cpu_count()
-        with ThreadPoolExecutor(max_workers = num_cores) as executor:
-            # Submit tasks for each element in batches to reduce memory overhead
-            for i in range(0, inci.shape[0], batch_size):
-                batch = range(i, min(i + batch_size, inci.shape[0]))
-                futures = [
-                    executor.submit(
-                        process_element, ee, Model, inci, coord, tabmat, tabgeo, intgauss, elemdof
-                    )
-                    for ee in batch
-                ]
-
-                # Collect results in batches
-                batch_results = []
-                for future in as_completed(futures):
-                    batch_results.append(future.result())
-
-                    # Process the batch when it reaches a certain size
-                    if len(batch_results) >= batch_size:
-                        ith_batch, jth_batch, val_batch = zip(*batch_results)
-                        batch_length = sum(len(x) for x in ith_batch)
-
-                        # Ensure we don't exceed the preallocated size
-                        if current_index + batch_length > estimated_size:
-                            ith_array.resize(current_index + batch_length)
-                            jth_array.resize(current_index + batch_length)
-                            val_array.resize(current_index + batch_length)
-
-                        # Append the batch to the arrays
-                        for ith, jth, val in zip(ith_batch, jth_batch, val_batch):
-                            ith_array[current_index:current_index + len(ith)] = ith
-                            jth_array[current_index:current_index + len(jth)] = jth
-                            val_array[current_index:current_index + len(val)] = val
-                            current_index += len(ith)
-
-                        batch_results.clear()  # Clear the batch for the next set of results
-
-                # Process any remaining results in the batch
-                if batch_results:
-                    ith_batch, jth_batch, val_batch = zip(*batch_results)
-                    batch_length = sum(len(x) for x in ith_batch)
-
-                    # Ensure we don't exceed the preallocated size
-                    if current_index + batch_length > estimated_size:
-                        ith_array.resize(current_index + batch_length)
-                        jth_array.resize(current_index + batch_length)
-                        val_array.resize(current_index + batch_length)
-
-                    # Append the batch to the arrays
-                    for ith, jth, val in zip(ith_batch, jth_batch, val_batch):
-                        ith_array[current_index:current_index + len(ith)] = ith
-                        jth_array[current_index:current_index + len(jth)] = jth
-                        val_array[current_index:current_index + len(val)] = val
-                        current_index += len(ith)
-
-        # Trim the arrays to the actual size
-        ith_array = ith_array[:current_index]
-        jth_array = jth_array[:current_index]
-        val_array = val_array[:current_index]
-
-        # Construct the global stiffness matrix in COO format
-        A_sp_scipy_csc = csc_matrix((val_array, (ith_array, jth_array)), shape=(sdof, sdof))
-        return A_sp_scipy_csc
-    
-    # # @profile
-    # def getLinearStiffnessGlobalMatrixAssembler(Model, inci, coord, tabmat, tabgeo, intgauss, type_assembler, MP):
-    #     elem_set = Model.element.getElementSet()
-    #     nodedof = len(elem_set["dofs"]["d"])
-    #     shape_set = Model.shape.getShapeSet()
-    #     nodecon = len(shape_set["nodes"])
-    #     elemdof = nodecon * nodedof
-    #     nodetot = coord.shape[0]
-    #     sdof = nodedof * nodetot
-
-    #     ith = []
-    #     jth = []
-    #     val = []
-
-    #     @staticmethod
-    #     def process_element(ee):
-    #         matrix = Model.element.getStifLinearMat(
-    #             Model, inci, coord, tabmat, tabgeo, intgauss, ee
-    #         )
-    #         loc = AssemblerFULL.__getLoc(Model, inci, ee)
-            
-    #         ith_local = zeros((inci.shape[0] * (elemdof * elemdof)), dtype=INT32)
-    #         jth_local = zeros((inci.shape[0] * (elemdof * elemdof)), dtype=INT32)
-    #         val_local = zeros((inci.shape[0] * (elemdof * elemdof)), dtype=FLT64)
-            
-    #         ith_local, jth_local, val_local = AssemblerFULL.__getVectorization(ith_local, jth_local, val_local, loc, matrix, ee, elemdof)
-            
-    #         return ith_local, jth_local, val_local
-
-    #     with ThreadPoolExecutor() as executor:
-    #         futures = [executor.submit(process_element, ee) for ee in range(inci.shape[0])]
-
-    #     for future in futures:
-    #         ith_local, jth_local, val_local = future.result()
-    #         ith = append(ith, ith_local)
-    #         jth = append(jth, jth_local)
-    #         val = append(val, val_local)
-
-    #     A_sp_scipy_csc = csc_matrix((val, (ith, jth)), shape=(sdof, sdof))
-    #     return A_sp_scipy_csc
+        # the pool keeps all element matrices in shared memory, a memory budget assembles by chunks
+        if getattr(Model, "membudget", None):
+            return AssemblerFULL.getLinearStiffnessGlobalMatrixAssembler(
+                Model, inci, coord, tabmat, tabgeo, intgauss, type_assembler, MP
+            )
+        pattern = getSparsityPattern(Model, inci, coord)
+        elem_rep, elem_inv = getCongruentElements(Model, inci, coord)
+        backend, kernel = AssemblerFULL.getStifLinearMatKernel(
+            Model, inci[elem_rep], coord, tabmat, tabgeo, intgauss, MP
+        )
+        if backend in THREADED or (kernel is not None and getReferenceElement(Model.shape, 1).constant):
+            # compiled element pipeline threaded without the GIL, or the closed form
+            # constant strain kernel vectorized over the elements
+            matrix = kernel(Model, inci[elem_rep], coord, tabmat, tabgeo, intgauss, MP)
+            return pattern.getMatrix(matrix[elem_inv])
+        num_cores = AssemblerFULLPOOL.getNumCores(elem_rep.shape[0], MP)
+        if num_cores < 2:
+            return AssemblerFULL.getLinearStiffnessGlobalMatrixAssembler(
+                Model, inci, coord, tabmat, tabgeo, intgauss, type_assembler, MP
+            )
+        return AssemblerFULLPOOL.__getMatrixPool(
+            "stiffness", pattern, elem_inv, Model, inci[elem_rep], coord, tabmat, tabgeo, intgauss, num_cores
+        )
 
     def getNonLinearStiffnessGlobalMatrixAssembler():
         pass
@@ -159,32 +68,44 @@ class AssemblerFULLPOOL(Assembler):
     def getMassConsistentGlobalMatrixAssembler(
         Model, inci, coord, tabmat, tabgeo, intgauss, type_assembler, MP
     ):
-        elem_set = Model.element.getElementSet()
-        nodedof = len(elem_set["dofs"]["d"])
-        shape_set = Model.shape.getShapeSet()
-        nodecon = len(shape_set["nodes"])
-        elemdof = nodecon * nodedof
-        nodetot = coord.shape[0]
-        sdof = nodedof * nodetot
-
-        ith = zeros((inci.shape[0] * (elemdof * elemdof)), dtype=INT32)
-        jth = zeros((inci.shape[0] * (elemdof * elemdof)), dtype=INT32)
-        val = zeros((inci.shape[0] * (elemdof * elemdof)), dtype=FLT64)
-
-        for ee in range(inci.shape[0]):
-            matrix = Model.element.getMassConsistentMat(
-                Model, inci, coord, tabmat, tabgeo, intgauss, ee
+        if getattr(Model, "membudget", None):
+            return AssemblerFULL.getMassConsistentGlobalMatrixAssembler(
+                Model, inci, coord, tabmat, tabgeo, intgauss, type_assembler, MP
             )
-            loc = AssemblerFULLPOOL.__getLoc(Model, inci, ee)
-            ith, jth, val = AssemblerFULLPOOL.__getVectorization(
-                ith, jth, val, loc, matrix, ee, elemdof
+        pattern = getSparsityPattern(Model, inci, coord)
+        elem_rep, elem_inv = getCongruentElements(Model, inci, coord)
+        num_cores = AssemblerFULLPOOL.getNumCores(elem_rep.shape[0], MP)
+        if num_cores < 2:
+            return AssemblerFULL.getMassConsistentGlobalMatrixAssembler(
+                Model, inci, coord, tabmat, tabgeo, intgauss, type_assembler, MP
             )
+        return AssemblerFULLPOOL.__getMatrixPool(
+            "mass", pattern, elem_inv, Model, inci[elem_rep], coord, tabmat, tabgeo, intgauss, num_cores
+        )
 
-        A_sp_scipy_csc = csc_matrix((val, (ith, jth)), shape=(sdof, sdof))
-        return A_sp_scipy_csc
-
-    def getMassLumpedGlobalMatrixAssembler():
-        pass
+    def getStifMassGlobalMatrixAssembler(
+        Model, inci, coord, tabmat, tabgeo, intgauss, type_assembler, MP
+    ):
+        # the fused element kernel is already vectorized over all elements
+        if hasattr(Model.element, "getStifMassLinearMatBatch"):
+            return AssemblerFULL.getStifMassGlobalMatrixAssembler(
+                Model, inci, coord, tabmat, tabgeo, intgauss, type_assembler, MP
+            )
+        return (
+            AssemblerFULLPOOL.getLinearStiffnessGlobalMatrixAssembler(
+                Model, inci, coord, tabmat, tabgeo, intgauss, "linear_stiffness", MP
+            ),
+            AssemblerFULLPOOL.getMassConsistentGlobalMatrixAssembler(
+                Model, inci, coord, tabmat, tabgeo, intgauss, "mass_consistent", MP
+            ),
+        )
+
+    def getMassLumpedGlobalMatrixAssembler(
+        Model, inci, coord, tabmat, tabgeo, intgauss, type_assembler, MP
+    ):
+        return AssemblerFULL.getMassLumpedGlobalMatrixAssembler(
+            Model, inci, coord, tabmat, tabgeo, intgauss, type_assembler, MP
+        )
 
     def getLoadAssembler(loadaply, nodetot, nodedof):
         return getLoadAssembler(loadaply, nodetot, nodedof)
@@ -201,26 +122,90 @@ class AssemblerFULLPOOL(Assembler):
     def getRotationMatrix(node_list, coord, ndof):
         return getRotationMatrix(node_list, coord, ndof)
 
-    
-    # @staticmethod
-    def getVectorization(ith, jth, val, loc, matrix, ee, elemdof):
-        return getVectorization(ith, jth, val, loc, matrix, ee, elemdof)
-
-
-    # @staticmethod
-    def getLoc(Model, inci, element_number):
-        elem_set = Model.element.getElementSet()
-        nodedof = len(elem_set["dofs"]["d"])
-        nodelist = Model.shape.getNodeList(inci, element_number)
-        loc = Model.shape.getLocKey(nodelist, nodedof)
-        return array(loc)
-    
-@staticmethod
-def process_element(ee, Model, inci, coord, tabmat, tabgeo, intgauss, elemdof):
-    matrix = Model.element.getStifLinearMat(Model, inci, coord, tabmat, tabgeo, intgauss, ee)
-    loc = AssemblerFULLPOOL.getLoc(Model, inci, ee)
-    ith_local = zeros((inci.shape[0] * (elemdof * elemdof)), dtype=INT32)
-    jth_local = zeros((inci.shape[0] * (elemdof * elemdof)), dtype=INT32)
-    val_local = zeros((inci.shape[0] * (elemdof * elemdof)), dtype=FLT64)
-    ith_local, jth_local, val_local = AssemblerFULLPOOL.getVectorization(ith_local, jth_local, val_local, loc, matrix, ee, elemdof)
-    return ith_local, jth_local, val_local
\ No newline at end of file
+    def getNumCores(nelem, MP=None):
+        """
+        getNumCores number of worker processes
+
+        Arguments:
+            nelem -- number of elements
+            MP -- number of cores from solverset, None/True to use all cores
+
+        Returns:
+            number of worker processes, limited by CHUNK_MIN elements per worker
+        """
+        if MP is None or MP is True:
+            num_cores = os.cpu_count() or 1
+        else:
+            num_cores = int(MP)
+        return max(1, min(num_cores, nelem // CHUNK_MIN))
+
+    def getChunks(nelem, num_cores):
+        """
+        getChunks element chunks [start, stop) for the workers
+
+        Returns:
+            list of (start, stop)
+        """
+        nchunk = min(nelem, num_cores * CHUNK_PER_CORE)
+        bounds = unique(linspace(0, nelem, nchunk + 1).astype(INT32))
+        return list(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
+
+    def __getMatrixPool(type_matrix, pattern, elem_inv, Model, inci, coord, tabmat, tabgeo, intgauss, num_cores):
+        # inci of the congruent group representatives, elem_inv maps them to the mesh elements
+        nelem = inci.shape[0]
+        shape = (nelem, pattern.elemdof, pattern.elemdof)
+        shm = SharedMemory(create=True, size=nelem * pattern.elemdof * pattern.elemdof * FLT64().itemsize)
+        matrix = ndarray(shape, dtype=FLT64, buffer=shm.buf)
+        try:
+            # fork shares the model with the workers without pickling it
+            if "fork" in get_all_start_methods():
+                context = get_context("fork")
+            else:
+                context = get_context()
+            with ProcessPoolExecutor(
+                max_workers=num_cores,
+                mp_context=context,
+                initializer=_setWorker,
+                initargs=(shm.name, shape, Model, inci, coord, tabmat, tabgeo, intgauss),
+            ) as executor:
+                futures = [
+                    executor.submit(_getElementMatrixChunk, type_matrix, start, stop)
+                    for start, stop in AssemblerFULLPOOL.getChunks(nelem, num_cores)
+                ]
+                for future in futures:
+                    future.result()
+            A_sp_scipy_csc = pattern.getMatrix(matrix[elem_inv])
+        finally:
+            del matrix
+            shm.close()
+            shm.unlink()
+        return A_sp_scipy_csc
+
+
+_worker = dict()
+
+
+def _setWorker(shm_name, shape, Model, inci, coord, tabmat, tabgeo, intgauss):
+    shm = SharedMemory(name=shm_name)
+    _worker["shm"] = shm
+    _worker["matrix"] = ndarray(shape, dtype=FLT64, buffer=shm.buf)
+    _worker["args"] = (Model, inci, coord, tabmat, tabgeo, intgauss)
+
+
+def _getElementMatrixChunk(type_matrix, start, stop):
+    Model, inci, coord, tabmat, tabgeo, intgauss = _worker["args"]
+    matrix = _worker["matrix"]
+    if type_matrix == "stiffness":
+        # the threaded backends run in the parent, the workers take the vectorized kernel
+        block = AssemblerFULL.getStifLinearMatNumPy(
+            Model, inci[start:stop], coord, tabmat, tabgeo, intgauss
+        )
+        if block is not None:
+            matrix[start:stop] = block
+            return stop - start
+        getElementMat = Model.element.getStifLinearMat
+    else:
+        getElementMat = Model.element.getMassConsistentMat
+    for ee in range(start, stop):
+        matrix[ee] = getElementMat(Model, inci, coord, tabmat, tabgeo, intgauss, ee)
+    return stop - start
@@ -1,74 +1,38 @@
 from __future__ import annotations
 
-from numpy import array, float64, int32, zeros, empty
-from scipy.sparse import coo_matrix
+from numpy import float64, int32
 
 INT32 = int32
 FLT64 = float64
 
 from myfempy.core.solver.assembler import Assembler
 from myfempy.core.solver.assemblerfull import AssemblerFULL
-from myfempy.core.solver.assemblersymm_cython_v5 import getVectorization
+from myfempy.core.solver.chunkedassembly import getChunkedMatrix
+from myfempy.core.solver.sparsitypattern import getSparsityPattern
+from myfempy.core.solver.symmetricmatrix import SymmetricMatrix
 
 
 class AssemblerSYMM(Assembler):
     """
     Assembler Symmetric Banded System Class <ConcreteClassService>
+
+    Upper triangle assembled in one pass, returned as SymmetricMatrix storage
     """
 
     # @profile
     def getLinearStiffnessGlobalMatrixAssembler(
         Model, inci, coord, tabmat, tabgeo, intgauss, type_assembler, MP
     ):
-        elem_set = Model.element.getElementSet()
-        nodedof = len(elem_set["dofs"]["d"])
-        shape_set = Model.shape.getShapeSet()
-        nodecon = len(shape_set["nodes"])
-        elemdof = nodecon * nodedof
-        nodetot = coord.shape[0]
-        sdof = nodedof * nodetot
-
-        dim_band = int(0.5 * (elemdof * elemdof - elemdof) * inci.shape[0])
-        dim_diag = int(elemdof * inci.shape[0])
-
-        ith_band = zeros((dim_band,), dtype=INT32)
-        jth_band = zeros((dim_band,), dtype=INT32)
-        val_band = zeros((dim_band,), dtype=FLT64)
-        ith_diag = zeros((dim_diag,), dtype=INT32)
-        val_diag = zeros((dim_diag,), dtype=FLT64)
-
-        nb = int(0)
-        nd = int(0)
-        for ee in range(inci.shape[0]):
-            matrix = Model.element.getStifLinearMat(
-                Model, inci, coord, tabmat, tabgeo, intgauss, ee
-            )
-            loc = AssemblerSYMM.__getLoc(Model, inci, ee)
-            ith_diag, val_diag, ith_band, jth_band, val_band, nb, nd = (
-                AssemblerSYMM.__getVectorization(
-                    ith_band,
-                    jth_band,
-                    val_band,
-                    ith_diag,
-                    val_diag,
-                    nb,
-                    nd,
-                    loc,
-                    matrix,
-                    ee,
-                    elemdof,
+        budget = getattr(Model, "membudget", None)
+        if budget:
+            return SymmetricMatrix(
+                getChunkedMatrix(
+                    AssemblerFULL.getStifLinearMatStack, Model, inci, coord, tabmat, tabgeo, intgauss, MP, budget, True
                 )
             )
-
-        mtKG_sp_sym = coo_matrix(
-            (val_band, (ith_band, jth_band)), shape=(sdof, sdof)
-        ).tocsr()
-        mtKG_sp_sym += mtKG_sp_sym.transpose()
-        mtKG_sp_sym += coo_matrix(
-            (val_diag, (ith_diag, ith_diag)), shape=(sdof, sdof)
-        ).tocsr()
-
-        return mtKG_sp_sym
+        pattern = getSparsityPattern(Model, inci, coord, symm=True)
+        matrix = AssemblerFULL.getStifLinearMatStack(Model, inci, coord, tabmat, tabgeo, intgauss, MP)
+        return SymmetricMatrix(pattern.getMatrix(matrix))
 
     def getNonLinearStiffnessGlobalMatrixAssembler():
         pass
@@ -76,58 +40,41 @@ class AssemblerSYMM(Assembler):
     def getMassConsistentGlobalMatrixAssembler(
         Model, inci, coord, tabmat, tabgeo, intgauss, type_assembler, MP
     ):
-        elem_set = Model.element.getElementSet()
-        nodedof = len(elem_set["dofs"]["d"])
-        shape_set = Model.shape.getShapeSet()
-        nodecon = len(shape_set["nodes"])
-        elemdof = nodecon * nodedof
-        nodetot = coord.shape[0]
-        sdof = nodedof * nodetot
-
-        dim_band = int(0.5 * (elemdof * elemdof - elemdof) * inci.shape[0])
-        dim_diag = int(elemdof * inci.shape[0])
-
-        ith_band = empty((dim_band,), dtype=INT32)
-        jth_band = empty((dim_band,), dtype=INT32)
-        val_band = empty((dim_band,), dtype=FLT64)
-        ith_diag = empty((dim_diag,), dtype=INT32)
-        val_diag = empty((dim_diag,), dtype=FLT64)
-
-        nb = int(0)
-        nd = int(0)
-        for ee in range(inci.shape[0]):
-            matrix = Model.element.getMassConsistentMat(
-                Model, inci, coord, tabmat, tabgeo, intgauss, ee
-            )
-            loc = AssemblerSYMM.__getLoc(Model, inci, ee)
-            ith_diag, val_diag, ith_band, jth_band, val_band, nb, nd = (
-                AssemblerSYMM.__getVectorization(
-                    ith_band,
-                    jth_band,
-                    val_band,
-                    ith_diag,
-                    val_diag,
-                    nb,
-                    nd,
-                    loc,
-                    matrix,
-                    ee,
-                    elemdof,
+        budget = getattr(Model, "membudget", None)
+        if budget:
+            return SymmetricMatrix(
+                getChunkedMatrix(
+                    AssemblerFULL.getMassConsistentMatStack, Model, inci, coord, tabmat, tabgeo, intgauss, MP, budget, True
                 )
             )
+        pattern = getSparsityPattern(Model, inci, coord, symm=True)
+        matrix = AssemblerFULL.getMassConsistentMatStack(Model, inci, coord, tabmat, tabgeo, intgauss)
+        return SymmetricMatrix(pattern.getMatrix(matrix))
 
-        mtKG_sp_sym = coo_matrix(
-            (val_band, (ith_band, jth_band)), shape=(sdof, sdof)
-        ).tocsr()
-        mtKG_sp_sym += mtKG_sp_sym.transpose()
-        mtKG_sp_sym += coo_matrix(
-            (val_diag, (ith_diag, ith_diag)), shape=(sdof, sdof)
-        ).tocsr()
-
-        return mtKG_sp_sym
+    def getStifMassGlobalMatrixAssembler(
+        Model, inci, coord, tabmat, tabgeo, intgauss, type_assembler, MP
+    ):
+        budget = getattr(Model, "membudget", None)
+        if budget:
+            stiffness, mass = getChunkedMatrix(
+                AssemblerFULL.getStifMassMatStack, Model, inci, coord, tabmat, tabgeo, intgauss, MP, budget, True
+            )
+            return SymmetricMatrix(stiffness), SymmetricMatrix(mass)
+        pattern = getSparsityPattern(Model, inci, coord, symm=True)
+        stiffness, mass = AssemblerFULL.getStifMassMatStack(
+            Model, inci, coord, tabmat, tabgeo, intgauss, MP
+        )
+        return (
+            SymmetricMatrix(pattern.getMatrix(stiffness)),
+            SymmetricMatrix(pattern.getMatrix(mass)),
+        )
 
-    def getMassLumpedGlobalMatrixAssembler():
-        pass
+    def getMassLumpedGlobalMatrixAssembler(
+        Model, inci, coord, tabmat, tabgeo, intgauss, type_assembler, MP
+    ):
+        return AssemblerFULL.getMassLumpedGlobalMatrixAssembler(
+            Model, inci, coord, tabmat, tabgeo, intgauss, type_assembler, MP
+        )
 
     def getLoadAssembler(loadaply, nodetot, nodedof):
         return AssemblerFULL.getLoadAssembler(loadaply, nodetot, nodedof)
@@ -137,38 +84,3 @@ class AssemblerSYMM(Assembler):
 
     def getDirichletNH(constrains, nodetot, nodedof):
         return AssemblerFULL.getDirichletNH(constrains, nodetot, nodedof)
-
-    # @profile
-    def __getVectorization(
-        ith_band,
-        jth_band,
-        val_band,
-        ith_diag,
-        val_diag,
-        nb,
-        nd,
-        loc,
-        matrix,
-        ee,
-        elemdof,
-    ):
-        return getVectorization(
-            ith_band,
-            jth_band,
-            val_band,
-            ith_diag,
-            val_diag,
-            nb,
-            nd,
-            loc,
-            matrix,
-            ee,
-            elemdof,
-        )
-
-    def __getLoc(Model, inci, element_number):
-        elem_set = Model.element.getElementSet()
-        nodedof = int(len(elem_set["dofs"]["d"]))
-        nodelist = Model.shape.getNodeList(inci, element_number)
-        loc = Model.shape.getLocKey(nodelist, nodedof)
-        return array(loc)
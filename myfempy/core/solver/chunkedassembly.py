@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+from numpy import float64, int32, int64, maximum, minimum, triu_indices
+from scipy.sparse import coo_matrix, csc_matrix
+
+INT32 = int32
+INT64 = int64
+FLT64 = float64
+
+from myfempy.core.solver.assemblerfull_numpy_v1 import getLocKeyBatch
+
+# bytes per element matrix entry in a chunk: value, stack, row, col and the csc compression
+CHUNK_ENTRY_BYTES = 40
+
+
+def getChunkSize(budget, elemdof):
+    """
+    getChunkSize number of elements per chunk in a memory budget
+
+    Arguments:
+        budget -- memory budget of the chunk work arrays [MB]
+        elemdof -- dofs per element
+
+    Returns:
+        elements per chunk (>= 1)
+    """
+    return max(1, int(budget * 1024**2) // (CHUNK_ENTRY_BYTES * elemdof * elemdof))
+
+
+def getChunkedMatrix(
+    getMatrixStack, Model, inci, coord, tabmat, tabgeo, intgauss, MP, budget, symm=False
+):
+    """
+    getChunkedMatrix bounded memory assembly of the global sparse matrix
+
+    The elements are taken in chunks sized by the memory budget. The triplets
+    of each chunk are compressed to csc (duplicates summed) and added to the
+    global matrix, so the full triplet list (nelem*edof^2) is never allocated.
+
+    Arguments:
+        getMatrixStack -- element stack routine, e.g. AssemblerFULL.getStifLinearMatStack,
+                          returns (nelem, edof, edof) or a tuple of stacks
+        budget -- memory budget of the chunk work arrays [MB]
+        symm -- True to keep the upper triangle only
+
+    Returns:
+        csc_matrix, or a tuple of csc_matrix for a tuple of stacks
+    """
+    elem_set = Model.element.getElementSet()
+    nodedof = elem_set.nodedof
+    shape_set = Model.shape.getShapeSet()
+    nodecon = shape_set.nodecon
+    elemdof = nodecon * nodedof
+    sdof = nodedof * coord.shape[0]
+    nelem = inci.shape[0]
+    chunk = getChunkSize(budget, elemdof)
+    if symm:
+        iu, ju = triu_indices(elemdof)
+    matrix = None
+    for start in range(0, nelem, chunk):
+        stop = min(start + chunk, nelem)
+        stacks = getMatrixStack(Model, inci[start:stop], coord, tabmat, tabgeo, intgauss, MP)
+        if not isinstance(stacks, tuple):
+            stacks = (stacks,)
+        loc = getLocKeyBatch(inci[start:stop], nodecon, nodedof)
+        if symm:
+            ith = minimum(loc[:, iu], loc[:, ju]).ravel()
+            jth = maximum(loc[:, iu], loc[:, ju]).ravel()
+        else:
+            ith = loc.repeat(elemdof, axis=1).ravel()
+            jth = loc[:, :, None].repeat(elemdof, axis=2).transpose(0, 2, 1).reshape(-1)
+        parts = []
+        for stack in stacks:
+            if symm:
+                val = stack[:, iu, ju].ravel()
+            else:
+                val = stack.ravel()
+            parts.append(coo_matrix((val, (ith, jth)), shape=(sdof, sdof)).tocsc())
+        del stacks, ith, jth
+        if matrix is None:
+            matrix = parts
+        else:
+            matrix = [A + B for A, B in zip(matrix, parts)]
+    if matrix is None:
+        matrix = [csc_matrix((sdof, sdof), dtype=FLT64)]
+    for A in matrix:
+        A.sort_indices()
+    if len(matrix) == 1:
+        return matrix[0]
+    return tuple(matrix)
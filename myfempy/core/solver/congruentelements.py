@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from numpy import (abs, arange, concatenate, float64, int32, int64, rint,
+                   unique)
+
+INT32 = int32
+INT64 = int64
+FLT64 = float64
+
+# coordinate quantum of the signature, relative to the mesh size
+CONGRUENT_TOL = 1e-10
+
+
+def getCongruentElements(Model, inci, coord):
+    """
+    getCongruentElements groups of geometrically identical elements
+
+    Two elements are congruent when they have the same type, material and
+    geometry ids and the same node coordinates up to a translation (node
+    coordinates relative to the first node, quantized to CONGRUENT_TOL of
+    the mesh size). Every element of a group has the same element matrix.
+
+    Returns:
+        elem_rep -- representative element of each group, array (ngroup,)
+        elem_inv -- group of each element, array (nelem,)
+    """
+    shape_set = Model.shape.getShapeSet()
+    nodecon = shape_set.nodecon
+    nelem = inci.shape[0]
+    nodelist = inci[:, 4 : 4 + nodecon].astype(INT64) - 1
+    elementcoord = coord[nodelist][:, :, 1:4]
+    xyz = coord[:, 1:4]
+    scale = abs(xyz.max(axis=0) - xyz.min(axis=0)).max()
+    if nelem == 0 or scale == 0.0:
+        return arange(nelem), arange(nelem)
+    relcoord = elementcoord - elementcoord[:, :1, :]
+    signature = concatenate(
+        (
+            inci[:, 1:4].astype(INT64),
+            rint(relcoord.reshape(nelem, -1) / (scale * CONGRUENT_TOL)).astype(INT64),
+        ),
+        axis=1,
+    )
+    __, elem_rep, elem_inv = unique(
+        signature, axis=0, return_index=True, return_inverse=True
+    )
+    return elem_rep, elem_inv.ravel()
@@ -10,6 +10,7 @@ from myfempy.core.solver.assemblerfull import AssemblerFULL
 from myfempy.core.solver.assemblerfull_parallel import AssemblerFULLPOOL
 from myfempy.core.solver.assemblersymm import AssemblerSYMM
 from myfempy.core.solver.solver import Solver
+from myfempy.core.solver.symmetricmatrix import getSubMatrix
 from myfempy.core.utilities import setSteps
 
 
@@ -19,7 +20,7 @@ class StaticLinearCyclicSymmPlane(Solver):
     """
 
     def getMatrixAssembler(
-        Model, inci, coord, tabmat, tabgeo, intgauss, SYMM=None, MP=None
+        Model, inci, coord, tabmat, tabgeo, intgauss, SYMM=None, MP=None, MASS=None, MF=None
     ):
         matrix = dict()
 
@@ -130,23 +131,23 @@ class StaticLinearCyclicSymmPlane(Solver):
             [
                 hstack(
                     [
-                        stiffness[interdof, :][:, interdof],
-                        stiffness[interdof, :][:, leftdof],
-                        stiffness[interdof, :][:, rightdof],
+                        getSubMatrix(stiffness, interdof, interdof),
+                        getSubMatrix(stiffness, interdof, leftdof),
+                        getSubMatrix(stiffness, interdof, rightdof),
                     ]
                 ),
                 hstack(
                     [
-                        stiffness[leftdof, :][:, interdof],
-                        stiffness[leftdof, :][:, leftdof],
-                        stiffness[leftdof, :][:, rightdof],
+                        getSubMatrix(stiffness, leftdof, interdof),
+                        getSubMatrix(stiffness, leftdof, leftdof),
+                        getSubMatrix(stiffness, leftdof, rightdof),
                     ]
                 ),
                 hstack(
                     [
-                        stiffness[rightdof, :][:, interdof],
-                        stiffness[rightdof, :][:, leftdof],
-                        stiffness[rightdof, :][:, rightdof],
+                        getSubMatrix(stiffness, rightdof, interdof),
+                        getSubMatrix(stiffness, rightdof, leftdof),
+                        getSubMatrix(stiffness, rightdof, rightdof),
                     ]
                 ),
             ]
@@ -8,6 +8,7 @@ from scipy.sparse.linalg import eigsh
 from myfempy.core.solver.assemblerfull import AssemblerFULL
 from myfempy.core.solver.assemblerfull_parallel import AssemblerFULLPOOL
 from myfempy.core.solver.assemblersymm import AssemblerSYMM
+from myfempy.core.solver.linearsystem import getPartitionedSystem
 from myfempy.core.solver.solver import Solver
 from myfempy.core.utilities import setSteps
 
@@ -18,11 +19,17 @@ class DynamicEigenLinear(Solver):
     """
 
     def getMatrixAssembler(
-        Model, inci, coord, tabmat, tabgeo, intgauss, SYMM=None, MP=None
+        Model, inci, coord, tabmat, tabgeo, intgauss, SYMM=None, MP=None, MASS=None, MF=None
     ):
         matrix = dict()
         if SYMM:
-            matrix["stiffness"] = AssemblerSYMM.getLinearStiffnessGlobalMatrixAssembler(
+            assembler = AssemblerSYMM
+        elif MP:
+            assembler = AssemblerFULLPOOL
+        else:
+            assembler = AssemblerFULL
+        if MASS and str(MASS).startswith("lumped"):
+            matrix["stiffness"] = assembler.getLinearStiffnessGlobalMatrixAssembler(
                 Model,
                 inci,
                 coord,
@@ -32,59 +39,29 @@ class DynamicEigenLinear(Solver):
                 type_assembler="linear_stiffness",
                 MP=MP,
             )
-            matrix["mass"] = AssemblerSYMM.getMassConsistentGlobalMatrixAssembler(
+            # diagonal mass vector, "lumped" (HRZ) or "lumped_rowsum"
+            matrix["mass"] = assembler.getMassLumpedGlobalMatrixAssembler(
                 Model,
                 inci,
                 coord,
                 tabmat,
                 tabgeo,
                 intgauss,
-                type_assembler="mass_consistent",
+                type_assembler="mass_" + str(MASS),
                 MP=MP,
             )
         else:
-            if MP:
-                matrix["stiffness"] = AssemblerFULLPOOL.getLinearStiffnessGlobalMatrixAssembler(
-                    Model,
-                    inci,
-                    coord,
-                    tabmat,
-                    tabgeo,
-                    intgauss,
-                    type_assembler="linear_stiffness",
-                    MP=MP,
-                )
-                matrix["mass"] = AssemblerFULLPOOL.getMassConsistentGlobalMatrixAssembler(
-                    Model,
-                    inci,
-                    coord,
-                    tabmat,
-                    tabgeo,
-                    intgauss,
-                    type_assembler="linear_stiffness",
-                    MP=MP,
-                )
-            else:
-                matrix["stiffness"] = AssemblerFULL.getLinearStiffnessGlobalMatrixAssembler(
-                    Model,
-                    inci,
-                    coord,
-                    tabmat,
-                    tabgeo,
-                    intgauss,
-                    type_assembler="linear_stiffness",
-                    MP=MP,
-                )
-                matrix["mass"] = AssemblerFULL.getMassConsistentGlobalMatrixAssembler(
-                    Model,
-                    inci,
-                    coord,
-                    tabmat,
-                    tabgeo,
-                    intgauss,
-                    type_assembler="linear_stiffness",
-                    MP=MP,
-                )
+            # stiffness and consistent mass in one pass, same sparsity pattern
+            matrix["stiffness"], matrix["mass"] = assembler.getStifMassGlobalMatrixAssembler(
+                Model,
+                inci,
+                coord,
+                tabmat,
+                tabgeo,
+                intgauss,
+                type_assembler="linear_stiffness_mass_consistent",
+                MP=MP,
+            )
         return matrix
 
     def getLoadAssembler(loadaply, nodetot, nodedof):
@@ -108,15 +85,14 @@ class DynamicEigenLinear(Solver):
         fulldofs = modelinfo["fulldofs"]
         solution = dict()
         modeEnd = setSteps(solverset["STEPSET"])
-        stiffness = assembly["stiffness"]
-        mass = assembly["mass"]
-        forcelist = assembly["loads"]
         U = zeros((fulldofs, modeEnd), dtype=float64)
-        freedof = constrainsdof["freedof"]
+        stiffness = getPartitionedSystem(assembly, constrainsdof, "stiffness")
+        mass = getPartitionedSystem(assembly, constrainsdof, "mass")
+        freedof = stiffness.freedof
         try:
             W, U[freedof, :] = eigsh(
-                A=stiffness[:, freedof][freedof, :],
-                M=mass[:, freedof][freedof, :],
+                A=stiffness.Kff.tocsc(),
+                M=mass.Kff.tocsc(),
                 k=modeEnd,
                 sigma=1,
                 which="LM",
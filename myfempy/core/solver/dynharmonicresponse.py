@@ -8,6 +8,8 @@ from myfempy.core.solver.assemblerfull import AssemblerFULL
 from myfempy.core.solver.assemblerfull_parallel import AssemblerFULLPOOL
 from myfempy.core.solver.assemblersymm import AssemblerSYMM
 # from myfempy.core.alglin import linsolve_spsolve
+from myfempy.core.solver.linearsystem import getPartitionedSystem
+from myfempy.core.solver.preconditioner import getSolverPreconditioner
 from myfempy.core.solver.solver import Solver
 from myfempy.core.utilities import setSteps
 
@@ -18,11 +20,17 @@ class DynamicHarmonicResponseLinear(Solver):
     """
 
     def getMatrixAssembler(
-        Model, inci, coord, tabmat, tabgeo, intgauss, SYMM=None, MP=None
+        Model, inci, coord, tabmat, tabgeo, intgauss, SYMM=None, MP=None, MASS=None, MF=None
     ):
         matrix = dict()
         if SYMM:
-            matrix["stiffness"] = AssemblerSYMM.getLinearStiffnessGlobalMatrixAssembler(
+            assembler = AssemblerSYMM
+        elif MP:
+            assembler = AssemblerFULLPOOL
+        else:
+            assembler = AssemblerFULL
+        if MASS and str(MASS).startswith("lumped"):
+            matrix["stiffness"] = assembler.getLinearStiffnessGlobalMatrixAssembler(
                 Model,
                 inci,
                 coord,
@@ -32,59 +40,29 @@ class DynamicHarmonicResponseLinear(Solver):
                 type_assembler="linear_stiffness",
                 MP=MP,
             )
-            matrix["mass"] = AssemblerSYMM.getLinearStiffnessGlobalMatrixAssembler(
+            # diagonal mass vector, "lumped" (HRZ) or "lumped_rowsum"
+            matrix["mass"] = assembler.getMassLumpedGlobalMatrixAssembler(
                 Model,
                 inci,
                 coord,
                 tabmat,
                 tabgeo,
                 intgauss,
-                type_assembler="mass_consistent",
+                type_assembler="mass_" + str(MASS),
                 MP=MP,
             )
         else:
-            if MP:
-                matrix["stiffness"] = AssemblerFULLPOOL.getLinearStiffnessGlobalMatrixAssembler(
-                    Model,
-                    inci,
-                    coord,
-                    tabmat,
-                    tabgeo,
-                    intgauss,
-                    type_assembler="linear_stiffness",
-                    MP=MP,
-                )
-                matrix["mass"] = AssemblerFULLPOOL.getMassConsistentGlobalMatrixAssembler(
-                    Model,
-                    inci,
-                    coord,
-                    tabmat,
-                    tabgeo,
-                    intgauss,
-                    type_assembler="linear_stiffness",
-                    MP=MP,
-                )
-            else:
-                matrix["stiffness"] = AssemblerFULL.getLinearStiffnessGlobalMatrixAssembler(
-                    Model,
-                    inci,
-                    coord,
-                    tabmat,
-                    tabgeo,
-                    intgauss,
-                    type_assembler="linear_stiffness",
-                    MP=MP,
-                )
-                matrix["mass"] = AssemblerFULL.getMassConsistentGlobalMatrixAssembler(
-                    Model,
-                    inci,
-                    coord,
-                    tabmat,
-                    tabgeo,
-                    intgauss,
-                    type_assembler="linear_stiffness",
-                    MP=MP,
-                )
+            # stiffness and consistent mass in one pass, same sparsity pattern
+            matrix["stiffness"], matrix["mass"] = assembler.getStifMassGlobalMatrixAssembler(
+                Model,
+                inci,
+                coord,
+                tabmat,
+                tabgeo,
+                intgauss,
+                type_assembler="linear_stiffness_mass_consistent",
+                MP=MP,
+            )
         return matrix
 
     def getLoadAssembler(loadaply, nodetot, nodedof):
@@ -103,11 +81,11 @@ class DynamicHarmonicResponseLinear(Solver):
         fulldofs = modelinfo["fulldofs"]
 
         solution = dict()
-        stiffness = assembly["stiffness"]
-        mass = assembly["mass"]
         forcelist = assembly["loads"]
 
-        freedof = constrainsdof["freedof"]
+        stiffness = getPartitionedSystem(assembly, constrainsdof, "stiffness")
+        mass = getPartitionedSystem(assembly, constrainsdof, "mass")
+        freedof = stiffness.freedof
 
         twopi = 2 * pi
         freqStart = (twopi) * solverset["STEPSET"]["start"]
@@ -118,17 +96,33 @@ class DynamicHarmonicResponseLinear(Solver):
         U = zeros((fulldofs, freqStep), dtype=float64)
         U0 = U[freedof, 0]
 
-        sA = stiffness[:, freedof][freedof, :]
-        sM = mass[:, freedof][freedof, :]
+        sA = stiffness.Kff
+        sM = mass.Kff
+        # K - w^2 M is indefinite, minres with a SPD preconditioner of K (e.g. "amg"), built once
+        precond, M = getSolverPreconditioner(sA, freedof, modelinfo, solverset, default="none")
+        iterations = []
         for ww in range(freqStep):
             Wn = w_range[ww]
             Dw = sA - (Wn**2) * sM
+            count = []
             try:
                 U[freedof, ww], info = minres(
-                    A=Dw, b=forcelist[freedof, 0], x0=U0, tol=1e-10, maxiter=1000
+                    A=Dw,
+                    b=forcelist[freedof, 0],
+                    x0=U0,
+                    tol=1e-10,
+                    maxiter=1000,
+                    M=M,
+                    callback=lambda xk: count.append(1),
                 )
             except:
                 raise info
+            iterations.append(len(count))
+        solverstatus = solverset.setdefault("solverstatus", dict())
+        solverstatus["krylov"] = "MINRES"
+        solverstatus["precond"] = precond.upper()
+        # per frequency
+        solverstatus["iterations"] = iterations
         solution["U"] = U
         solution["FREQ"] = w_range / (twopi)
         return solution
@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+from numpy import (arange, argsort, asarray, bincount, concatenate, diff,
+                   empty, flatnonzero, float64, full, int32, matmul, newaxis,
+                   zeros)
+from scipy.sparse import coo_matrix, csc_matrix, lil_matrix
+from scipy.sparse.linalg import LinearOperator
+
+INT32 = int32
+FLT64 = float64
+
+# elements per block of the element by element product
+CHUNK_ELEM = 4096
+# up to this number of congruent groups the product runs group by group
+GROUP_LOOP = 64
+
+
+class ElementOperator(LinearOperator):
+    """
+    Element By Element Operator Class <ClassOrder>
+
+    Matrix-free global matrix K x = sum_e Le^T Ke Le x. Keeps the element
+    matrices of the congruent groups and the element dofs map, the global
+    sparse matrix is never built. With a kernel(start, stop) the element
+    matrices are not kept, they are recomputed by blocks at each product.
+    rows/cols restrict the operator to a dofs list (e.g. freedof).
+    """
+
+    def __init__(
+        self, matrix, elem_inv, loc, sdof, rows=None, cols=None, update=None, kernel=None
+    ):
+        self.matrix = matrix
+        self.elem_inv = asarray(elem_inv).ravel()
+        self.kernel = kernel
+        self.loc = loc
+        self.sdof = sdof
+        self.rows = rows
+        self.cols = cols
+        # point additions (springs, masses) out of the elements, lil_matrix (sdof, sdof)
+        self.update = update
+        nrow = sdof if rows is None else rows.shape[0]
+        ncol = sdof if cols is None else cols.shape[0]
+        super().__init__(dtype=FLT64, shape=(nrow, ncol))
+        if kernel is None and matrix.shape[0] <= GROUP_LOOP:
+            order = argsort(self.elem_inv, kind="stable")
+            bounds = concatenate(([0], flatnonzero(diff(self.elem_inv[order])) + 1, [order.shape[0]]))
+            self.__groups = [
+                (self.elem_inv[order[bounds[gg]]], order[bounds[gg] : bounds[gg + 1]])
+                for gg in range(bounds.shape[0] - 1)
+            ]
+        else:
+            self.__groups = None
+
+    @property
+    def data(self):
+        return self.matrix
+
+    @property
+    def nnz(self):
+        return self.matrix.size
+
+    def _matvec(self, x):
+        x = asarray(x, dtype=FLT64).ravel()
+        if self.cols is None:
+            u = x
+        else:
+            u = zeros(self.sdof, dtype=FLT64)
+            u[self.cols] = x
+        y = self.getProduct(u)
+        if self.rows is None:
+            return y
+        return y[self.rows]
+
+    def _rmatvec(self, x):
+        return self.getSubMatrix(self.__getDofs(self.cols), self.__getDofs(self.rows))._matvec(x)
+
+    def _adjoint(self):
+        return self.getSubMatrix(self.__getDofs(self.cols), self.__getDofs(self.rows))
+
+    def _transpose(self):
+        return self._adjoint()
+
+    def getProduct(self, u):
+        """
+        getProduct full product K u, element by element
+
+        Arguments:
+            u -- full vector (sdof,)
+
+        Returns:
+            array (sdof,)
+        """
+        ue = u[self.loc]
+        fe = empty(ue.shape, dtype=FLT64)
+        if self.__groups is not None:
+            for group, elem in self.__groups:
+                fe[elem] = ue[elem].dot(self.matrix[group].transpose())
+        else:
+            for start in range(0, ue.shape[0], CHUNK_ELEM):
+                stop = min(start + CHUNK_ELEM, ue.shape[0])
+                Ke = self.__getElementMatrix(start, stop)
+                fe[start:stop] = matmul(Ke, ue[start:stop, :, newaxis])[:, :, 0]
+        y = bincount(self.loc.ravel(), weights=fe.ravel(), minlength=self.sdof)
+        if self.update is not None:
+            y += self.update.tocsr().dot(u)
+        return y
+
+    def diagonal(self):
+        """
+        diagonal main diagonal of the (square) operator
+
+        Returns:
+            array (n,)
+        """
+        edof = self.loc.shape[1]
+        Kd = empty(self.loc.shape, dtype=FLT64)
+        for start in range(0, self.loc.shape[0], CHUNK_ELEM):
+            stop = min(start + CHUNK_ELEM, self.loc.shape[0])
+            Kd[start:stop] = self.__getElementMatrix(start, stop)[:, arange(edof), arange(edof)]
+        diag = bincount(self.loc.ravel(), weights=Kd.ravel(), minlength=self.sdof)
+        if self.update is not None:
+            diag += self.update.diagonal()
+        if self.rows is None:
+            return diag
+        return diag[self.rows]
+
+    def getSubMatrix(self, rows, cols=None):
+        """
+        getSubMatrix restrict the operator to K[rows, cols]
+
+        Arguments:
+            rows -- dofs list of the rows (e.g. freedof)
+            cols -- dofs list of the cols, None for the principal submatrix K[rows, rows]
+
+        Returns:
+            ElementOperator sharing the element matrices
+        """
+        rows = asarray(rows).ravel()
+        if cols is None:
+            cols = rows
+        cols = asarray(cols).ravel()
+        if self.rows is not None:
+            rows = self.rows[rows]
+        if self.cols is not None:
+            cols = self.cols[cols]
+        return ElementOperator(
+            self.matrix, self.elem_inv, self.loc, self.sdof, rows, cols, self.update, self.kernel
+        )
+
+    def tocsc(self):
+        """
+        tocsc assembled sparse matrix (builds the global matrix)
+
+        Returns:
+            csc_matrix
+        """
+        edof = self.loc.shape[1]
+        ith = self.loc.repeat(edof, axis=1).ravel()
+        jth = self.loc[:, :, newaxis].repeat(edof, axis=2).transpose(0, 2, 1).reshape(-1)
+        matrix = coo_matrix(
+            (self.__getElementMatrix(0, self.loc.shape[0]).ravel(), (ith, jth)),
+            shape=(self.sdof, self.sdof),
+        ).tocsc()
+        if self.update is not None:
+            matrix = matrix + self.update.tocsc()
+        rows = self.__getDofs(self.rows)
+        cols = self.__getDofs(self.cols)
+        return csc_matrix(matrix[:, cols][rows, :])
+
+    def toarray(self):
+        return self.tocsc().toarray()
+
+    def __getitem__(self, key):
+        # indexing reads and writes the point additions only (e.g. springs)
+        rows, cols = self.__getIndex(key)
+        if self.update is None:
+            return zeros((rows.shape[0], cols.shape[0]), dtype=FLT64)
+        return self.update[rows, :][:, cols].toarray()
+
+    def __setitem__(self, key, value):
+        rows, cols = self.__getIndex(key)
+        value = asarray(value, dtype=FLT64)
+        if value.ndim == 0:
+            value = full((rows.shape[0], cols.shape[0]), value, dtype=FLT64)
+        if self.update is None:
+            self.update = lil_matrix((self.sdof, self.sdof), dtype=FLT64)
+        for ii in range(rows.shape[0]):
+            for jj in range(cols.shape[0]):
+                self.update[rows[ii], cols[jj]] = value[ii, jj]
+
+    def __getElementMatrix(self, start, stop):
+        if self.kernel is not None:
+            return self.kernel(start, stop)
+        return self.matrix[self.elem_inv[start:stop]]
+
+    def __getDofs(self, dofs):
+        if dofs is None:
+            return arange(self.sdof)
+        return dofs
+
+    def __getIndex(self, key):
+        if self.rows is not None or self.cols is not None:
+            raise IndexError("ElementOperator: indexing only on the full operator")
+        if not isinstance(key, tuple) or len(key) != 2:
+            raise IndexError("ElementOperator: index must be [rows, cols]")
+        index = []
+        for kk in key:
+            if isinstance(kk, slice):
+                index.append(arange(self.sdof)[kk])
+            else:
+                index.append(asarray(kk).ravel())
+        return index[0], index[1]
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from numpy import asarray, dot, float64, sqrt, zeros
+
+FLT64 = float64
+
+# relative residual ||b - A x|| / ||b|| of the iterative solvers (solverset "TOL")
+KRYLOV_TOL = 1e-10
+
+
+def getPCG(A, b, M=None, x0=None, tol=KRYLOV_TOL, maxiter=None):
+    """
+    getPCG preconditioned conjugate gradient of an SPD system A x = b
+
+    Arguments:
+        A -- SPD matrix or LinearOperator (n, n)
+        b -- right-hand side, array (n,)
+        M -- preconditioner M^-1 (LinearOperator), None for plain CG
+        x0 -- initial guess, None for zeros
+        tol -- relative residual tolerance
+        maxiter -- max iterations, None for 10 * n
+
+    Returns:
+        x, info dict with "iterations", "residuals" (relative residual
+        history, the initial one included) and "converged"
+    """
+    b = asarray(b, dtype=FLT64).ravel()
+    n = b.shape[0]
+    if maxiter is None:
+        maxiter = 10 * n
+    x = zeros(n, dtype=FLT64) if x0 is None else asarray(x0, dtype=FLT64).ravel().copy()
+    normb = sqrt(dot(b, b))
+    if normb == 0.0:
+        return zeros(n, dtype=FLT64), {"iterations": 0, "residuals": [0.0], "converged": True}
+    r = b - A.dot(x) if x0 is not None else b.copy()
+    residuals = [sqrt(dot(r, r)) / normb]
+    z = r if M is None else M.dot(r)
+    p = z.copy()
+    rz = dot(r, z)
+    iterations = 0
+    while residuals[-1] > tol and iterations < maxiter:
+        Ap = A.dot(p)
+        alpha = rz / dot(p, Ap)
+        x += alpha * p
+        r -= alpha * Ap
+        iterations += 1
+        residuals.append(sqrt(dot(r, r)) / normb)
+        z = r if M is None else M.dot(r)
+        rz_new = dot(r, z)
+        p = z + (rz_new / rz) * p
+        rz = rz_new
+    return x, {
+        "iterations": iterations,
+        "residuals": residuals,
+        "converged": bool(residuals[-1] <= tol),
+    }
@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+from numpy import array_equal, asarray, concatenate, float64, full, nan, zeros
+from scipy.sparse.linalg import splu
+
+from myfempy.core.solver.symmetricmatrix import getSubMatrix
+
+FLT64 = float64
+
+
+class PartitionedSystem:
+    """
+    Partitioned System Class <ClassOrder>
+
+    Matrix K split on the free (f) and constrained (c) dofs, built once
+    from constrainsdof: Kff for the solve, the coupling Kfc for the
+    prescribed displacements and Kcc for the reactions. The blocks stay
+    sparse (or in the storage of K: symmetric, matrix-free). perm is the
+    dofs permutation [freedof, constdof].
+    """
+
+    def __init__(self, matrix, freedof, constdof):
+        self.matrix = matrix
+        self.freedof = asarray(freedof).ravel().copy()
+        self.constdof = asarray(constdof).ravel().copy()
+        self.perm = concatenate((self.freedof, self.constdof))
+        self.nfree = self.freedof.shape[0]
+        self.Kff = getSubMatrix(matrix, self.freedof)
+        self.__Kfc = None
+        self.__Kcc = None
+
+    @property
+    def Kfc(self):
+        if self.__Kfc is None:
+            self.__Kfc = getSubMatrix(self.matrix, self.freedof, self.constdof)
+        return self.__Kfc
+
+    @property
+    def Kcc(self):
+        if self.__Kcc is None:
+            self.__Kcc = getSubMatrix(self.matrix, self.constdof)
+        return self.__Kcc
+
+    def isValid(self, matrix, freedof, constdof):
+        """
+        isValid the partition is of this matrix and dofs lists
+        """
+        return (
+            self.matrix is matrix
+            and array_equal(self.freedof, asarray(freedof).ravel())
+            and array_equal(self.constdof, asarray(constdof).ravel())
+        )
+
+    def getLoad(self, forces, Uc):
+        """
+        getLoad free dofs load with the prescribed displacements, F_f - Kfc U_c
+
+        Arguments:
+            forces -- full load, array (fulldofs,) or (fulldofs, nsteps)
+            Uc -- full prescribed displacements, same shape of forces
+
+        Returns:
+            array (nfree,) or (nfree, nsteps)
+        """
+        if self.constdof.shape[0] == 0:
+            return forces[self.freedof]
+        return forces[self.freedof] - self.Kfc.dot(Uc[self.constdof])
+
+    def getFull(self, Uf, Uc=None):
+        """
+        getFull scatter the free dofs solution (and the prescribed dofs) to all dofs
+
+        Arguments:
+            Uf -- array (nfree,) or (nfree, nsteps)
+            Uc -- full prescribed displacements, None for zeros
+
+        Returns:
+            array (fulldofs,) or (fulldofs, nsteps)
+        """
+        U = zeros((self.matrix.shape[0],) + Uf.shape[1:], dtype=FLT64)
+        U[self.freedof] = Uf
+        if Uc is not None:
+            U[self.constdof] = Uc[self.constdof]
+        return U
+
+    def getReaction(self, U):
+        """
+        getReaction constrained dofs reactions Kcf U_f + Kcc U_c (K symmetric, Kcf = Kfc^T)
+
+        Arguments:
+            U -- full solution, array (fulldofs,) or (fulldofs, nsteps)
+
+        Returns:
+            array (nconst,) or (nconst, nsteps)
+        """
+        return self.Kfc.T.dot(U[self.freedof]) + self.Kcc.dot(U[self.constdof])
+
+
+class Factorization:
+    """
+    Sparse Factorization Class <ClassOrder>
+
+    Sparse LU (SuperLU) of the Kff block of a partitioned system, computed
+    once and reused by every solve (load steps, right-hand sides). A
+    singular matrix gives nan solutions, as spsolve does.
+    """
+
+    def __init__(self, partition):
+        self.partition = partition
+        try:
+            self.lu = splu(partition.Kff.tocsc())
+        except RuntimeError:
+            # exactly singular
+            self.lu = None
+
+    def solve(self, rhs):
+        """
+        solve back substitution Kff x = rhs
+
+        Arguments:
+            rhs -- array (nfree,) or block of right-hand sides (nfree, nrhs)
+
+        Returns:
+            x, same shape of rhs
+        """
+        rhs = asarray(rhs, dtype=FLT64)
+        if self.lu is None:
+            return full(rhs.shape, nan, dtype=FLT64)
+        return self.lu.solve(rhs)
+
+
+def getSolverCache(assembly):
+    """
+    getSolverCache cache of the solver objects built from an assembly
+
+    The cache is kept in the assembly dict, so it lives as long as the
+    assembled matrices.
+
+    Returns:
+        dict
+    """
+    return assembly.setdefault("solvercache", dict())
+
+
+def getPartitionedSystem(assembly, constrainsdof, name="stiffness"):
+    """
+    getPartitionedSystem cached partition of assembly[name] on the free/constrained dofs
+
+    The partition is rebuilt only if the matrix or the dofs lists change.
+
+    Arguments:
+        assembly -- assembly dict
+        constrainsdof -- dict with the "freedof" and "constdof" lists
+        name -- key of the matrix in the assembly ("stiffness", "mass")
+
+    Returns:
+        PartitionedSystem
+    """
+    cache = getSolverCache(assembly)
+    matrix = assembly[name]
+    freedof = constrainsdof["freedof"]
+    constdof = constrainsdof.get("constdof", freedof[:0])
+    partition = cache.get(("partition", name))
+    if partition is None or not partition.isValid(matrix, freedof, constdof):
+        partition = PartitionedSystem(matrix, freedof, constdof)
+        cache[("partition", name)] = partition
+    return partition
+
+
+def getFactorization(assembly, constrainsdof, name="stiffness"):
+    """
+    getFactorization cached sparse factorization of the Kff block of assembly[name]
+
+    Arguments:
+        assembly -- assembly dict
+        constrainsdof -- dict with the "freedof" and "constdof" lists
+        name -- key of the matrix in the assembly
+
+    Returns:
+        Factorization
+    """
+    cache = getSolverCache(assembly)
+    partition = getPartitionedSystem(assembly, constrainsdof, name)
+    factor = cache.get(("factorization", name))
+    if factor is None or factor.partition is not partition:
+        factor = Factorization(partition)
+        cache[("factorization", name)] = factor
+    return factor
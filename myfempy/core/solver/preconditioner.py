@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+from numpy import (add, arange, asarray, einsum, eye, float64, int32, unique,
+                   where, zeros)
+from numpy.linalg import inv
+from scipy.sparse import csc_matrix, diags, issparse, tril, triu
+from scipy.sparse.linalg import LinearOperator, spilu, splu
+
+from myfempy.core.solver.amg import (AMG_THETA, SmoothedAggregationAMG,
+                                     getRigidBodyModes)
+
+INT32 = int32
+FLT64 = float64
+
+# preconditioners of the iterative solvers (solverset "PRECOND")
+PRECONDITIONERS = ("none", "jacobi", "blockjacobi", "ssor", "ic", "ilu", "amg")
+# relaxation of the SSOR preconditioner (solverset "OMEGA")
+SSOR_OMEGA = 1.0
+# threshold and fill of the incomplete factorizations (solverset "DROPTOL", "FILL")
+ILU_DROPTOL = 1e-4
+ILU_FILL = 10
+
+
+def getSparse(matrix):
+    """
+    getSparse assembled sparse matrix of a sparse, symmetric storage or matrix-free operator
+
+    Returns:
+        csc_matrix
+    """
+    if issparse(matrix):
+        return csc_matrix(matrix)
+    return csc_matrix(matrix.tocsc())
+
+
+def getJacobi(matrix):
+    """
+    getJacobi diagonal (Jacobi) preconditioner, M^-1 = D^-1
+
+    Works on matrix-free operators (only the diagonal is read).
+
+    Returns:
+        LinearOperator
+    """
+    diag = asarray(matrix.diagonal(), dtype=FLT64)
+    invdiag = 1.0 / where(diag != 0.0, diag, 1.0)
+    return LinearOperator(
+        matrix.shape, matvec=lambda x: invdiag * asarray(x).ravel(), dtype=FLT64
+    )
+
+
+def getBlockJacobi(matrix, freedof, nodedof):
+    """
+    getBlockJacobi nodal block-Jacobi preconditioner, M^-1 = blockdiag(K_nn)^-1
+
+    The blocks are the free dofs of each node (nodedof x nodedof, smaller
+    on partially constrained nodes).
+
+    Arguments:
+        matrix -- Kff
+        freedof -- free dofs list (global numbering), to group the dofs by node
+        nodedof -- dofs per node
+
+    Returns:
+        LinearOperator
+    """
+    freedof = asarray(freedof).ravel()
+    nodes, block = unique(freedof // nodedof, return_inverse=True)
+    local = freedof % nodedof
+    K = getSparse(matrix).tocoo()
+    same = block[K.row] == block[K.col]
+    # missing dofs of a block (constrained) are identity rows
+    blocks = zeros((nodes.shape[0], nodedof, nodedof), dtype=FLT64)
+    blocks[:] = eye(nodedof, dtype=FLT64)
+    blocks[block, local, local] = 0.0
+    add.at(blocks, (block[K.row[same]], local[K.row[same]], local[K.col[same]]), K.data[same])
+    invblocks = inv(blocks)
+
+    def matvec(x):
+        xb = zeros((nodes.shape[0], nodedof), dtype=FLT64)
+        xb[block, local] = asarray(x).ravel()
+        return einsum("nij,nj->ni", invblocks, xb)[block, local]
+
+    return LinearOperator(matrix.shape, matvec=matvec, dtype=FLT64)
+
+
+def getSSOR(matrix, omega=SSOR_OMEGA):
+    """
+    getSSOR symmetric successive over-relaxation preconditioner
+
+    M = w/(2-w) (D/w + L) (D/w)^-1 (D/w + U), applied with two triangular solves.
+
+    Arguments:
+        matrix -- Kff
+        omega -- relaxation factor, 0 < omega < 2
+
+    Returns:
+        LinearOperator
+    """
+    K = getSparse(matrix)
+    diag = K.diagonal()
+    D = diags(diag / omega, format="csc")
+    # triangular factors, natural order keeps them without fill
+    lower = splu(
+        csc_matrix(D + tril(K, k=-1)), permc_spec="NATURAL", diag_pivot_thresh=0.0
+    )
+    upper = splu(
+        csc_matrix(D + triu(K, k=1)), permc_spec="NATURAL", diag_pivot_thresh=0.0
+    )
+    scale = (2.0 - omega) / omega * (diag / omega)
+
+    def matvec(x):
+        y = lower.solve(asarray(x, dtype=FLT64).ravel())
+        return upper.solve(scale * y)
+
+    return LinearOperator(K.shape, matvec=matvec, dtype=FLT64)
+
+
+def getIncomplete(matrix, symmetric=True, drop_tol=ILU_DROPTOL, fill_factor=ILU_FILL):
+    """
+    getIncomplete incomplete factorization preconditioner (SuperLU ILUTP)
+
+    With symmetric=True the factorization runs in symmetric mode (diagonal
+    pivots, symmetric ordering), the incomplete Cholesky counterpart for
+    an SPD matrix. symmetric=False is the general threshold ILU.
+
+    Arguments:
+        matrix -- Kff
+        drop_tol -- drop tolerance of the small entries
+        fill_factor -- max fill ratio nnz(L+U)/nnz(K)
+
+    Returns:
+        LinearOperator
+    """
+    K = getSparse(matrix)
+    if symmetric:
+        ilu = spilu(
+            K,
+            drop_tol=drop_tol,
+            fill_factor=fill_factor,
+            permc_spec="MMD_AT_PLUS_A",
+            diag_pivot_thresh=0.0,
+            options=dict(SymmetricMode=True),
+        )
+    else:
+        ilu = spilu(K, drop_tol=drop_tol, fill_factor=fill_factor)
+    return LinearOperator(
+        K.shape, matvec=lambda x: ilu.solve(asarray(x, dtype=FLT64).ravel()), dtype=FLT64
+    )
+
+
+def getPreconditioner(matrix, name="jacobi", freedof=None, nodedof=1, coord=None, **options):
+    """
+    getPreconditioner preconditioner M^-1 of the iterative solvers
+
+    Arguments:
+        matrix -- Kff (sparse, symmetric storage or matrix-free operator)
+        name -- one of PRECONDITIONERS
+        freedof -- free dofs list, for "blockjacobi" and "amg"
+        nodedof -- dofs per node, for "blockjacobi" and "amg"
+        coord -- nodes coordinates, for "amg" (rigid body modes)
+        options -- "omega" (ssor), "drop_tol" and "fill_factor" (ic, ilu), "theta" (amg)
+
+    Returns:
+        LinearOperator, None for "none"
+    """
+    name = str(name).lower() if name is not None else "none"
+    if name == "none":
+        return None
+    if name == "jacobi":
+        return getJacobi(matrix)
+    if freedof is None:
+        freedof = arange(matrix.shape[0], dtype=INT32)
+    if name == "blockjacobi":
+        return getBlockJacobi(matrix, freedof, nodedof)
+    if name == "ssor":
+        return getSSOR(matrix, options.get("omega", SSOR_OMEGA))
+    if name in ("ic", "ilu"):
+        return getIncomplete(
+            matrix,
+            symmetric=(name == "ic"),
+            drop_tol=options.get("drop_tol", ILU_DROPTOL),
+            fill_factor=options.get("fill_factor", ILU_FILL),
+        )
+    if name == "amg":
+        if coord is None:
+            raise ValueError("preconditioner amg needs the nodes coordinates")
+        freedof = asarray(freedof).ravel()
+        return SmoothedAggregationAMG(
+            getSparse(matrix),
+            getRigidBodyModes(coord, nodedof, freedof),
+            freedof // nodedof,
+            theta=options.get("theta", AMG_THETA),
+        )
+    raise ValueError("preconditioner %s not in %s" % (name, PRECONDITIONERS))
+
+
+def getSolverPreconditioner(matrix, freedof, modelinfo, solverset, default="jacobi"):
+    """
+    getSolverPreconditioner preconditioner of a solver from the solverset options
+
+    solverset "PRECOND" (one of PRECONDITIONERS), "OMEGA" (ssor), "DROPTOL"
+    and "FILL" (ic, ilu), "THETA" (amg).
+
+    Arguments:
+        matrix -- Kff
+        freedof -- free dofs list
+        modelinfo -- model information ("nodedof", "coord")
+        solverset -- solver settings
+        default -- preconditioner without "PRECOND"
+
+    Returns:
+        (name, M^-1), M^-1 None for "none"
+    """
+    name = str(solverset.get("PRECOND", default)).lower()
+    M = getPreconditioner(
+        matrix,
+        name,
+        freedof=freedof,
+        nodedof=modelinfo["nodedof"],
+        coord=modelinfo.get("coord"),
+        omega=solverset.get("OMEGA", SSOR_OMEGA),
+        drop_tol=solverset.get("DROPTOL", ILU_DROPTOL),
+        fill_factor=solverset.get("FILL", ILU_FILL),
+        theta=solverset.get("THETA", AMG_THETA),
+    )
+    return name, M
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+from numpy import (array_equal, bincount, concatenate, cumsum, float64, int32,
+                   int64, maximum, minimum, tile, triu_indices, unique)
+from scipy.sparse import csc_matrix
+
+INT32 = int32
+INT64 = int64
+FLT64 = float64
+
+from myfempy.core.solver.assemblerfull_numpy_v1 import getLocKeyBatch
+
+
+class SparsityPattern:
+    """
+    Symbolic Sparsity Pattern Class <ClassOrder>
+
+    Symbolic assembly built once from the connectivity. Holds the CSC
+    indptr/indices and a scatter map from every element matrix entry to its
+    slot in the CSC data, so a new assembly only refills the data array.
+    With symm=True only the upper triangle (row <= col) is stored.
+    """
+
+    def __init__(self, inci, nodecon, nodedof, nodetot, symm=False):
+        self.nodecon = nodecon
+        self.nodedof = nodedof
+        self.elemdof = nodecon * nodedof
+        self.symm = symm
+        self.sdof = nodedof * nodetot
+        self.conec = inci[:, 4 : 4 + nodecon].copy()
+
+        loc = getLocKeyBatch(inci, nodecon, nodedof).astype(INT64)
+        if symm:
+            iu, ju = triu_indices(self.elemdof)
+            self.entries = iu * self.elemdof + ju
+            ith = minimum(loc[:, iu], loc[:, ju]).ravel()
+            jth = maximum(loc[:, iu], loc[:, ju]).ravel()
+        else:
+            self.entries = None
+            ith = loc.repeat(self.elemdof, axis=1).ravel()
+            jth = tile(loc, (1, self.elemdof)).ravel()
+
+        key, scatter = unique(jth * self.sdof + ith, return_inverse=True)
+        self.nnz = key.shape[0]
+        self.indices = (key % self.sdof).astype(INT32)
+        self.indptr = concatenate(
+            ([0], cumsum(bincount(key // self.sdof, minlength=self.sdof)))
+        ).astype(INT32)
+        if self.nnz < 2**31:
+            self.scatter = scatter.astype(INT32)
+        else:
+            self.scatter = scatter
+
+    def isValid(self, inci, nodecon, nodedof, nodetot):
+        """
+        isValid check the pattern against a connectivity
+
+        Returns:
+            True if the pattern was built from the same mesh
+        """
+        if (nodecon, nodedof, nodedof * nodetot) != (self.nodecon, self.nodedof, self.sdof):
+            return False
+        return array_equal(inci[:, 4 : 4 + nodecon], self.conec)
+
+    def getData(self, matrix):
+        """
+        getData numeric assembly into the pattern slots
+
+        Arguments:
+            matrix -- element matrices (nelem, edof, edof) or the flat element-major values
+
+        Returns:
+            CSC data array
+        """
+        val = matrix.reshape(-1, self.elemdof * self.elemdof)
+        if self.symm:
+            val = val[:, self.entries]
+        return bincount(self.scatter, weights=val.ravel(), minlength=self.nnz)
+
+    def getMatrix(self, matrix):
+        """
+        getMatrix numeric assembly of the global sparse matrix
+
+        Returns:
+            csc_matrix (upper triangle only if symm)
+        """
+        A_sp_scipy_csc = csc_matrix(
+            (self.getData(matrix), self.indices, self.indptr),
+            shape=(self.sdof, self.sdof),
+        )
+        A_sp_scipy_csc.has_sorted_indices = True
+        return A_sp_scipy_csc
+
+
+def getSparsityPattern(Model, inci, coord, symm=False):
+    """
+    getSparsityPattern cached symbolic assembly of the model
+
+    The pattern is kept on the Model and rebuilt only if the connectivity changes.
+
+    Returns:
+        SparsityPattern
+    """
+    elem_set = Model.element.getElementSet()
+    nodedof = elem_set.nodedof
+    shape_set = Model.shape.getShapeSet()
+    nodecon = shape_set.nodecon
+    nodetot = coord.shape[0]
+
+    cache = getattr(Model, "sparsity", None)
+    if cache is None:
+        cache = dict()
+        Model.sparsity = cache
+    pattern = cache.get(symm)
+    if pattern is None or not pattern.isValid(inci, nodecon, nodedof, nodetot):
+        pattern = SparsityPattern(inci, nodecon, nodedof, nodetot, symm)
+        cache[symm] = pattern
+    return pattern
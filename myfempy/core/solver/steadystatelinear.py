@@ -1,13 +1,14 @@
 from __future__ import annotations
 
 
-from numpy import dot, float64, zeros
-from scipy.sparse.linalg import spsolve
+from numpy import cumsum
 
 from myfempy.core.solver.assemblerfull import AssemblerFULL
 from myfempy.core.solver.assemblerfull_parallel import AssemblerFULLPOOL
 from myfempy.core.solver.assemblersymm import AssemblerSYMM
 # from myfempy.core.alglin import linsolve_spsolve
+from myfempy.core.solver.linearsystem import (getFactorization,
+                                                getPartitionedSystem)
 from myfempy.core.solver.solver import Solver
 from myfempy.core.utilities import setSteps
 
@@ -18,7 +19,7 @@ class SteadyStateLinear(Solver):
 
     # @profile
     def getMatrixAssembler(
-        Model, inci, coord, tabmat, tabgeo, intgauss, SYMM=None, MP=None
+        Model, inci, coord, tabmat, tabgeo, intgauss, SYMM=None, MP=None, MASS=None, MF=None
     ):
         matrix = dict()
 
@@ -69,35 +70,19 @@ class SteadyStateLinear(Solver):
         return AssemblerFULL.getDirichletNH(constrains, nodetot, nodedof)
 
     def runSolve(assembly, constrainsdof, modelinfo, solverset):
-        fulldofs = modelinfo["fulldofs"]
-
         solution = dict()
         nsteps = setSteps(solverset["STEPSET"])
 
-        stiffness = assembly["stiffness"]
         forcelist = assembly["loads"]
-
-        U0 = zeros((fulldofs), dtype=float64)  # empty((fulldofs, 1))
-        U1 = zeros((fulldofs), dtype=float64)  # empty((fulldofs, 1))
-        U = zeros((fulldofs, nsteps), dtype=float64)  # empty((fulldofs, nsteps))
-        Uc = assembly["bcdirnh"]
-
-        freedof = constrainsdof["freedof"]
-        constdof = constrainsdof["constdof"]
-
-        for step in range(nsteps):
-            forcelist[freedof, step] = forcelist[freedof, step] - dot(
-                stiffness[:, constdof][freedof, :].toarray(), Uc[constdof, step]
-            )
-            try:
-                U1[freedof] = spsolve(
-                    stiffness[:, freedof][freedof, :], forcelist[freedof, step]
-                )
-            except:
-                pass
-            U1[constdof] = Uc[constdof, step]
-            U1[:] += U0[:]
-            U[:, step] = U1
-            U0[:] = U1[:]
+        Uc = assembly["bcdirnh"][:, :nsteps]
+
+        # K is the same in all steps: one partition and factorization, all steps as a block rhs
+        system = getPartitionedSystem(assembly, constrainsdof)
+        forcelist[system.freedof, :nsteps] = system.getLoad(forcelist[:, :nsteps], Uc)
+        U = system.getFull(
+            getFactorization(assembly, constrainsdof).solve(forcelist[system.freedof, :nsteps]), Uc
+        )
+        # steps are increments of the previous step
+        U = cumsum(U, axis=1)
         solution["U"] = U
         return solution
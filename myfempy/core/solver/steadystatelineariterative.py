@@ -1,11 +1,15 @@
 from __future__ import annotations
 
-from numpy import dot, float64, zeros
-from scipy.sparse.linalg import minres
+from numpy import float64, zeros
 
+from myfempy.core.solver.assemblerebe import AssemblerEBE
 from myfempy.core.solver.assemblerfull import AssemblerFULL
 from myfempy.core.solver.assemblerfull_parallel import AssemblerFULLPOOL
 from myfempy.core.solver.assemblersymm import AssemblerSYMM
+from myfempy.core.solver.elementoperator import ElementOperator
+from myfempy.core.solver.krylov import KRYLOV_TOL, getPCG
+from myfempy.core.solver.linearsystem import getPartitionedSystem
+from myfempy.core.solver.preconditioner import getSolverPreconditioner
 from myfempy.core.solver.solver import Solver
 from myfempy.core.utilities import setSteps
 
@@ -15,11 +19,23 @@ class SteadyStateLinearIterative(Solver):
     Steady State Linear Iterative Solver Class <ConcreteClassService>
     """
 
-    def getMatrixAssembler(Model, inci, coord, tabmat, tabgeo, intgauss, SYMM, MP):
+    def getMatrixAssembler(Model, inci, coord, tabmat, tabgeo, intgauss, SYMM, MP, MASS=None, MF=None):
 
         matrix = dict()
 
-        if SYMM:
+        if MF:
+            # matrix-free, element by element operator (MF "recompute" keeps no element matrix)
+            matrix["stiffness"] = AssemblerEBE.getLinearStiffnessGlobalMatrixAssembler(
+                Model,
+                inci,
+                coord,
+                tabmat,
+                tabgeo,
+                intgauss,
+                type_assembler="linear_stiffness_" + str(MF).lower(),
+                MP=MP,
+            )
+        elif SYMM:
             matrix["stiffness"] = AssemblerSYMM.getLinearStiffnessGlobalMatrixAssembler(
                 Model,
                 inci,
@@ -70,7 +86,6 @@ class SteadyStateLinearIterative(Solver):
         solution = dict()
         nsteps = setSteps(solverset["STEPSET"])
 
-        stiffness = assembly["stiffness"]
         forcelist = assembly["loads"]
 
         U0 = zeros((fulldofs), dtype=float64)  # empty((fulldofs, 1))
@@ -78,25 +93,44 @@ class SteadyStateLinearIterative(Solver):
         U = zeros((fulldofs, nsteps), dtype=float64)  # empty((fulldofs, nsteps))
         Uc = assembly["bcdirnh"]
 
-        freedof = constrainsdof["freedof"]
-        constdof = constrainsdof["constdof"]
+        system = getPartitionedSystem(assembly, constrainsdof)
+        freedof = system.freedof
+        constdof = system.constdof
+
+        # K is SPD after the constraints: preconditioned CG, M^-1 built once for all steps
+        precond, M = getSolverPreconditioner(system.Kff, freedof, modelinfo, solverset)
+        tol = solverset.get("TOL", KRYLOV_TOL)
+        maxiter = solverset.get("MAXITER", None)
+        iterations = []
+        residuals = []
+        converged = []
 
         for step in range(nsteps):
-            forcelist[freedof, step] = forcelist[freedof, step] - dot(
-                stiffness[:, constdof][freedof, :].toarray(), Uc[constdof, step]
+            forcelist[freedof, step] = system.getLoad(forcelist[:, step], Uc[:, step])
+            U1[freedof], info = getPCG(
+                A=system.Kff,
+                b=forcelist[freedof, step],
+                M=M,
+                tol=tol,
+                maxiter=maxiter,
             )
-            try:
-                U1[freedof], info = minres(
-                    A=stiffness[:, freedof][freedof, :],
-                    b=forcelist[freedof, step],
-                    tol=1e-10,
-                    maxiter=1000,
-                )
-            except:
-                raise info
+            iterations.append(info["iterations"])
+            residuals.append(info["residuals"])
+            converged.append(info["converged"])
             U1[constdof] = Uc[constdof, step]
             U1[:] += U0[:]
             U[:, step] = U1
             U0[:] = U1[:]
+
+        solverstatus = solverset.setdefault("solverstatus", dict())
+        if isinstance(assembly["stiffness"], ElementOperator):
+            solverstatus["typeasmb"] = "MATRIXFREE"
+        solverstatus["krylov"] = "PCG"
+        solverstatus["precond"] = precond.upper()
+        solverstatus["tol"] = tol
+        # per load step
+        solverstatus["iterations"] = iterations
+        solverstatus["residuals"] = residuals
+        solverstatus["converged"] = converged
         solution["U"] = U
         return solution
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+from numpy import all as np_all
+from numpy import (arange, array_equal, asarray, diff, float64, full, int32,
+                   isscalar, ndarray)
+from scipy.sparse import csc_matrix, diags, issparse, triu
+from scipy.sparse.linalg import LinearOperator
+
+from myfempy.core.solver.elementoperator import ElementOperator
+
+INT32 = int32
+FLT64 = float64
+
+
+class SymmetricMatrix(LinearOperator):
+    """
+    Symmetric Storage Matrix Class <ClassOrder>
+
+    Symmetric matrix stored as its upper triangle (diagonal included) in CSC.
+    Works as a scipy LinearOperator (matvec) for the iterative and eigen
+    solvers, with diagonal and submatrix extraction on the dofs list.
+    """
+
+    def __init__(self, upper):
+        self.upper = csc_matrix(upper)
+        super().__init__(dtype=self.upper.dtype, shape=self.upper.shape)
+
+    @property
+    def data(self):
+        return self.upper.data
+
+    @property
+    def nnz(self):
+        return self.upper.nnz
+
+    def _matvec(self, x):
+        x = asarray(x).ravel()
+        # K x = U x + (U - D)^T x
+        return self.upper.dot(x) + self.upper.transpose().dot(x) - self.upper.diagonal() * x
+
+    def _rmatvec(self, x):
+        return self._matvec(x)
+
+    def _matmat(self, X):
+        X = asarray(X)
+        return (
+            self.upper.dot(X)
+            + self.upper.transpose().dot(X)
+            - self.upper.diagonal()[:, None] * X
+        )
+
+    def _adjoint(self):
+        return self
+
+    def _transpose(self):
+        return self
+
+    def diagonal(self):
+        """
+        diagonal main diagonal of the matrix
+
+        Returns:
+            array (n,)
+        """
+        return self.upper.diagonal()
+
+    def getStrictUpper(self):
+        """
+        getStrictUpper upper triangle without the diagonal
+
+        Returns:
+            csc_matrix
+        """
+        return triu(self.upper, k=1, format="csc")
+
+    def getSubMatrix(self, rows, cols=None):
+        """
+        getSubMatrix extract K[rows, cols]
+
+        Arguments:
+            rows -- dofs list of the rows (e.g. freedof)
+            cols -- dofs list of the cols, None for the principal submatrix K[rows, rows]
+
+        Returns:
+            SymmetricMatrix if principal and rows is sorted, full csc_matrix otherwise
+        """
+        rows = asarray(rows).ravel()
+        if cols is None:
+            if np_all(diff(rows) > 0):
+                return SymmetricMatrix(self.upper[rows, :][:, rows])
+            cols = rows
+        cols = asarray(cols).ravel()
+        strict = self.getStrictUpper()
+        # K[r, c] = U[r, c] + (U - D)[c, r]
+        return csc_matrix(
+            self.upper[rows, :][:, cols] + strict[cols, :][:, rows].transpose()
+        )
+
+    def tocsc(self):
+        """
+        tocsc full (both triangles) matrix
+
+        Returns:
+            csc_matrix
+        """
+        return csc_matrix(self.upper + self.getStrictUpper().transpose())
+
+    def toarray(self):
+        return self.tocsc().toarray()
+
+    def __getitem__(self, key):
+        rows, cols = self.__getIndex(key)
+        return self.getSubMatrix(rows, cols)
+
+    def __setitem__(self, key, value):
+        rows, cols = self.__getIndex(key)
+        value = asarray(value, dtype=FLT64)
+        if value.ndim == 0:
+            value = full((rows.shape[0], cols.shape[0]), value, dtype=FLT64)
+        for ii in range(rows.shape[0]):
+            for jj in range(cols.shape[0]):
+                if rows[ii] <= cols[jj]:
+                    self.upper[rows[ii], cols[jj]] = value[ii, jj]
+
+    def __add__(self, other):
+        # a sparse operand is taken as symmetric (e.g. the lumped mass diagonal)
+        if issparse(other):
+            other = getSymmetricMatrix(other)
+        if isinstance(other, SymmetricMatrix):
+            return SymmetricMatrix(self.upper + other.upper)
+        return super().__add__(other)
+
+    def __sub__(self, other):
+        if issparse(other):
+            other = getSymmetricMatrix(other)
+        if isinstance(other, SymmetricMatrix):
+            return SymmetricMatrix(self.upper - other.upper)
+        return super().__sub__(other)
+
+    def __mul__(self, other):
+        if isscalar(other):
+            return SymmetricMatrix(self.upper * other)
+        return super().__mul__(other)
+
+    def __rmul__(self, other):
+        if isscalar(other):
+            return SymmetricMatrix(self.upper * other)
+        return super().__rmul__(other)
+
+    def __neg__(self):
+        return SymmetricMatrix(-self.upper)
+
+    def __getIndex(self, key):
+        if not isinstance(key, tuple) or len(key) != 2:
+            raise IndexError("SymmetricMatrix: index must be [rows, cols]")
+        index = []
+        for kk, size in zip(key, self.shape):
+            if isinstance(kk, slice):
+                index.append(arange(size)[kk])
+            else:
+                index.append(asarray(kk).ravel())
+        return index[0], index[1]
+
+
+def getSubMatrix(matrix, rows, cols=None):
+    """
+    getSubMatrix extract matrix[rows, cols] from a sparse or a symmetric storage matrix
+
+    Arguments:
+        matrix -- csc_matrix, SymmetricMatrix, ElementOperator or array (n,) of a diagonal matrix (lumped mass)
+        rows -- dofs list of the rows (e.g. freedof)
+        cols -- dofs list of the cols, None for the principal submatrix
+
+    Returns:
+        submatrix, SymmetricMatrix for a principal submatrix of a SymmetricMatrix,
+        ElementOperator for an ElementOperator
+    """
+    if isinstance(matrix, (SymmetricMatrix, ElementOperator)):
+        return matrix.getSubMatrix(rows, cols)
+    if isinstance(matrix, ndarray) and matrix.ndim == 1:
+        rows = asarray(rows).ravel()
+        if cols is None or array_equal(asarray(cols).ravel(), rows):
+            return diags(matrix[rows], format="csc")
+        return csc_matrix((rows.shape[0], asarray(cols).ravel().shape[0]), dtype=matrix.dtype)
+    if cols is None:
+        cols = rows
+    return matrix[:, cols][rows, :]
+
+
+def getSymmetricMatrix(matrix):
+    """
+    getSymmetricMatrix symmetric storage of a full symmetric sparse matrix
+
+    Returns:
+        SymmetricMatrix
+    """
+    if isinstance(matrix, SymmetricMatrix):
+        return matrix
+    return SymmetricMatrix(triu(matrix, k=0, format="csc"))
@@ -1,6 +1,7 @@
 
-from numpy import (array, asarray, cross, dot, eye, float64, ix_, less, matmul,
-                   mean, ones_like, sqrt, uint32, unique, where, zeros, empty)
+from numpy import (array, asarray, ascontiguousarray, cross, dot, eye, float64,
+                   indices, ix_, less, matmul, mean, ones_like, sqrt, uint32,
+                   unique, where, zeros, empty)
 from numpy.linalg import multi_dot
 from scipy.linalg import block_diag, det, inv, kron
 from scipy.sparse import csc_matrix
@@ -135,6 +136,151 @@ def getRotational_Matrix(x, dim):
         return 0.0
 
 
+def getRotational_MatrixBatch(x):
+    """
+    getRotational_MatrixBatch direction cosines of many line elements, as getRotational_Matrix(x, 1)
+
+    Arguments:
+        x -- node coordinates (nelem, nodecon, 3), the local axis goes from node i to node j
+
+    Returns:
+        array (nelem, 3, 3)
+    """
+    x = asarray(x, dtype=FLT64)
+    dX = x[:, 1, :] - x[:, 0, :]
+    L = sqrt((dX**2).sum(axis=1))
+    # members along z, local y is the global y
+    vertical = (dX[:, 0] == 0.0) & (dX[:, 1] == 0.0)
+    l = dX[:, 0] / L
+    m = dX[:, 1] / L
+    n = dX[:, 2] / L
+    d = sqrt(l**2 + m**2)
+    d[vertical] = 1.0
+    lamb = empty((x.shape[0], 3, 3), dtype=FLT64)
+    lamb[:, 0, 0] = l
+    lamb[:, 0, 1] = m
+    lamb[:, 0, 2] = n
+    lamb[:, 1, 0] = -m / d
+    lamb[:, 1, 1] = l / d
+    lamb[:, 1, 2] = 0.0
+    lamb[:, 2, 0] = -l * n / d
+    lamb[:, 2, 1] = -m * n / d
+    lamb[:, 2, 2] = d
+    sign = where(dX[vertical, 2] > 0.0, 1.0, -1.0)
+    lamb[vertical] = 0.0
+    lamb[vertical, 0, 2] = sign
+    lamb[vertical, 1, 1] = 1.0
+    lamb[vertical, 2, 0] = -sign
+    return lamb
+
+
+def getLumpedMass(M_elem_mat, nodedof, type_lumped="hrz"):
+    """
+    getLumpedMass diagonal (lumped) mass from the element consistent mass
+
+    Arguments:
+        M_elem_mat -- element consistent mass matrix (edof, edof)
+        nodedof -- number of dofs per node
+        type_lumped -- "hrz" (diagonal scaling, Hinton-Rock-Zienkiewicz) or "rowsum"
+
+    Returns:
+        diagonal mass vector (edof,)
+    """
+    M_elem_mat = asarray(M_elem_mat)
+    if type_lumped == "rowsum":
+        return M_elem_mat.sum(axis=1)
+    diag = M_elem_mat.diagonal().copy()
+    for dof in range(nodedof):
+        # scale the diagonal of each direction to keep the element total mass
+        mdof = M_elem_mat[dof::nodedof, dof::nodedof].sum()
+        diag[dof::nodedof] *= mdof / diag[dof::nodedof].sum()
+    return diag
+
+
+# hourglass stiffness coefficient of the one-point reduced integration (Flanagan-Belytschko),
+# set on cantilever bending of quad4/hexa8 meshes
+HOURGLASS_KAPPA = 0.8
+
+# hourglass base vectors, products of the node natural coordinates
+# quad4: xi*eta; hexa8: xi*eta, eta*zeta, zeta*xi, xi*eta*zeta
+HOURGLASS_BASE = {
+    "quad4": array([[1, -1, 1, -1]], dtype=FLT64),
+    "hexa8": array(
+        [
+            [1, -1, 1, -1, 1, -1, 1, -1],
+            [1, 1, -1, -1, -1, -1, 1, 1],
+            [1, -1, -1, 1, -1, 1, 1, -1],
+            [-1, 1, -1, 1, 1, -1, 1, -1],
+        ],
+        dtype=FLT64,
+    ),
+}
+
+
+def getStifReducedBatch(getBBatch, type_shape, C, elementcoord, dNdx, volume, kappa=HOURGLASS_KAPPA):
+    """
+    getStifReducedBatch one-point reduced integration stiffness with hourglass control
+
+    K = B0^T C B0 V at the element centre, plus the Flanagan-Belytschko
+    hourglass stiffness c * gamma gamma^T on each direction. The gamma
+    vectors are the hourglass base made orthogonal to the linear fields,
+    c = kappa * G * V * (b . b) / nodecon^2, G the shear term of C.
+
+    Arguments:
+        getBBatch -- B of the element from dN/dx, e.g. StructuralSolid.getBBatch
+        type_shape -- "quad4" or "hexa8"
+        C -- elastic tensor of each element (nelem, ntens, ntens)
+        elementcoord -- node coordinates (nelem, nodecon, ndim)
+        dNdx -- dN/dx at the element centre (nelem, ndim, nodecon)
+        volume -- element volume (area * thickness in 2D) (nelem,)
+        kappa -- hourglass stiffness coefficient
+
+    Returns:
+        stiffness matrix stack (nelem, edof, edof)
+    """
+    ndim, nodecon = dNdx.shape[1:]
+    B = getBBatch(dNdx)
+    K_elem_mat = matmul(B.transpose(0, 2, 1), matmul(C, B)) * volume[:, None, None]
+    base = HOURGLASS_BASE[type_shape]
+    gamma = base[None] - matmul(matmul(base[None], elementcoord[:, :, :ndim]), dNdx)
+    coef = kappa * C[:, -1, -1] * volume * (dNdx**2).sum(axis=(1, 2)) / nodecon**2
+    K_hg = matmul(gamma.transpose(0, 2, 1), gamma) * coef[:, None, None]
+    for dim in range(ndim):
+        K_elem_mat[:, dim::ndim, dim::ndim] += K_hg
+    return K_elem_mat
+
+
+def getStifSelectiveBatch(getBBatch, C, dNdx, scale):
+    """
+    getStifSelectiveBatch selective reduced integration stiffness (B-bar)
+
+    The dilatational part of B is replaced by its element mean,
+    B-bar = B + m (b_mean - b) / ndim with m = 1 on the normal strains and
+    b the divergence row of B (Hughes), so that the volumetric strain is
+    constant in the element.
+
+    Arguments:
+        getBBatch -- B of the element from dN/dx, e.g. StructuralSolid.getBBatch
+        C -- elastic tensor of each element (nelem, ntens, ntens)
+        dNdx -- dN/dx at the integration points (nelem, npoint, ndim, nodecon)
+        scale -- |detJ| * weight (* thickness) at the integration points (nelem, npoint)
+
+    Returns:
+        stiffness matrix stack (nelem, edof, edof)
+    """
+    nelem, npoint, ndim, nodecon = dNdx.shape
+    edof = ndim * nodecon
+    # divergence row, b[ndim * node + dim] = dN_node/dx_dim
+    b = dNdx.transpose(0, 1, 3, 2).reshape(nelem, npoint, edof)
+    b_mean = (b * scale[:, :, None]).sum(axis=1) / scale.sum(axis=1)[:, None]
+    K_elem_mat = zeros((nelem, edof, edof), dtype=FLT64)
+    for pp in range(npoint):
+        B = getBBatch(dNdx[:, pp])
+        B[:, :ndim, :] += ((b_mean - b[:, pp]) / ndim)[:, None, :]
+        K_elem_mat += matmul(B.transpose(0, 2, 1), matmul(C, B)) * scale[:, pp, None, None]
+    return K_elem_mat
+
+
 def setSteps(steps):
     """
     setSteps steps setting
@@ -566,7 +712,79 @@ def nodes_from_regions(regionlist):
 
 
 # integracao numerica
+# number of directions of the tensor product gauss rule of each shape
+GAUSS_DIM = {
+    "line2": 1,
+    "line3": 1,
+    "tria3": 2,
+    "tria6": 2,
+    "quad4": 2,
+    "quad8": 2,
+    "tetr4": 3,
+    "hexa8": 3,
+}
+
+_gauss = dict()
+
+
 def gauss_points(type, npp):
+    """
+    gauss_points gauss points and weights per direction, built once per (shape, order)
+
+    Arguments:
+        type -- shape key, e.g. "quad4"
+        npp -- number of gauss points per direction
+
+    Returns:
+        read-only arrays pt (npp,), wt (npp,), None if the order is not available
+    """
+    key = (type, int(npp))
+    rule = _gauss.get(key)
+    if rule is None:
+        rule = __gauss_points(type, int(npp))
+        if rule is None:
+            return None
+        rule = tuple(__setReadOnly(array(values, dtype=FLT64)) for values in rule)
+        _gauss[key] = rule
+    return rule
+
+
+def getGaussQuadrature(type, npp, ndim=None):
+    """
+    getGaussQuadrature flattened tensor product gauss rule, built once per (shape, order, ndim)
+
+    The points are in the order of the nested loops for ip: for jp: for kp,
+    the weight of each point is wt[ip]*wt[jp]*wt[kp].
+
+    Arguments:
+        type -- shape key, e.g. "quad4"
+        npp -- number of gauss points per direction
+
+    Keyword Arguments:
+        ndim -- number of directions, e.g. 1 for the edges and 2 for the faces (default: {None}, GAUSS_DIM of the shape)
+
+    Returns:
+        read-only arrays points (ngp, ndim), weights (ngp,)
+    """
+    if ndim is None:
+        ndim = GAUSS_DIM[type]
+    key = (type, int(npp), int(ndim))
+    rule = _gauss.get(key)
+    if rule is None:
+        pt, wt = gauss_points(type, npp)
+        index = indices((pt.shape[0],) * ndim).reshape(ndim, -1).transpose()
+        rule = (__setReadOnly(pt[index]), __setReadOnly(wt[index].prod(axis=1)))
+        _gauss[key] = rule
+    return rule
+
+
+def __setReadOnly(values):
+    values = ascontiguousarray(values)
+    values.setflags(write=False)
+    return values
+
+
+def __gauss_points(type, npp):
 
     if type == "line2":
         return __gauss_points_line(npp)
@@ -788,9 +1006,11 @@ def __gauss_points_tria(npp):
 
 
 def __gauss_points_tetr(npp):
+    # the tetr4 detJacobi already holds the 1/6 of the reference volume,
+    # the weights of the tensor product rule sum to 1 (as the 4 and 5 points rules)
     if npp == 1:
         pt = array([0.3333333333333333])
-        wt = array([0.166666666666667])
+        wt = array([1.000000000000000])
         return pt, wt
     elif npp == 4:
         pt = array(
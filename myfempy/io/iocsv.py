@@ -182,38 +182,18 @@ def write2log(log_file, log_data, modelinfo, solstatus):
             if "tabmat" in log_data["get"].keys():
                 file_object.write("\n")
                 file_object.write("LIST OF MATERIAL PROPERTY\n")
+                # structured table, a column per field
+                fields = modelinfo["tabmat"].dtype.names
                 file_object.write(
-                    "{0:<7}{1:<10}{2:<10}{3:<10}{4:<10}{5:<10}{6:<10}{7:<10}{8:<10}{9:<10}{10:<10}{11:<10}\n".format(
-                        "PROP",
-                        "EXX",
-                        "VXX",
-                        "GXX",
-                        "EYY",
-                        "VYY",
-                        "GYY",
-                        "RHO",
-                        "STIF",
-                        "DAMP",
-                        "ID_MAT",
-                        "ID_DEF",
-                    )
+                    "{0:<7}".format("PROP")
+                    + "".join("{0:<10}".format(key) for key in fields)
+                    + "\n"
                 )
                 for row in range(len(modelinfo["tabmat"])):
                     file_object.write(
-                        "{0:<7}{1:<10}{2:<10}{3:<10}{4:<10}{5:<10}{6:<10}{7:<10}{8:<10}{9:<10}{10:<10}{11:<10}\n".format(
-                            str(row + 1),
-                            modelinfo["tabmat"][row][0],
-                            modelinfo["tabmat"][row][1],
-                            modelinfo["tabmat"][row][2],
-                            modelinfo["tabmat"][row][3],
-                            modelinfo["tabmat"][row][4],
-                            modelinfo["tabmat"][row][5],
-                            modelinfo["tabmat"][row][6],
-                            modelinfo["tabmat"][row][7],
-                            modelinfo["tabmat"][row][8],
-                            modelinfo["tabmat"][row][9].astype(int),
-                            modelinfo["tabmat"][row][10].astype(int),
-                        )
+                        "{0:<7}".format(str(row + 1))
+                        + "".join("{0:<10}".format(modelinfo["tabmat"][row][key]) for key in fields)
+                        + "\n"
                     )
             if "tabgeo" in log_data["get"].keys():
                 file_object.write("\n")
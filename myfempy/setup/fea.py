@@ -7,6 +7,7 @@ from time import time
 import numpy as np
 import scipy.sparse as sp
 
+from myfempy.core.backends import getAutotune
 from myfempy.core.utilities import setSteps
 # from myfempy.core.solver import getSolver
 from myfempy.io.controllers import (setElement, setGeometry, setMaterial,
@@ -81,6 +82,7 @@ class newAnalysis:
             self.model = SetModel(Mesh, Element, Shape, Material, Geometry)
             self.model.modeldata = modeldata
             self.model.intgauss = GaussPoints
+            self.model.integration = newAnalysis.__setIntegration(modeldata)
             logging.info("TRY SET FEMODEL -- SUCCESS")
         except:
             logging.warning("TRY SET FEMODEL -- FAULT")
@@ -99,17 +101,17 @@ class newAnalysis:
         elem_set = self.model.element.getElementSet()
         self.modelinfo["tensor"] = len(elem_set["tensor"])
         self.modelinfo["dofs"] = elem_set["dofs"]
-        self.modelinfo["nodedof"] = len(elem_set["dofs"]["d"])
+        self.modelinfo["nodedof"] = elem_set.nodedof
         self.modelinfo["type_element"] = elem_set["key"]
         shape_set = self.model.shape.getShapeSet()
         self.modelinfo["shapeid"] = shape_set["id"]
-        self.modelinfo["nodecon"] = len(shape_set["nodes"])
-        self.modelinfo["elemdofs"] = len(shape_set["nodes"]) * self.modelinfo["nodedof"]
+        self.modelinfo["nodecon"] = shape_set.nodecon
+        self.modelinfo["elemdofs"] = shape_set.nodecon * self.modelinfo["nodedof"]
         self.modelinfo["type_shape"] = shape_set["key"]
         self.modelinfo["elemid"] = int(f'{elem_set["id"]}{shape_set["id"]}')
         self.modelinfo["nnode"] = len(self.model.coord)
         self.modelinfo["nelem"] = len(self.model.inci)
-        self.modelinfo["fulldofs"] = len(elem_set["dofs"]["d"]) * len(self.model.coord)
+        self.modelinfo["fulldofs"] = elem_set.nodedof * len(self.model.coord)
 
     def Physic(self, physicdata):
         """
@@ -167,7 +169,7 @@ class newAnalysis:
         intgauss = self.modelinfo["intgauss"]
         # try:
         matrix = newAnalysis.getGlobalMatrix(
-            self, inci, coord, tabmat, tabgeo, intgauss, self.symm, self.mp
+            self, inci, coord, tabmat, tabgeo, intgauss, self.symm, self.mp, self.mass, self.mf
         )
         #     logging.info("TRY RUN GLOBAL ASSEMBLY -- SUCCESS")
         # except:
@@ -219,11 +221,38 @@ class newAnalysis:
         except:
             self.mp = 0
             solverset["solverstatus"]["ncpu"] = "SERIAL_" + str(1) + "_CORE"
+        try:
+            self.mass = solverset["MASS"]
+        except:
+            self.mass = "consistent"
+        solverset["solverstatus"]["typemass"] = str(self.mass).upper()
+        try:
+            # the solvers with an element by element operator set typeasmb "MATRIXFREE"
+            self.mf = solverset["MATRIXFREE"]
+        except:
+            self.mf = False
+        try:
+            # memory budget [MB] of the chunked assembly
+            self.model.membudget = solverset["MEMORY"]
+        except:
+            self.model.membudget = None
+        try:
+            # element kernel backend: "auto" (autotuned), "cython", "numba" or "numpy"
+            self.model.backend = solverset["BACKEND"]
+        except:
+            self.model.backend = "auto"
+        self.model.kernelbackend = None
         # loading_bar_v1(10,"SOLVER")
         starttime = time()
         assembly, forcelist = newAnalysis.Assembly(self)
         endttime = time()
         solverset["solverstatus"]["timeasb"] = abs(endttime - starttime)
+        # backend that actually ran, the forced one may not be available
+        solverset["solverstatus"]["backend"] = str(
+            self.model.kernelbackend or "element"
+        ).upper()
+        # backend picked for each kernel workload
+        solverset["solverstatus"]["kernels"] = getAutotune()
         solverset["solverstatus"]["memorysize"] = assembly["stiffness"].data.nbytes
         # loading_bar_v1(50,"SOLVER")
         constrains = self.modelinfo["constrains"]
@@ -366,6 +395,8 @@ class newAnalysis:
         return self.modelinfo["intgauss"]
 
     def getElementVolume(self, inci, coord, tabgeo):
+        if hasattr(self.model.element, "getElementVolumeBatch"):
+            return self.model.element.getElementVolumeBatch(self.model, inci, coord, tabgeo)
         vol = np.zeros((inci.shape[0]))
         for ee in range(inci.shape[0]):
             vol[ee] = self.model.element.getElementVolume(
@@ -388,10 +419,10 @@ class newAnalysis:
         )
 
     def getGlobalMatrix(
-        self, inci, coord, tabmat, tabgeo, intgauss, SYMM=None, MP=None
+        self, inci, coord, tabmat, tabgeo, intgauss, SYMM=None, MP=None, MASS=None, MF=None
     ):
         return self.solver.getMatrixAssembler(
-            self.model, inci, coord, tabmat, tabgeo, intgauss, SYMM=SYMM, MP=MP
+            self.model, inci, coord, tabmat, tabgeo, intgauss, SYMM=SYMM, MP=MP, MASS=MASS, MF=MF
         )
 
     def getForceList(self):
@@ -483,6 +514,12 @@ class newAnalysis:
             intgauss = setPoints2NumericalIntegration(modeldata["ELEMENT"]["SHAPE"])
         return intgauss
 
+    def __setIntegration(modeldata):
+        # stiffness integration: "full", "reduced" (one-point, hourglass control) or "bbar"
+        if "INTEGRATION" in modeldata["ELEMENT"].keys():
+            return str(modeldata["ELEMENT"]["INTEGRATION"]).lower()
+        return "full"
+
 
     # def __setSolution(self, solvedata):
     #     # self.inci = FEANewAnalysis.getInci(self)
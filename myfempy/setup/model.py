@@ -1,8 +1,28 @@
 from __future__ import annotations
 
+from myfempy.core.material.material import getElasticTensorStack
 from myfempy.io.controllers import setPoints2NumericalIntegration
 import numpy as np
 
+# material table, structured array (nmat,), a record per material
+TABMAT_DTYPE = np.dtype(
+    [
+        (key, np.float64)
+        for key in (
+            "EXX", "VXY", "GXY", "EYY", "VYZ", "GYZ", "EZZ", "VZX", "GZX",
+            "RHO", "KXX", "KYY", "KZZ", "CTE", "VIS", "STIF", "DAMP",
+        )
+    ]
+)
+# geometry table, structured array (ngeo,), a record per geometry
+TABGEO_DTYPE = np.dtype(
+    [
+        (key, np.float64)
+        for key in ("AREACS", "INERZZ", "INERYY", "INERXX", "THICKN", "B", "H", "T", "D")
+    ]
+    + [("ID", np.int32)]
+)
+
 
 class SetModel:
     """Model Class <ClassOrder>"""
@@ -14,6 +34,19 @@ class SetModel:
         self.geometry = Geometry
         self.element = Element
 
+    # node dofs, element nodes and element dofs, from the element/shape descriptors
+    @property
+    def nodedof(self):
+        return self.element.getElementSet().nodedof
+
+    @property
+    def nodecon(self):
+        return self.shape.getShapeSet().nodecon
+
+    @property
+    def edof(self):
+        return self.nodedof * self.nodecon
+
     # -----------------------------------------------
     def setElemList(self, modeldata):
         elemlist = SetModel.__elemlist(self, modeldata)
@@ -27,6 +60,8 @@ class SetModel:
         tabmat, mat_lib = SetModel.__tabmat(self, modeldata["MATERIAL"])
         self.tabmat = tabmat
         self.mat_lib = mat_lib
+        # constitutive tensor of each material (nmat, ntens, ntens), index by inci[:, 2] - 1
+        self.tabtensor = getElasticTensorStack(self.material, tabmat)
         return tabmat
 
     def getTabMat(self, modeldata):
@@ -101,79 +136,21 @@ class SetModel:
         """get material table"""
         nmat = len(matlist["PROPMAT"])
         mat_lib = dict()
-        mat_prop = dict()
-        key_mat_list = {
-            "EXX": "EXX",
-            "VXY": "VXY",
-            "GXY": "GXY",
-            "EYY": "EYY",
-            "VYZ": "VYZ",
-            "GYZ": "GYZ",
-            "EZZ": "EZZ",
-            "VZX": "VZX",
-            "GZX": "GZX",
-            "RHO": "RHO",
-            "KXX": "KXX",
-            "KYY": "KYY",
-            "KZZ": "KZZ",
-            "CTE": "CTE",
-            "VIS": "VIS",
-            "STIF": "STIF",
-            "DAMP": "DAMP",
-        }
-        tabmat = [{}] * nmat  # np.zeros((nmat, len(key_mat_list)))
+        tabmat = np.zeros(nmat, dtype=TABMAT_DTYPE)
         for mm in range(nmat):
             mat_lib[matlist["PROPMAT"][mm]["NAME"]] = mm + 1
-            for pp in range(len(key_mat_list)):
-                key = list(key_mat_list)[pp]
+            for key in TABMAT_DTYPE.names:
                 if key in matlist["PROPMAT"][mm].keys():
-                    mat_prop[key] = matlist["PROPMAT"][mm][key]
-                else:
-                    mat_prop[key] = 0.0
-            # matset = self.material.getMaterialSet()
-            # idtyp = matset["idtyp"]  # mat_def(matlist[mm]["MAT"])
-            # idmat = matset["idmat"]  # mat_beh(matlist[mm]["DEF"])
-            # tabmat[mm] = {key:mat_prop[key]}
-            tabmat[mm] = {
-                "EXX": mat_prop["EXX"],
-                "VXY": mat_prop["VXY"],
-                "GXY": mat_prop["GXY"],
-                "EYY": mat_prop["EYY"],
-                "VYZ": mat_prop["VYZ"],
-                "GYZ": mat_prop["GYZ"],
-                "EZZ": mat_prop["EZZ"],
-                "VZX": mat_prop["VZX"],
-                "GZX": mat_prop["GZX"],
-                "RHO": mat_prop["RHO"],
-                "KXX": mat_prop["KXX"],
-                "KYY": mat_prop["KYY"],
-                "KZZ": mat_prop["KZZ"],
-                "CTE": mat_prop["CTE"],
-                "VIS": mat_prop["VIS"],
-                "STIF": mat_prop["STIF"],
-                "DAMP": mat_prop["DAMP"],
-            }
+                    tabmat[key][mm] = matlist["PROPMAT"][mm][key]
         return tabmat, mat_lib
 
     def __tabgeo(self, geolist):
         """get geometry table"""
-
         ngeo = len(geolist["PROPGEO"])
         geo_lib = dict()
-        geo_prop = dict()
-        key_geo_list = {
-            "AREACS": "AREACS",
-            "INERYY": "INERYY",
-            "INERZZ": "INERZZ",
-            "INERXX": "INERXX",
-            "THICKN": "THICKN",
-            "B": "b",
-            "H": "h",
-            "T": "t",
-            "D": "d",
-            "ID": "ID",
-        }
-        tabgeo = [{}] * ngeo  # np.zeros((ngeo, len(key_geo_list) + 1))
+        geoset = self.geometry.GeometrySet()
+        idgeo = geoset["idgeo"]
+        tabgeo = np.zeros(ngeo, dtype=TABGEO_DTYPE)
         for gg in range(ngeo):
             geo_lib[geolist["PROPGEO"][gg]["NAME"]] = gg + 1
 
@@ -190,12 +167,9 @@ class SetModel:
                     "d": d,
                 }
 
-                geoset = self.geometry.GeometrySet()
-                idgeo = geoset["idgeo"]
-
                 sect_prop = self.geometry.getSectionProp(dim_sec)
 
-                tabgeo[gg] = {
+                geo_prop = {
                     "AREACS": sect_prop["areacs"],
                     "INERZZ": sect_prop["inerzz"],
                     "INERYY": sect_prop["ineryy"],
@@ -205,32 +179,15 @@ class SetModel:
                     "H": h,
                     "T": t,
                     "D": d,
-                    "ID": idgeo,
                 }
 
             else:
-                for pp in range(len(key_geo_list)):
-                    key = list(key_geo_list)[pp]
-                    if key in geolist["PROPGEO"][gg].keys():
-                        geo_prop[key] = geolist["PROPGEO"][gg][key]
-                    else:
-                        geo_prop[key] = 0.0
-
-                geoset = self.geometry.GeometrySet()
-                idgeo = geoset["idgeo"]
-
-                tabgeo[gg] = {
-                    "AREACS": geo_prop["AREACS"],
-                    "INERZZ": geo_prop["INERZZ"],
-                    "INERYY": geo_prop["INERYY"],
-                    "INERXX": geo_prop["INERXX"],
-                    "THICKN": geo_prop["THICKN"],
-                    "B": geo_prop["B"],
-                    "H": geo_prop["H"],
-                    "T": geo_prop["T"],
-                    "D": geo_prop["D"],
-                    "ID": idgeo,
-                }
+                geo_prop = geolist["PROPGEO"][gg]
+
+            for key in TABGEO_DTYPE.names:
+                if key in geo_prop.keys():
+                    tabgeo[key][gg] = geo_prop[key]
+            tabgeo["ID"][gg] = idgeo
         return tabgeo, geo_lib
 
     def __inci(self, elemlist, mat_lib, geo_lib):
@@ -259,8 +216,8 @@ class SetModel:
             mesh_type_list[keyelem] = [
                 int(f'{elemeset["id"]}{shapeset["id"]}'),  # elemeset["id"],
                 len(elemeset["dofs"]),
-                len(shapeset["nodes"]),
-                len(elemeset["tensor"]),
+                shapeset.nodecon,
+                elemeset.ntensor,
             ]
             prop_elm[kk, 0] = int(elemlist[kk][1])
             prop_elm[kk, 1] = mat_lib[elemlist[kk][2]]
@@ -0,0 +1,49 @@
+import contextlib
+import io
+
+import numpy as np
+import pytest
+
+from myfempy import DynamicEigenLinear, newAnalysis
+
+
+def getFirstFrequency(mass, masspoint=None):
+    fea = newAnalysis(DynamicEigenLinear)
+    mat = {"NAME": "mat1", "VXY": 0.25, "EXX": 250e9, "RHO": 7800.0}
+    geo = {"NAME": "geo1", "THICKN": 1.0}
+    modeldata = {
+        "MESH": {"TYPE": "legacy", "LX": 16.0, "LY": 2.0, "NX": 8, "NY": 2},
+        "ELEMENT": {"TYPE": "structplane", "SHAPE": "quad4", "INTGAUSS": 2},
+        "MATERIAL": {"MAT": "planestress", "TYPE": "isotropic", "PROPMAT": [mat]},
+        "GEOMETRY": {"GEO": "thickness", "PROPGEO": [geo]},
+    }
+    fea.Model(modeldata)
+    bc = {"TYPE": "fixed", "DOF": "full", "DIR": "edgex", "LOC": {"x": 0, "y": 999, "z": 0}}
+    load = []
+    if masspoint is not None:
+        load.append(
+            {
+                "TYPE": "forcenode",
+                "DOF": "masspoint",
+                "DIR": "node",
+                "LOC": {"x": 2.0, "y": 0.0, "z": 0},
+                "VAL": [masspoint],
+            }
+        )
+    fea.Physic({"PHYSIC": {"DOMAIN": "structural", "LOAD": load, "BOUNDCOND": [bc]}})
+    solverset = {"STEPSET": {"type": "mode", "start": 0, "end": 3, "step": 1}, "MASS": mass}
+    with contextlib.redirect_stdout(io.StringIO()):
+        solution = fea.Solve(solverset)["solution"]
+    # FREQ rows: mode, rad/s, Hz
+    return np.asarray(solution["FREQ"])[0, 2]
+
+
+@pytest.mark.parametrize("mass", ["lumped", "lumped_rowsum"])
+def test_eigen_lumped_mass_with_masspoint(tmp_path, monkeypatch, mass):
+    monkeypatch.chdir(tmp_path)
+    free = getFirstFrequency(mass)
+    lumped = getFirstFrequency(mass, masspoint=1e6)
+    consistent = getFirstFrequency("consistent", masspoint=1e6)
+    # the point mass is added to the diagonal of the lumped mass
+    assert lumped < 0.75 * free
+    assert lumped == pytest.approx(consistent, rel=0.2)